@@ -0,0 +1,143 @@
+"""
+Módulo de Agrupamento de Gravações (Group Commit)
+
+Reúne pedidos concorrentes de gravação durante uma janela curta (ou até
+um tamanho máximo de lote) e os entrega de uma vez a uma função de
+gravação, que usa um único INSERT multi-linha e um único commit.
+
+Autor: Henrique Teixeira
+Versão: 1.0.0
+Data: 2024-01-15
+
+Funcionamento:
+    - O primeiro pedido de um lote vazio vira líder: espera a janela
+      (ou o lote encher), grava o lote e acorda os demais
+    - Pedidos que excedem o lote máximo formam o próximo lote, cujo
+      primeiro pedido é promovido a líder
+    - Cada chamador recebe o seu próprio resultado
+    - O lote roda em um contexto próprio (prazo GROUP_COMMIT_PRAZO_MS e
+      trace próprios), não no da requisição líder: a desconexão ou o
+      prazo do líder não desfaz a gravação dos demais
+    - O tempo do lote é somado ao tempo de banco de cada requisição
+"""
+
+from dotenv import load_dotenv
+from prazos import iniciar_prazo
+from rastreamento import iniciar_trace
+from registro import somar_tempo_banco
+import contextvars
+import threading
+import time
+import os
+
+# =============================================================================
+#                           CONFIGURAÇÃO
+# =============================================================================
+
+load_dotenv()
+
+# Modo opcional: desativado por padrão
+GROUP_COMMIT = os.getenv("GROUP_COMMIT", "0") == "1"
+GROUP_COMMIT_JANELA_MS = float(os.getenv("GROUP_COMMIT_JANELA_MS", 5))
+GROUP_COMMIT_MAX_LOTE = int(os.getenv("GROUP_COMMIT_MAX_LOTE", 100))
+GROUP_COMMIT_PRAZO_MS = int(os.getenv("GROUP_COMMIT_PRAZO_MS", 5000))
+
+# =============================================================================
+#                           AGRUPADOR
+# =============================================================================
+
+class _Pedido:
+    """Pedido de gravação aguardando o seu lote."""
+    __slots__ = ("item", "resultado", "duracao", "concluido", "lider", "evento")
+
+    def __init__(self, item):
+        self.item = item
+        self.resultado = None
+        self.duracao = 0.0
+        self.concluido = False
+        self.lider = False
+        self.evento = threading.Event()
+
+class Agrupador:
+    """
+    Agrupa pedidos concorrentes em lotes gravados de uma só vez.
+
+    Attributes:
+        gravar: Função que recebe a lista de itens e devolve a lista de
+                resultados na mesma ordem
+        janela (float): Espera máxima do líder, em segundos
+        max_lote (int): Tamanho máximo de um lote
+        prazo (float): Prazo de cada lote, em segundos (None = sem prazo)
+    """
+
+    def __init__(self, gravar, janela_ms: float, max_lote: int, prazo_ms: float = GROUP_COMMIT_PRAZO_MS):
+        self.gravar = gravar
+        self.janela = janela_ms / 1000
+        self.max_lote = max_lote
+        self.prazo = prazo_ms / 1000 if prazo_ms else None
+        self._cond = threading.Condition()
+        self._pendentes = []
+        self.lotes = 0
+        self.pedidos = 0
+
+    def enviar(self, item):
+        """
+        Entrega um item para o próximo lote e aguarda o seu resultado.
+
+        Args:
+            item: Dados de uma gravação (formato definido por gravar)
+
+        Returns:
+            Resultado deste item devolvido pela função de gravação, ou
+            None se o lote inteiro falhou
+        """
+        pedido = _Pedido(item)
+        with self._cond:
+            self._pendentes.append(pedido)
+            self.pedidos += 1
+            if len(self._pendentes) == 1:
+                pedido.lider = True
+            elif len(self._pendentes) >= self.max_lote:
+                self._cond.notify_all()
+
+        while not pedido.concluido:
+            if pedido.lider:
+                pedido.lider = False
+                self._liderar()
+            else:
+                pedido.evento.wait()
+                pedido.evento.clear()
+        somar_tempo_banco(pedido.duracao)
+        return pedido.resultado
+
+    def _gravar_isolado(self, itens: list):
+        """Grava o lote sob prazo e trace próprios (contexto vazio)."""
+        with iniciar_trace(None, "agrupamento.lote"), iniciar_prazo(self.prazo):
+            return self.gravar(itens)
+
+    def _liderar(self):
+        """Espera a janela, retira um lote e o grava."""
+        with self._cond:
+            self._cond.wait_for(lambda: len(self._pendentes) >= self.max_lote, timeout=self.janela)
+            lote = self._pendentes[:self.max_lote]
+            self._pendentes = self._pendentes[self.max_lote:]
+            if self._pendentes:
+                # O excedente forma o próximo lote
+                proximo = self._pendentes[0]
+                proximo.lider = True
+                proximo.evento.set()
+            self.lotes += 1
+
+        inicio = time.perf_counter()
+        try:
+            # Contexto novo: sem o prazo, a trace e o registro do líder
+            resultados = contextvars.Context().run(self._gravar_isolado, [pedido.item for pedido in lote])
+        except Exception:
+            resultados = [None] * len(lote)
+        duracao = time.perf_counter() - inicio
+
+        for pedido, resultado in zip(lote, resultados):
+            pedido.resultado = resultado
+            pedido.duracao = duracao
+            pedido.concluido = True
+            pedido.evento.set()
@@ -20,15 +20,22 @@ import re
 from schema import Usuario, Login
 from main import bcrypt_context, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, SECRET_KEY, oauth2_schema
 from model import postUsuario, loginUsuario, getUsuarioById
-from jose import jwt, JWTError
+from jose.exceptions import JWTError
+from preguicoso import modulo
 from datetime import datetime, timedelta, timezone
 from fastapi.security import OAuth2PasswordRequestForm
+from coalescencia import coalescedor_leituras
+from rastreamento import span
+from registro import definir_usuario
 
 # =============================================================================
 #                           CONFIGURAÇÃO DO ROTEADOR
 # =============================================================================
 router = APIRouter(prefix="/autenticacao", tags=["autenticacao"])
 
+# jose.jwt carrega os backends de criptografia: importado no primeiro uso
+jwt = modulo("jose.jwt")
+
 # =============================================================================
 #                           GERENCIAMENTO DE TOKENS JWT
 # =============================================================================
@@ -65,10 +72,12 @@ async def decodificar_token(token: str = Depends(oauth2_schema)):
         JWTError: Se o token for inválido ou expirado
     """
     try:
-        info_usuario = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = int(info_usuario.get("sub"))
+        with span("auth.decodificar_token"):
+            info_usuario = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            user_id = int(info_usuario.get("sub"))
         if user_id is None:
             raise JWTError("Token inválido: ID do usuário não encontrado.")
+        definir_usuario(user_id)
         return user_id
     except JWTError:
         raise JWTError("Token inválido ou expirado.")
@@ -175,7 +184,9 @@ async def refresh_token(id_atual: int = Depends(decodificar_token)):
     """
     try:
         # Verifica se o usuário ainda existe no banco
-        usuario = getUsuarioById(id_atual)
+        usuario = await coalescedor_leituras.executar_async(
+            ("getUsuarioById", id_atual), getUsuarioById, id_atual
+        )
         if usuario is None:
             return acesso_negado("Usuário não encontrado no sistema.")
         
@@ -0,0 +1,555 @@
+"""
+Módulo de Infraestrutura do Banco de Dados - Pool e Statements Preparados
+
+Mantém um pool de conexões MySQL reutilizáveis e, em cada conexão,
+um cache limitado de statements preparados no servidor.
+
+Autor: Henrique Teixeira
+Versão: 1.0.0
+Data: 2024-01-15
+
+Funcionamento:
+    - O pool é criado sob demanda na primeira requisição ao banco
+    - A conexão só é verificada (ping) no checkout se ficou ociosa mais
+      que DB_PING_OCIOSA ou falhou no último uso; a devolução não faz
+      ida ao servidor além do rollback de uma transação aberta
+    - Cada conexão física guarda seus próprios cursores preparados (LRU)
+    - Após uma reconexão o cache é descartado e os statements são
+      preparados novamente no novo servidor/sessão
+    - O acesso passa pelo disjuntor (disjuntor.py): com o banco fora do
+      ar as chamadas falham imediatamente, sem abrir sockets
+    - O prazo da requisição (prazos.py) limita a espera por conexão, as
+      novas tentativas e o tempo de execução de cada statement
+"""
+
+from collections import OrderedDict
+from preguicoso import modulo
+from disjuntor import disjuntor_banco
+from prazos import prazo_atual, PrazoExpirado, MARGEM_CANCELAMENTO
+from rastreamento import span
+from registro import somar_tempo_banco
+from dotenv import load_dotenv
+import threading
+import random
+import queue
+import time
+import os
+
+# =============================================================================
+#                           CONFIGURAÇÃO
+# =============================================================================
+
+load_dotenv()
+
+# Parâmetros de conexão
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "user": os.getenv("DB_USER", "root"),
+    "password": os.getenv("DB_PASSWORD", "Henry45*1"),
+    "database": os.getenv("DB_NAME", "contacts"),
+    "auth_plugin": "mysql_native_password",
+    "connection_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", 5)),
+}
+
+# Tamanho do pool e limite de statements preparados por conexão
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 32))
+
+# Conexões devolvidas há menos que isso são reutilizadas sem ping (segundos)
+DB_PING_OCIOSA = float(os.getenv("DB_PING_OCIOSA", 30))
+
+# Espera máxima por uma conexão livre com o pool esgotado (segundos)
+DB_CHECKOUT_TIMEOUT = float(os.getenv("DB_CHECKOUT_TIMEOUT", 1))
+
+# Novas tentativas em erros transitórios (com jitter limitado)
+DB_RETRY_ATTEMPTS = int(os.getenv("DB_RETRY_ATTEMPTS", 2))
+DB_RETRY_BASE_DELAY = float(os.getenv("DB_RETRY_BASE_DELAY", 0.02))
+DB_RETRY_MAX_DELAY = float(os.getenv("DB_RETRY_MAX_DELAY", 0.2))
+
+# Códigos de erro que indicam falha de conectividade com o servidor
+ERROS_TRANSITORIOS = {
+    1040,  # Too many connections
+    2002,  # Can't connect via socket
+    2003,  # Can't connect to server
+    2005,  # Unknown host
+    2006,  # Server has gone away
+    2013,  # Lost connection during query
+    2055,  # Lost connection (system error)
+}
+
+# Statement interrompido por max_execution_time ou por KILL QUERY
+ERROS_PRAZO = {
+    3024,  # Query execution was interrupted, max_execution_time exceeded
+    1317,  # Query execution was interrupted
+}
+
+# mysql.connector só é importado no primeiro acesso ao banco
+conector = modulo("mysql.connector")
+pooling = modulo("mysql.connector.pooling")
+errors = modulo("mysql.connector.errors")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# =============================================================================
+#                           POOL DE CONEXÕES
+# =============================================================================
+
+def _classe_pool():
+    """
+    Pool do mysql.connector sem o ping incondicional do checkout.
+
+    Notes:
+        - O get_connection original chama is_connected() (um ping) em
+          todo checkout; aqui o ping só acontece para conexões ociosas há
+          mais de DB_PING_OCIOSA ou marcadas após um erro de
+          conectividade. Uma conexão quebrada que escape da verificação
+          falha no statement e segue o caminho de erro transitório
+        - Reproduz get_connection da versão fixada em requirements.txt
+          (8.2.0), que usa atributos internos do pool
+    """
+
+    class PoolContatos(pooling.MySQLConnectionPool):
+        def get_connection(self):
+            with pooling.CONNECTION_POOL_LOCK:
+                try:
+                    cnx = self._cnx_queue.get(block=False)
+                except queue.Empty as err:
+                    raise errors.PoolError("Failed getting connection; pool exhausted") from err
+
+                ociosa = time.monotonic() - getattr(cnx, "_devolvida_em", 0.0)
+                suspeita = getattr(cnx, "_verificar", False) or ociosa > DB_PING_OCIOSA
+                if self._config_version != cnx.pool_config_version or (suspeita and not cnx.is_connected()):
+                    cnx.config(**self._cnx_config)
+                    try:
+                        cnx.reconnect()
+                    except errors.InterfaceError:
+                        self._queue_connection(cnx)
+                        raise
+                    cnx.pool_config_version = self._config_version
+                cnx._verificar = False
+                return pooling.PooledMySQLConnection(self, cnx)
+
+    return PoolContatos
+
+def obter_pool():
+    """
+    Retorna o pool de conexões, criando-o na primeira chamada.
+
+    Returns:
+        MySQLConnectionPool: Pool compartilhado pela aplicação
+
+    Notes:
+        - pool_reset_session=False preserva os statements preparados
+          entre usos da mesma conexão física
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _classe_pool()(
+                    pool_name="contacts",
+                    pool_size=DB_POOL_SIZE,
+                    pool_reset_session=False,
+                    **DB_CONFIG
+                )
+    return _pool
+
+def erro_transitorio(erro: Exception) -> bool:
+    """Indica se o erro é uma falha de conectividade com o banco."""
+    return isinstance(erro, errors.Error) and erro.errno in ERROS_TRANSITORIOS
+
+def obter_conexao():
+    """
+    Retira uma conexão do pool passando pelo disjuntor.
+
+    Returns:
+        PooledMySQLConnection: Conexão pronta para uso
+
+    Raises:
+        DisjuntorAberto: Banco marcado como indisponível (falha imediata)
+        PrazoExpirado: O prazo da requisição acabou antes da conexão
+                       (inclusive esperando o pool esgotado)
+        mysql.connector.Error: Pool esgotado por DB_CHECKOUT_TIMEOUT ou
+                               falha de conexão
+
+    Notes:
+        - Erros transitórios são repetidos até DB_RETRY_ATTEMPTS vezes com
+          espera aleatória limitada a DB_RETRY_MAX_DELAY
+        - Com o pool esgotado, espera até DB_CHECKOUT_TIMEOUT por uma
+          conexão livre; esperas e tentativas nunca passam do prazo
+    """
+    prazo = prazo_atual()
+    disjuntor_banco.permitir()
+    tentativa = 0
+    inicio = time.perf_counter()
+    while True:
+        try:
+            if prazo is not None:
+                prazo.verificar()
+            conexao = obter_pool().get_connection()
+        except errors.PoolError as erro:
+            espera = DB_CHECKOUT_TIMEOUT - (time.perf_counter() - inicio)
+            restante = prazo.restante() if prazo is not None else None
+            if espera <= 0 or (restante is not None and restante <= 0):
+                disjuntor_banco.liberar_sonda()
+                somar_tempo_banco(time.perf_counter() - inicio)
+                if restante is not None and restante <= espera:
+                    # A espera acabou pelo prazo da requisição, não pelo pool
+                    prazo.esgotar()
+                    raise PrazoExpirado(prazo.motivo) from erro
+                raise
+            if restante is not None:
+                espera = min(espera, restante)
+            time.sleep(min(0.005, espera))
+            continue
+        except Exception as erro:
+            if not erro_transitorio(erro):
+                disjuntor_banco.liberar_sonda()
+                somar_tempo_banco(time.perf_counter() - inicio)
+                raise
+            limite = min(DB_RETRY_MAX_DELAY, DB_RETRY_BASE_DELAY * 2 ** (tentativa + 1))
+            sem_tempo = prazo is not None and prazo.restante() is not None and prazo.restante() <= limite
+            if tentativa >= DB_RETRY_ATTEMPTS or sem_tempo:
+                disjuntor_banco.registrar_falha()
+                somar_tempo_banco(time.perf_counter() - inicio)
+                raise
+            tentativa += 1
+            time.sleep(random.uniform(0, limite))
+            continue
+        disjuntor_banco.registrar_sucesso()
+        somar_tempo_banco(time.perf_counter() - inicio)
+        return conexao
+
+def devolver_conexao(conexao):
+    """
+    Devolve a conexão ao pool descartando transações pendentes.
+
+    Args:
+        conexao: Conexão obtida por obter_conexao()
+
+    Notes:
+        - O rollback evita que um snapshot de leitura antigo (REPEATABLE
+          READ) seja herdado pelo próximo uso da conexão
+        - Sem ping: in_transaction vem do estado já recebido do servidor;
+          se o rollback falhar, a conexão é verificada no próximo checkout
+    """
+    cnx = _conexao_fisica(conexao)
+    try:
+        if conexao.in_transaction:
+            conexao.rollback()
+    except Exception:
+        cnx._verificar = True
+    finally:
+        cnx._devolvida_em = time.monotonic()
+        conexao.close()
+
+def interromper_consulta(conexao_id: int):
+    """
+    Interrompe o statement em andamento de uma sessão (KILL QUERY).
+
+    Args:
+        conexao_id (int): ID da sessão no servidor
+
+    Notes:
+        - Usa uma conexão própria e curta, fora do pool (que pode estar
+          esgotado justamente pelas consultas lentas)
+        - A sessão interrompida continua válida e volta ao pool
+    """
+    try:
+        conexao = conector.connect(**{**DB_CONFIG, "connection_timeout": 2})
+        try:
+            cursor = conexao.cursor()
+            cursor.execute(f"KILL QUERY {int(conexao_id)}")
+            cursor.close()
+        finally:
+            conexao.close()
+    except Exception:
+        # O statement pode já ter terminado; o prazo é verificado de novo
+        pass
+
+# =============================================================================
+#                       CACHE DE STATEMENTS PREPARADOS
+# =============================================================================
+
+class CacheStatements:
+    """
+    Cache LRU de cursores preparados associado a uma conexão física.
+
+    Attributes:
+        connection_id (int): ID da sessão no servidor em que os statements
+                             foram preparados
+        cursores (OrderedDict): (SQL, dicionario) -> cursor preparado
+        limite (int): Número máximo de statements mantidos
+    """
+
+    def __init__(self, connection_id: int, limite: int):
+        self.connection_id = connection_id
+        self.cursores = OrderedDict()
+        self.limite = limite
+
+    def obter(self, cnx, sql: str, dicionario: bool = True):
+        """
+        Retorna o cursor preparado para o SQL, criando-o se necessário.
+
+        Args:
+            cnx: Conexão física MySQL
+            sql (str): Texto do statement
+            dicionario (bool): Linhas como dicionários (True) ou tuplas
+
+        Returns:
+            Cursor preparado
+        """
+        chave = (sql, dicionario)
+        cursor = self.cursores.get(chave)
+        if cursor is not None:
+            self.cursores.move_to_end(chave)
+            return cursor
+
+        cursor = cnx.cursor(prepared=True, dictionary=dicionario)
+        self.cursores[chave] = cursor
+        if len(self.cursores) > self.limite:
+            # Fechar o cursor libera o statement no servidor
+            _, antigo = self.cursores.popitem(last=False)
+            try:
+                antigo.close()
+            except Exception:
+                pass
+        return cursor
+
+def _conexao_fisica(conexao):
+    """Retorna a conexão física por trás de uma conexão do pool."""
+    return getattr(conexao, "_cnx", None) or conexao
+
+def cursor_preparado(conexao, sql: str, dicionario: bool = True):
+    """
+    Obtém o cursor preparado em cache para o SQL na conexão informada.
+
+    Args:
+        conexao: Conexão do pool (ou conexão MySQL direta)
+        sql (str): Texto do statement
+        dicionario (bool): Linhas como dicionários (True) ou tuplas
+
+    Returns:
+        Cursor preparado reutilizável
+
+    Notes:
+        - Se a sessão mudou (reconexão), o cache antigo é descartado
+    """
+    cnx = _conexao_fisica(conexao)
+    cache = getattr(cnx, "_cache_statements", None)
+    if cache is None or cache.connection_id != cnx.connection_id:
+        cache = CacheStatements(cnx.connection_id, DB_STATEMENT_CACHE_SIZE)
+        cnx._cache_statements = cache
+    return cache.obter(cnx, sql, dicionario)
+
+def _limitar_execucao(cnx, prazo):
+    """
+    Ajusta o max_execution_time da sessão ao prazo restante.
+
+    Notes:
+        - O valor aplicado fica na conexão física; só deixa de ser
+          reenviado quando não é menor que o restante e o excede em até
+          MARGEM_CANCELAMENTO (o KILL cobre a diferença). Um limite menor,
+          deixado por uma requisição anterior com pouco prazo, é sempre
+          elevado de novo
+        - Sem prazo a sessão volta para 0 (sem limite)
+        - O limite do servidor vale para SELECTs
+    """
+    restante = prazo.restante() if prazo is not None else None
+    # Valor guardado junto com a sessão: uma reconexão volta ao padrão 0
+    sessao, atual = getattr(cnx, "_max_execution_time", (None, 0))
+    if sessao != cnx.connection_id:
+        atual = 0
+    if restante is None:
+        desejado = 0
+        if atual == desejado:
+            return
+    else:
+        desejado = max(1, int(restante * 1000))
+        if atual and 0 <= atual - desejado <= MARGEM_CANCELAMENTO * 1000:
+            return
+
+    cursor = cnx.cursor()
+    cursor.execute(f"SET SESSION max_execution_time = {desejado}")
+    cursor.close()
+    cnx._max_execution_time = (cnx.connection_id, desejado)
+
+def executar(conexao, sql: str, params: tuple = (), dicionario: bool = True, preparado: bool = True):
+    """
+    Executa um statement usando o protocolo binário (prepared).
+
+    Args:
+        conexao: Conexão do pool
+        sql (str): Statement com placeholders %s
+        params (tuple): Parâmetros do statement
+        dicionario (bool): Linhas como dicionários (True) ou tuplas
+        preparado (bool): False para statements de aridade variável
+                          (ex.: INSERT multi-linha): protocolo texto, em
+                          um cursor novo fora do cache de statements
+
+    Returns:
+        Cursor após a execução (para lastrowid/rowcount); com
+        preparado=False o cursor é do chamador, que deve fechá-lo
+
+    Raises:
+        PrazoExpirado: Prazo esgotado antes ou durante o statement
+    """
+    prazo = prazo_atual()
+    if prazo is not None:
+        prazo.verificar()
+
+    inicio = time.perf_counter()
+    with span("banco.executar", sql=sql[:120]):
+        cnx = _conexao_fisica(conexao)
+        cursor = None
+        try:
+            _limitar_execucao(cnx, prazo)
+            if preparado:
+                cursor = cursor_preparado(conexao, sql, dicionario)
+            else:
+                cursor = conexao.cursor(dictionary=dicionario)
+            if prazo is not None:
+                prazo.iniciar_statement(cnx.connection_id)
+            cursor.execute(sql, params)
+        except Exception as erro:
+            if cursor is not None and not preparado:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+            if erro_transitorio(erro):
+                disjuntor_banco.registrar_falha()
+                # Verificada (e reconectada) no próximo checkout
+                cnx._verificar = True
+            if prazo is not None and isinstance(erro, errors.Error) and erro.errno in ERROS_PRAZO:
+                prazo.esgotar()
+                raise PrazoExpirado(prazo.motivo) from erro
+            raise
+        finally:
+            if prazo is not None:
+                prazo.encerrar_statement()
+            somar_tempo_banco(time.perf_counter() - inicio)
+    return cursor
+
+def confirmar(conexao):
+    """
+    Confirma a transação da conexão (commit), registrando o tempo gasto.
+
+    Args:
+        conexao: Conexão com transação em andamento
+
+    Raises:
+        PrazoExpirado: Prazo esgotado; a transação não é confirmada (o
+                       cliente já pode ter recebido o erro de prazo)
+    """
+    prazo = prazo_atual()
+    if prazo is not None:
+        prazo.verificar()
+
+    inicio = time.perf_counter()
+    with span("banco.commit"):
+        try:
+            conexao.commit()
+        finally:
+            somar_tempo_banco(time.perf_counter() - inicio)
+
+def buscar_todos(conexao, sql: str, params: tuple = ()):
+    """
+    Executa uma consulta e retorna todas as linhas.
+
+    Returns:
+        list: Linhas como dicionários
+    """
+    return executar(conexao, sql, params).fetchall()
+
+def buscar_um(conexao, sql: str, params: tuple = ()):
+    """
+    Executa uma consulta e retorna a primeira linha.
+
+    Returns:
+        dict: Primeira linha ou None
+
+    Notes:
+        - Todas as linhas são consumidas para não deixar resultado
+          pendente na conexão (cursores preparados não são bufferizados)
+    """
+    linhas = buscar_todos(conexao, sql, params)
+    return linhas[0] if linhas else None
+
+# =============================================================================
+#                           LISTAS IN
+# =============================================================================
+
+# Tamanhos fixos das listas IN: cada tamanho é um statement preparado
+# distinto, então poucos tamanhos mantêm o cache de statements estável
+TAMANHOS_IN = (1, 4, 16, 64, 256, 1024)
+
+def lotes_in(valores: list):
+    """
+    Divide valores em lotes com um dos TAMANHOS_IN.
+
+    Args:
+        valores (list): Valores da lista IN (sem repetição)
+
+    Yields:
+        list: Lote completado com o último valor até o tamanho fixo
+              (valores repetidos não alteram o resultado do IN)
+    """
+    maximo = TAMANHOS_IN[-1]
+    for inicio in range(0, len(valores), maximo):
+        lote = list(valores[inicio:inicio + maximo])
+        tamanho = next(t for t in TAMANHOS_IN if t >= len(lote))
+        lote.extend([lote[-1]] * (tamanho - len(lote)))
+        yield lote
+
+def marcadores(quantidade: int):
+    """Placeholders de uma lista IN: '%s, %s, ...'."""
+    return ", ".join(["%s"] * quantidade)
+
+# =============================================================================
+#                           REGISTROS COMPACTOS
+# =============================================================================
+
+class Registros:
+    """
+    Resultado de consulta em formato compacto: nomes das colunas uma única
+    vez e cada linha como tupla, sem um dicionário por linha.
+
+    Attributes:
+        colunas (tuple): Nomes das colunas
+        linhas (list): Linhas como tuplas, na ordem de colunas
+    """
+    __slots__ = ("colunas", "linhas")
+
+    def __init__(self, colunas: tuple, linhas: list):
+        self.colunas = colunas
+        self.linhas = linhas
+
+    def __len__(self):
+        return len(self.linhas)
+
+    def dicts(self):
+        """Converte para a lista de dicionários (formato tradicional da API)."""
+        colunas = self.colunas
+        return [dict(zip(colunas, linha)) for linha in self.linhas]
+
+    def colunar(self):
+        """
+        Formato compacto serializável diretamente em JSON.
+
+        Returns:
+            dict: {'colunas': [...], 'linhas': [[...], ...]}
+        """
+        return {"colunas": list(self.colunas), "linhas": self.linhas}
+
+def buscar_registros(conexao, sql: str, params: tuple = ()):
+    """
+    Executa uma consulta e retorna as linhas em formato compacto.
+
+    Returns:
+        Registros: Colunas e linhas como tuplas
+    """
+    cursor = executar(conexao, sql, params, dicionario=False)
+    linhas = cursor.fetchall()
+    return Registros(tuple(cursor.column_names), linhas)
@@ -0,0 +1,117 @@
+"""
+Benchmark - Custo de Importação e Tempo até a Primeira Requisição
+
+Mede, em processos novos, quanto custa importar cada módulo ao carregar
+main.py (python -X importtime) e quanto tempo o worker leva até
+responder à primeira requisição.
+
+Autor: Henrique Teixeira
+Data: 2024-01-15
+
+Uso:
+    python -m benchmarks.importacao [--top 25] [--execucoes 5]
+
+Notas:
+    - Não requer banco: a primeira requisição é /monitoramento/banco
+      (sem X-Admin-Token responde 403, o que basta para a medição)
+    - 'próprio' é o tempo do módulo sem os imports que ele dispara;
+      'pacote' soma o tempo próprio de todos os módulos do pacote
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import os
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executado em um processo novo para cada medição de partida
+SCRIPT_PARTIDA = """
+import time
+inicio = time.perf_counter()
+import main
+importado = time.perf_counter()
+from fastapi.testclient import TestClient
+cliente = TestClient(main.app)
+antes = time.perf_counter()
+cliente.get("/monitoramento/banco")
+print(importado - inicio, time.perf_counter() - antes + importado - inicio, time.perf_counter() - antes)
+"""
+
+# =============================================================================
+#                           MEDIÇÃO
+# =============================================================================
+
+def custo_imports():
+    """
+    Custo de cada módulo importado por main.py.
+
+    Returns:
+        list: (módulo, próprio µs, acumulado µs), na ordem de importação
+    """
+    saida = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=RAIZ, capture_output=True, text=True, check=True
+    ).stderr
+    modulos = []
+    for linha in saida.splitlines():
+        if not linha.startswith("import time:") or "self [us]" in linha:
+            continue
+        proprio, acumulado, nome = linha[len("import time:"):].split("|")
+        modulos.append((nome.strip(), int(proprio), int(acumulado)))
+    return modulos
+
+def partida(execucoes: int):
+    """
+    Mede a partida em processos novos.
+
+    Returns:
+        dict: medianas (ms) de import main, primeira requisição e total
+    """
+    medidas = []
+    for _ in range(execucoes):
+        saida = subprocess.run(
+            [sys.executable, "-c", SCRIPT_PARTIDA],
+            cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.split()
+        medidas.append([float(valor) * 1000 for valor in saida])
+    return {
+        "import_ms": statistics.median(m[0] for m in medidas),
+        "primeira_requisicao_ms": statistics.median(m[2] for m in medidas),
+        "total_ms": statistics.median(m[1] for m in medidas),
+    }
+
+# =============================================================================
+#                           EXECUÇÃO
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo de importação e tempo até a primeira requisição.")
+    parser.add_argument("--top", type=int, default=25, help="Módulos/pacotes listados")
+    parser.add_argument("--execucoes", type=int, default=5, help="Processos medidos na partida")
+    args = parser.parse_args()
+
+    modulos = custo_imports()
+    pacotes = {}
+    for nome, proprio, _ in modulos:
+        pacote = nome.split(".")[0]
+        pacotes[pacote] = pacotes.get(pacote, 0) + proprio
+
+    print(f"{'pacote':<28} {'próprio ms':>12}")
+    for pacote, proprio in sorted(pacotes.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{pacote:<28} {proprio / 1000:>12.1f}")
+
+    print()
+    print(f"{'módulo':<44} {'próprio ms':>12} {'acumulado ms':>14}")
+    for nome, proprio, acumulado in sorted(modulos, key=lambda m: -m[1])[:args.top]:
+        print(f"{nome:<44} {proprio / 1000:>12.1f} {acumulado / 1000:>14.1f}")
+
+    print()
+    medidas = partida(args.execucoes)
+    print(f"import main: {medidas['import_ms']:.0f} ms | primeira requisição: "
+          f"{medidas['primeira_requisicao_ms']:.0f} ms | até responder: {medidas['total_ms']:.0f} ms "
+          f"(mediana de {args.execucoes})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark - Registros Compactos vs Dicionários por Linha
+
+Compara memória e tempo de montagem + serialização JSON de uma agenda
+grande nos dois formatos: uma lista de dicionários (cursor
+dictionary=True) e banco.Registros (tuplas + nomes das colunas).
+
+Autor: Henrique Teixeira
+Data: 2024-01-15
+
+Uso:
+    python -m benchmarks.linhas_compactas [quantidade]
+
+Notas:
+    - Não requer banco: as linhas são geradas em memória no formato
+      devolvido pelo conector (tuplas)
+"""
+
+import sys
+import json
+import time
+import tracemalloc
+from banco import Registros
+
+COLUNAS = ("id", "nome", "email", "telefone", "usuario_id", "versao", "versao_criacao")
+
+# =============================================================================
+#                           AUXILIARES
+# =============================================================================
+
+def gerar_linhas(quantidade):
+    """Gera linhas no formato de tupla devolvido por um cursor comum."""
+    return [
+        (i, f"Contato {i}", f"contato{i}@email.com", f"119{i:08d}", 1, i, i)
+        for i in range(1, quantidade + 1)
+    ]
+
+def serializar(conteudo):
+    """Serializa como JSONResponse.render."""
+    return json.dumps(conteudo, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def caminho_dicts(linhas):
+    """Formato objetos (padrão): um dicionário por linha."""
+    contatos = [dict(zip(COLUNAS, linha)) for linha in linhas]
+    return contatos, serializar({"data": contatos})
+
+def caminho_compacto(linhas):
+    """Formato colunas: Registros serializado sem dicionários."""
+    registros = Registros(COLUNAS, linhas)
+    return registros, serializar({"data": registros.colunar()})
+
+def medir(funcao, linhas):
+    """
+    Mede tempo, pico de memória e tamanho do corpo JSON.
+
+    Returns:
+        tuple: (milissegundos, MiB de pico, KiB de JSON)
+    """
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    _, corpo = funcao(linhas)
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duracao * 1000, pico / 2 ** 20, len(corpo) / 1024
+
+# =============================================================================
+#                           EXECUÇÃO
+# =============================================================================
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    linhas = gerar_linhas(quantidade)
+
+    print(f"{quantidade} linhas")
+    print(f"{'formato':<12} {'ms':>10} {'pico MiB':>10} {'JSON KiB':>10}")
+    for nome, funcao in (("dicts", caminho_dicts), ("compacto", caminho_compacto)):
+        ms, mib, kib = medir(funcao, linhas)
+        print(f"{nome:<12} {ms:>10.1f} {mib:>10.1f} {kib:>10.1f}")
+
+if __name__ == "__main__":
+    main()
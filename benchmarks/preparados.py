@@ -0,0 +1,91 @@
+"""
+Benchmark - Statements Preparados vs Protocolo Texto
+
+Compara as consultas quentes de model.py executadas pelo protocolo texto
+(interpolação no cliente, como antes do cache) com o caminho de
+statements preparados em cache por conexão (banco.py).
+
+Autor: Henrique Teixeira
+Data: 2024-01-15
+
+Uso:
+    python -m benchmarks.preparados [usuario_id] [contato_id] [iteracoes]
+
+Notas:
+    - Requer o banco configurado em banco.py acessível
+    - Bytes trafegados são lidos de SHOW SESSION STATUS (Bytes_sent/received)
+"""
+
+import sys
+import time
+from banco import obter_conexao, devolver_conexao, buscar_todos
+from model import SQL_CONTATOS_POR_USUARIO, SQL_CONTATO_POR_ID, SQL_USUARIO_POR_ID
+
+# =============================================================================
+#                           AUXILIARES
+# =============================================================================
+
+def bytes_sessao(conexao):
+    """Retorna (bytes recebidos, bytes enviados) pelo servidor na sessão."""
+    cursor = conexao.cursor()
+    cursor.execute("SHOW SESSION STATUS WHERE Variable_name IN ('Bytes_received', 'Bytes_sent')")
+    valores = dict(cursor.fetchall())
+    cursor.close()
+    return int(valores["Bytes_received"]), int(valores["Bytes_sent"])
+
+def executar_texto(conexao, sql, params):
+    """Caminho antigo: cursor novo em protocolo texto a cada chamada."""
+    cursor = conexao.cursor(dictionary=True)
+    cursor.execute(sql, params)
+    linhas = cursor.fetchall()
+    cursor.close()
+    return linhas
+
+def executar_preparado(conexao, sql, params):
+    """Caminho novo: cursor preparado reaproveitado do cache da conexão."""
+    return buscar_todos(conexao, sql, params)
+
+def medir(conexao, funcao, sql, params, iteracoes):
+    """
+    Mede tempo e bytes de uma estratégia de execução.
+
+    Returns:
+        tuple: (microssegundos por operação, bytes por operação)
+    """
+    funcao(conexao, sql, params)  # aquecimento (prepara o statement)
+    recebidos, enviados = bytes_sessao(conexao)
+    inicio = time.perf_counter()
+    for _ in range(iteracoes):
+        funcao(conexao, sql, params)
+    duracao = time.perf_counter() - inicio
+    recebidos_fim, enviados_fim = bytes_sessao(conexao)
+    total_bytes = (recebidos_fim - recebidos) + (enviados_fim - enviados)
+    return duracao / iteracoes * 1e6, total_bytes / iteracoes
+
+# =============================================================================
+#                           EXECUÇÃO
+# =============================================================================
+
+def main():
+    usuario_id = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    contato_id = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    iteracoes = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+
+    consultas = [
+        ("contatos por usuario", SQL_CONTATOS_POR_USUARIO, (usuario_id,)),
+        ("contato por id", SQL_CONTATO_POR_ID, (contato_id, usuario_id)),
+        ("usuario por id", SQL_USUARIO_POR_ID, (usuario_id,)),
+    ]
+
+    conexao = obter_conexao()
+    try:
+        print(f"{'consulta':<22} {'modo':<10} {'us/op':>10} {'bytes/op':>10}")
+        for nome, sql, params in consultas:
+            for modo, funcao in (("texto", executar_texto), ("preparado", executar_preparado)):
+                us, b = medir(conexao, funcao, sql, params, iteracoes)
+                print(f"{nome:<22} {modo:<10} {us:>10.1f} {b:>10.1f}")
+    finally:
+        devolver_conexao(conexao)
+
+if __name__ == "__main__":
+    main()
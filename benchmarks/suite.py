@@ -0,0 +1,347 @@
+"""
+Benchmark - Suíte de Microbenchmarks com Linha de Base
+
+Mede as funções quentes da API (tokens JWT, bcrypt, serialização das
+respostas, validação Pydantic, normalização de telefone e as operações
+de model.py) e compara com uma linha de base salva, falhando quando
+alguma fica mais lenta que o limite configurado.
+
+Autor: Henrique Teixeira
+Data: 2024-01-15
+
+Uso:
+    python -m benchmarks.suite                      # só mede
+    python -m benchmarks.suite --salvar             # mede e grava a linha de base
+    python -m benchmarks.suite --comparar --limite 15
+    python -m benchmarks.suite --banco --filtro model.
+
+Notas:
+    - Cada benchmark é calibrado para ~TEMPO_AMOSTRA por amostra; o
+      valor comparado é o mínimo por operação entre as amostras (o menos
+      sujeito a ruído do sistema)
+    - Benchmarks de model.py exigem --banco e o MySQL de banco.py (o SQL
+      é específico do MySQL; não há banco embutido equivalente). Um
+      usuário temporário é criado e removido ao final
+    - A linha de base depende da máquina: gerar e comparar no mesmo host
+    - --comparar termina com código 1 se houver regressão
+"""
+
+import argparse
+import statistics
+import json
+import time
+import sys
+import os
+
+# =============================================================================
+#                           CONFIGURAÇÃO
+# =============================================================================
+
+BASELINE_PADRAO = os.path.join(os.path.dirname(__file__), "baseline.json")
+LIMITE_PADRAO = float(os.getenv("BENCH_LIMITE", 20))
+TEMPO_AMOSTRA = 0.2
+AMOSTRAS = 5
+
+_benchmarks = []
+
+def benchmark(nome: str, banco: bool = False):
+    """
+    Registra uma fábrica de benchmark.
+
+    A função decorada recebe o contexto (dict) e devolve a função sem
+    argumentos que será medida.
+
+    Args:
+        nome (str): Identificador estável (chave na linha de base)
+        banco (bool): Requer o banco de dados (--banco)
+    """
+    def decorador(fabrica):
+        _benchmarks.append((nome, banco, fabrica))
+        return fabrica
+    return decorador
+
+def _executar_corrotina(corrotina):
+    """Executa uma corrotina sem await interno, sem criar event loop."""
+    try:
+        corrotina.send(None)
+    except StopIteration as fim:
+        return fim.value
+    raise RuntimeError("Corrotina suspensa: use asyncio.run")
+
+# =============================================================================
+#                           BENCHMARKS SEM BANCO
+# =============================================================================
+
+# autenticacao.py depende de main.py: importar pela aplicação, como o uvicorn
+@benchmark("auth.criar_token")
+def _criar_token(contexto):
+    import main  # noqa: F401
+    from autenticacao import criar_token
+    return lambda: criar_token(42)
+
+@benchmark("auth.decodificar_token")
+def _decodificar_token(contexto):
+    import main  # noqa: F401
+    from autenticacao import criar_token, decodificar_token
+    token = criar_token(42)
+    return lambda: _executar_corrotina(decodificar_token(token))
+
+@benchmark("bcrypt.hash")
+def _bcrypt_hash(contexto):
+    from model import bcrypt_context
+    return lambda: bcrypt_context.hash("Senha123")
+
+@benchmark("bcrypt.verify")
+def _bcrypt_verify(contexto):
+    from model import bcrypt_context
+    senha_hash = bcrypt_context.hash("Senha123")
+    return lambda: bcrypt_context.verify("Senha123", senha_hash)
+
+def _contatos(quantidade: int):
+    return [
+        {"id": i, "nome": f"Contato {i}", "email": f"contato{i}@email.com",
+         "telefone": f"119{i:08d}", "usuario_id": 1, "versao": i, "versao_criacao": i}
+        for i in range(1, quantidade + 1)
+    ]
+
+for _quantidade in (1, 100, 10000):
+    def _fabrica_ok(contexto, quantidade=_quantidade):
+        from response import ok
+        dados = _contatos(quantidade)
+        return lambda: ok("Contatos listados com sucesso.", dados).body
+    benchmark(f"resposta.ok[{_quantidade}]")(_fabrica_ok)
+
+@benchmark("schema.Contato")
+def _schema_contato(contexto):
+    from schema import Contato
+    dados = {"nome": "Maria Santos", "email": "maria@email.com", "telefone": "(11) 99999-8888"}
+    return lambda: Contato(**dados)
+
+@benchmark("schema.Usuario")
+def _schema_usuario(contexto):
+    from schema import Usuario
+    dados = {"nome": "João Silva", "email": "joao@email.com", "senha_hash": "Senha123"}
+    return lambda: Usuario(**dados)
+
+@benchmark("validacao.criacao")
+def _validacao_criacao(contexto):
+    import main  # noqa: F401
+    from contatos import validar_criacao
+    from schema import Contato
+    contato = Contato(nome="Maria Santos", email="maria@email.com", telefone="(11) 99999-8888")
+    return lambda: validar_criacao(contato)
+
+# =============================================================================
+#                           BENCHMARKS COM BANCO
+# =============================================================================
+
+CONTATOS_BANCO = 500
+
+def preparar_banco(contexto):
+    """Cria um usuário temporário com CONTATOS_BANCO contatos."""
+    from model import postUsuario, postContato, bcrypt_context
+    marca = f"{os.getpid()}{int(time.time())}"
+    usuario = postUsuario("Usuario Benchmark", f"bench{marca}@bench.local", bcrypt_context.hash("Senha123"))
+    if not usuario:
+        raise RuntimeError("Não foi possível criar o usuário de benchmark (banco acessível?)")
+    contexto["usuario_id"] = usuario["id"]
+    contexto["email"] = usuario["email"]
+    contexto["marca"] = marca
+    contexto["contatos"] = []
+    for i in range(CONTATOS_BANCO):
+        telefone = f"99{marca[-5:]}{i:04d}"
+        contato = postContato(f"Contato {i}", f"b{marca}.{i}@bench.local", telefone, usuario["id"])
+        if contato:
+            contexto["contatos"].append(contato["id"])
+
+def limpar_banco(contexto):
+    """Remove o usuário temporário e tudo o que foi criado para ele."""
+    from banco import obter_conexao, devolver_conexao, executar, confirmar
+    usuario_id = contexto.get("usuario_id")
+    if usuario_id is None:
+        return
+    conexao = obter_conexao()
+    try:
+        for tabela in ("info_excluidos", "info"):
+            executar(conexao, f"DELETE FROM {tabela} WHERE usuario_id = %s", (usuario_id,))
+        executar(conexao, "DELETE FROM usuarios WHERE id = %s", (usuario_id,))
+        confirmar(conexao)
+    finally:
+        devolver_conexao(conexao)
+
+@benchmark("model.getContatos", banco=True)
+def _get_contatos(contexto):
+    from model import getContatos
+    return lambda: getContatos(contexto["usuario_id"])
+
+@benchmark("model.getContatoById", banco=True)
+def _get_contato_by_id(contexto):
+    from model import getContatoById
+    contato_id = contexto["contatos"][0]
+    return lambda: getContatoById(contato_id, contexto["usuario_id"])
+
+@benchmark("model.getAlteracoesContatos", banco=True)
+def _get_alteracoes(contexto):
+    from model import getAlteracoesContatos
+    return lambda: getAlteracoesContatos(contexto["usuario_id"], CONTATOS_BANCO - 10)
+
+@benchmark("model.updateContato", banco=True)
+def _update_contato(contexto):
+    from model import updateContato
+    contato_id = contexto["contatos"][1]
+    nomes = ["Contato Alterado A", "Contato Alterado B"]
+    estado = {"i": 0}
+    def executar():
+        estado["i"] ^= 1
+        return updateContato(contato_id, contexto["usuario_id"], nomes[estado["i"]])
+    return executar
+
+@benchmark("model.postContato+deleteContato", banco=True)
+def _post_delete_contato(contexto):
+    from model import postContato, deleteContato
+    estado = {"i": 0}
+    def executar():
+        estado["i"] += 1
+        telefone = f"98{contexto['marca'][-5:]}{estado['i'] % 10000:04d}"
+        contato = postContato("Contato Temporario", f"t{contexto['marca']}.{estado['i']}@bench.local",
+                              telefone, contexto["usuario_id"])
+        if contato:
+            deleteContato(contato["id"], contexto["usuario_id"])
+    return executar
+
+@benchmark("model.loginUsuario", banco=True)
+def _login_usuario(contexto):
+    from model import loginUsuario
+    return lambda: loginUsuario(contexto["email"])
+
+@benchmark("model.getUsuarioById", banco=True)
+def _get_usuario_by_id(contexto):
+    from model import getUsuarioById
+    return lambda: getUsuarioById(contexto["usuario_id"])
+
+# =============================================================================
+#                           MEDIÇÃO
+# =============================================================================
+
+def medir(funcao, amostras: int = AMOSTRAS, tempo_amostra: float = TEMPO_AMOSTRA):
+    """
+    Mede o tempo por operação de uma função.
+
+    Returns:
+        dict: 'min_us' e 'mediana_us' por operação e 'ops' por amostra
+    """
+    funcao()  # aquecimento (imports, caches, statements preparados)
+    ops = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(ops):
+            funcao()
+        duracao = time.perf_counter() - inicio
+        if duracao >= tempo_amostra / 10 or ops >= 1_000_000:
+            break
+        ops *= 10
+    ops = max(1, int(ops * tempo_amostra / max(duracao, 1e-9)))
+
+    tempos = []
+    for _ in range(amostras):
+        inicio = time.perf_counter()
+        for _ in range(ops):
+            funcao()
+        tempos.append((time.perf_counter() - inicio) / ops * 1e6)
+    return {"min_us": round(min(tempos), 3), "mediana_us": round(statistics.median(tempos), 3), "ops": ops}
+
+def executar(filtro: str = None, banco: bool = False, amostras: int = AMOSTRAS):
+    """
+    Executa os benchmarks selecionados.
+
+    Returns:
+        dict: nome -> resultado de medir()
+    """
+    selecionados = [(nome, requer, fabrica) for nome, requer, fabrica in _benchmarks
+                    if (banco or not requer) and (not filtro or filtro in nome)]
+    contexto = {}
+    resultados = {}
+    try:
+        if any(requer for _, requer, _ in selecionados):
+            preparar_banco(contexto)
+        for nome, _, fabrica in selecionados:
+            resultados[nome] = medir(fabrica(contexto), amostras)
+            print(f"{nome:<34} {resultados[nome]['min_us']:>14.3f} µs/op", file=sys.stderr)
+    finally:
+        if banco:
+            limpar_banco(contexto)
+    return resultados
+
+def comparar(resultados: dict, linha_base: dict, limite: float):
+    """
+    Compara os resultados com a linha de base.
+
+    Args:
+        limite (float): Piora máxima aceita, em porcentagem
+
+    Returns:
+        list: Linhas (nome, base, atual, variação %, regrediu)
+    """
+    linhas = []
+    for nome, atual in resultados.items():
+        base = linha_base.get(nome)
+        if base is None:
+            linhas.append((nome, None, atual["min_us"], None, False))
+            continue
+        variacao = (atual["min_us"] - base["min_us"]) / base["min_us"] * 100
+        linhas.append((nome, base["min_us"], atual["min_us"], variacao, variacao > limite))
+    return linhas
+
+# =============================================================================
+#                           EXECUÇÃO
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks das funções quentes da API.")
+    parser.add_argument("--filtro", help="Executa só benchmarks cujo nome contém o texto")
+    parser.add_argument("--banco", action="store_true", help="Inclui as operações de model.py (requer MySQL)")
+    parser.add_argument("--amostras", type=int, default=AMOSTRAS, help="Amostras por benchmark")
+    parser.add_argument("--baseline", default=BASELINE_PADRAO, help="Arquivo JSON da linha de base")
+    parser.add_argument("--salvar", action="store_true", help="Grava os resultados como linha de base")
+    parser.add_argument("--comparar", action="store_true", help="Compara com a linha de base e falha se regredir")
+    parser.add_argument("--limite", type=float, default=LIMITE_PADRAO, help="Piora máxima aceita em %% (padrão: BENCH_LIMITE ou 20)")
+    args = parser.parse_args()
+
+    resultados = executar(args.filtro, args.banco, args.amostras)
+
+    if args.salvar:
+        linha_base = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as arquivo:
+                linha_base = json.load(arquivo)
+        # Atualiza só os benchmarks executados (ex.: com --filtro)
+        linha_base.update(resultados)
+        with open(args.baseline, "w", encoding="utf-8") as arquivo:
+            json.dump(linha_base, arquivo, indent=2, sort_keys=True)
+        print(f"Linha de base gravada em {args.baseline}")
+
+    if not args.comparar:
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"Linha de base {args.baseline} inexistente: gere com --salvar")
+        sys.exit(2)
+    with open(args.baseline, encoding="utf-8") as arquivo:
+        linha_base = json.load(arquivo)
+
+    regressoes = 0
+    print(f"{'benchmark':<34} {'base µs':>12} {'atual µs':>12} {'variação':>10}")
+    for nome, base, atual, variacao, regrediu in comparar(resultados, linha_base, args.limite):
+        if base is None:
+            print(f"{nome:<34} {'-':>12} {atual:>12.3f} {'novo':>10}")
+            continue
+        marca = "  REGRESSÃO" if regrediu else ""
+        print(f"{nome:<34} {base:>12.3f} {atual:>12.3f} {variacao:>+9.1f}%{marca}")
+        regressoes += regrediu
+
+    if regressoes:
+        print(f"{regressoes} benchmark(s) acima do limite de {args.limite:g}%")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
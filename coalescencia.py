@@ -0,0 +1,166 @@
+"""
+Módulo de Coalescência de Leituras (Single-Flight)
+
+Chamadas concorrentes idênticas ao banco compartilham uma única
+execução em andamento e o seu resultado, em vez de cada uma abrir sua
+própria conexão e repetir a mesma consulta.
+
+Autor: Henrique Teixeira
+Versão: 1.0.0
+Data: 2024-01-15
+
+Caminhos suportados:
+    - executar(): chamadores síncronos em threads (ex.: run_in_threadpool)
+    - executar_async(): handlers async; a consulta roda no threadpool em
+      uma tarefa própria, aguardada por todos os chamadores no event loop
+
+Notes:
+    - O resultado é compartilhado entre os chamadores: não deve ser
+      modificado por quem o recebe
+    - Se o prazo da execução compartilhada esgotar, todos os chamadores
+      recebem PrazoExpirado (504), e não o resultado de erro (None)
+"""
+
+from starlette.concurrency import run_in_threadpool
+from prazos import prazo_atual, PrazoExpirado
+import threading
+import asyncio
+
+# =============================================================================
+#                           COALESCEDOR
+# =============================================================================
+
+class _Voo:
+    """Execução em andamento de uma chave."""
+    __slots__ = ("evento", "resultado", "erro")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+class Coalescedor:
+    """
+    Agrupa chamadas concorrentes com a mesma chave em uma única execução.
+
+    Attributes:
+        chamadas (int): Total de chamadas recebidas
+        economizadas (int): Chamadas atendidas por uma execução já em andamento
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._voos = {}
+        self._voos_async = {}
+        self.chamadas = 0
+        self.economizadas = 0
+
+    def _contar(self, economizada: bool):
+        with self._lock:
+            self.chamadas += 1
+            if economizada:
+                self.economizadas += 1
+
+    def _compartilhar(self, chave, funcao, args):
+        """
+        Executa funcao(*args) ou aguarda a execução em andamento da chave.
+
+        Returns:
+            tuple: (resultado, True se reaproveitou outra execução)
+        """
+        with self._lock:
+            voo = self._voos.get(chave)
+            lider = voo is None
+            if lider:
+                voo = _Voo()
+                self._voos[chave] = voo
+
+        if not lider:
+            voo.evento.wait()
+            if voo.erro is not None:
+                raise voo.erro
+            return voo.resultado, True
+
+        try:
+            voo.resultado = funcao(*args)
+            prazo = prazo_atual()
+            if prazo is not None and prazo.cancelado:
+                # A função engoliu o PrazoExpirado e devolveu erro (None)
+                raise PrazoExpirado(prazo.motivo)
+        except BaseException as erro:
+            voo.erro = erro
+            raise
+        finally:
+            with self._lock:
+                self._voos.pop(chave, None)
+            voo.evento.set()
+        return voo.resultado, False
+
+    def executar(self, chave, funcao, *args):
+        """
+        Caminho síncrono (threads).
+
+        Args:
+            chave: Identificador hashable da leitura (ex.: ("getContatos", 7))
+            funcao: Função de leitura
+            *args: Argumentos da função
+
+        Returns:
+            Resultado da função (compartilhado entre chamadores concorrentes)
+        """
+        resultado, economizada = self._compartilhar(chave, funcao, args)
+        self._contar(economizada)
+        return resultado
+
+    async def executar_async(self, chave, funcao, *args):
+        """
+        Caminho assíncrono: não bloqueia o event loop.
+
+        Args:
+            chave: Identificador hashable da leitura
+            funcao: Função de leitura síncrona
+            *args: Argumentos da função
+
+        Returns:
+            Resultado da função (compartilhado entre chamadores concorrentes)
+
+        Notes:
+            - A execução não pertence a nenhum chamador: cancelar quem a
+              iniciou (ex.: cliente desconectado) não a interrompe nem
+              afeta os demais, que continuam aguardando o resultado
+        """
+        tarefa = self._voos_async.get(chave)
+        lider = tarefa is None
+        if lider:
+            # Criada no contexto do primeiro chamador (prazo, trace)
+            tarefa = asyncio.ensure_future(run_in_threadpool(self._compartilhar, chave, funcao, args))
+            self._voos_async[chave] = tarefa
+            tarefa.add_done_callback(lambda concluida: self._encerrar_async(chave, concluida))
+
+        resultado, economizada = await asyncio.shield(tarefa)
+        self._contar(economizada or not lider)
+        return resultado
+
+    def _encerrar_async(self, chave, tarefa):
+        """Remove a execução concluída e marca a exceção como recuperada."""
+        if self._voos_async.get(chave) is tarefa:
+            del self._voos_async[chave]
+        # Evita aviso de exceção não recuperada quando ninguém mais aguarda
+        tarefa.cancelled() or tarefa.exception()
+
+    def estatisticas(self):
+        """
+        Retorna os contadores para monitoramento.
+
+        Returns:
+            dict: chamadas, economizadas e execuções em andamento
+        """
+        with self._lock:
+            return {
+                "chamadas": self.chamadas,
+                "economizadas": self.economizadas,
+                "em_andamento": len(self._voos),
+            }
+
+# Coalescedor compartilhado das leituras quentes
+coalescedor_leituras = Coalescedor()
@@ -8,18 +8,40 @@ Autor: Henrique Teixeira
 Versão: 1.0.0
 Data: 2024-01-15
 
+Etiquetas:
+    - /contatos/tags cria, lista e exclui etiquetas; /tags/{id}/add e
+      /tags/{id}/remove associam contatos em lote
+    - /contatos/list?tags=familia AND NOT trabalho filtra pelo índice
+      de etiquetas em memória (etiquetas.py)
+
+Prazos:
+    - O trabalho de banco das rotas roda fora do event loop sob o prazo
+      da rota (prazos.py): é cancelado se o cliente desconectar e o
+      prazo esgotado responde 504
+
 Segurança:
     - Autenticação JWT obrigatória em todas as rotas
     - Validação de propriedade (usuário só acessa seus contatos)
     - Validação de dados de entrada
 """
 
-from fastapi import APIRouter, Depends
-from model import postContato, getContatos, getContatoById, updateContato, deleteContato, getUsuarioById
+from fastapi import APIRouter, Depends, Request
+from typing import Optional
+from model import postContato, getContatos, getContatoById, updateContato, deleteContato, getUsuarioById, executarLoteContatos, getAlteracoesContatos, mesclarContatos, getContatosPorTelefones, getContatosPorEtiquetas, getContatosPorIds, getEtiquetas, postEtiqueta, deleteEtiqueta, etiquetarContatos, CAMPOS_CONTATO
 import re
-from response import ok, bad_request, server_error
-from schema import Contato
+from response import ok, bad_request, server_error, prazo_esgotado
+from schema import Contato, LoteContatos, MesclaContatos, ConsultaTelefones, Etiqueta, IdsContatos
+from starlette.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from eventos import hub_contatos
+from rastreamento import rastreado
+import asyncio
+import json
 from autenticacao import decodificar_token
+from coalescencia import coalescedor_leituras
+from prazos import aguardar, PrazoExpirado
+from duplicados import encontrar_duplicados, LIMIAR_PADRAO
+from etiquetas import analisar_expressao, normalizar_nome
 
 # =============================================================================
 #                           CONFIGURAÇÃO DO ROTEADOR
@@ -30,36 +52,263 @@ router = APIRouter(
     dependencies=[Depends(decodificar_token)]  # Autenticação obrigatória
 )
 
+# Número máximo de operações aceitas em um lote
+MAX_OPERACOES_LOTE = 500
+
+# Número máximo de duplicados removidos em uma mesclagem
+MAX_MESCLAGEM = 50
+
+# Número máximo de telefones por identificação em lote
+MAX_TELEFONES_CONSULTA = 5000
+
+# Número máximo de IDs por leitura em lote
+MAX_IDS_CONSULTA = 5000
+
+# Número máximo de contatos por associação de etiqueta
+MAX_CONTATOS_ETIQUETA = 5000
+
+# Intervalo (segundos) entre comentários keep-alive no stream de eventos
+INTERVALO_KEEPALIVE = 15
+
+# =============================================================================
+#                           VALIDAÇÕES
+# =============================================================================
+
+@rastreado("validacao.criacao")
+def validar_criacao(contato: Contato):
+    """
+    Valida os dados de criação de um contato.
+    
+    Args:
+        contato (Contato): Dados do novo contato
+    
+    Returns:
+        tuple: (mensagem de erro ou None, telefone normalizado)
+    """
+    # Validação de nome
+    if not contato.nome or len(contato.nome) < 4:
+        return "Nome inválido. Deve ter pelo menos 4 caracteres.", None
+    
+    # Validação de telefone
+    if not contato.telefone:
+        return "Telefone obrigatório.", None
+    
+    telefone_limpo = re.sub(r"\D", "", contato.telefone)
+    if len(telefone_limpo) != 11:
+        return "Telefone inválido. Deve ter 11 números.", None
+    
+    # Validação de email
+    if not contato.email or "@" not in contato.email:
+        return "Email inválido. Insira um email válido.", None
+    
+    return None, telefone_limpo
+
+@rastreado("validacao.atualizacao")
+def validar_atualizacao(contato_id: int, contato: Contato):
+    """
+    Valida os dados de atualização de um contato (campos opcionais).
+    
+    Args:
+        contato_id (int): ID do contato a ser atualizado
+        contato (Contato): Dados atualizados do contato
+    
+    Returns:
+        tuple: (mensagem de erro ou None, telefone normalizado ou None)
+    """
+    if contato_id is None or contato_id <= 0:
+        return "ID inválido. Deve ser positivo.", None
+    
+    # Validação condicional do nome
+    if contato.nome and len(contato.nome) < 4:
+        return "Nome inválido. Deve ter pelo menos 4 caracteres.", None
+    
+    # Validação condicional do telefone
+    telefone_limpo = None
+    if contato.telefone:
+        telefone_limpo = re.sub(r"\D", "", contato.telefone)
+        if len(telefone_limpo) != 11:
+            return "Telefone inválido. Deve ter 11 números.", None
+    
+    # Validação condicional do email
+    if contato.email and '@' not in contato.email:
+        return "Email inválido. Deve conter '@'.", None
+    
+    return None, telefone_limpo
+
+def normalizar_telefone(telefone: str):
+    """
+    Normaliza um telefone como na criação de contatos (apenas dígitos,
+    11 números), aceitando também o código do país 55 à frente, comum
+    nos números recebidos pela telefonia (+55 11 99999-8888).
+    
+    Returns:
+        str: Telefone com 11 dígitos ou None se inválido
+    """
+    digitos = re.sub(r"\D", "", telefone or "")
+    if len(digitos) == 13 and digitos.startswith("55"):
+        digitos = digitos[2:]
+    return digitos if len(digitos) == 11 else None
+
+@rastreado("validacao.campos")
+def validar_campos(fields: Optional[str]):
+    """
+    Valida o parâmetro fields= (projeção de colunas).
+    
+    Args:
+        fields (str, optional): Colunas separadas por vírgula
+    
+    Returns:
+        tuple: (mensagem de erro ou None, tupla canônica de campos ou None)
+    """
+    if fields is None:
+        return None, None
+    
+    campos = {campo.strip() for campo in fields.split(",") if campo.strip()}
+    if not campos:
+        return "Parâmetro fields vazio.", None
+    
+    invalidos = campos.difference(CAMPOS_CONTATO)
+    if invalidos:
+        return f"Campos inválidos: {', '.join(sorted(invalidos))}. Permitidos: {', '.join(CAMPOS_CONTATO)}.", None
+    
+    # Ordem canônica para que a mesma projeção gere a mesma chave/consulta
+    return None, tuple(campo for campo in CAMPOS_CONTATO if campo in campos)
+
 # =============================================================================
 #                           ENDPOINTS DE CONTATOS
 # =============================================================================
 
 @router.get("/list")
-async def listar_contatos(id_usuario_logado: int = Depends(decodificar_token)):
+async def listar_contatos(request: Request, fields: Optional[str] = None, formato: str = "objetos", tags: Optional[str] = None, id_usuario_logado: int = Depends(decodificar_token)):
     """
     Lista todos os contatos do usuário autenticado.
     
     Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
+        fields (str, optional): Colunas a retornar, separadas por vírgula
+                                (ex.: fields=nome,telefone)
+        formato (str): 'objetos' (lista de objetos, padrão) ou 'colunas'
+                       ({colunas, linhas}: nomes uma vez e linhas como
+                       arrays, mais leve para agendas grandes)
+        tags (str, optional): Expressão de etiquetas com AND, OR, NOT e
+                              parênteses (ex.: tags=familia AND NOT trabalho)
         id_usuario_logado (int): ID do usuário extraído do token JWT
     
     Returns:
         JSONResponse: Lista de contatos ou mensagem de erro
     """
     try:
-        contatos = getContatos(id_usuario_logado)
+        erro, campos = validar_campos(fields)
+        if erro:
+            return bad_request(erro)
+        
+        if formato not in ("objetos", "colunas"):
+            return bad_request("Formato inválido. Use 'objetos' ou 'colunas'.")
+        
+        # Chamadas concorrentes do mesmo usuário (e formato) compartilham
+        # a consulta; só o formato colunas lê as linhas como tuplas
+        compacto = formato == "colunas"
+        if tags is not None:
+            erro, arvore = analisar_expressao(tags)
+            if erro:
+                return bad_request(erro)
+            contatos = await aguardar(request, coalescedor_leituras.executar_async(
+                ("getContatosPorEtiquetas", id_usuario_logado, campos, tags, compacto), getContatosPorEtiquetas, id_usuario_logado, arvore, campos, compacto
+            ), compartilhado=True)
+        else:
+            contatos = await aguardar(request, coalescedor_leituras.executar_async(
+                ("getContatos", id_usuario_logado, campos, compacto), getContatos, id_usuario_logado, campos, compacto
+            ), compartilhado=True)
         if contatos is None:
             return server_error("Erro interno ao buscar contatos.")
+        
+        if compacto:
+            return ok("Contatos listados com sucesso.", contatos.colunar())
         return ok("Contatos listados com sucesso.", contatos)
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
     except Exception as e:
         return server_error(f"Erro ao listar contatos: {str(e)}")
 
+@router.get("/changes")
+async def listar_alteracoes(request: Request, since: int = 0, id_usuario_logado: int = Depends(decodificar_token)):
+    """
+    Lista as alterações nos contatos desde o último token de sincronização.
+    
+    Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
+        since (int): Token retornado pela sincronização anterior (0 = tudo)
+        id_usuario_logado (int): ID do usuário autenticado
+    
+    Returns:
+        JSONResponse: Contatos criados e atualizados, IDs excluídos e o
+                      novo token ('versao') para a próxima chamada
+    """
+    try:
+        if since < 0:
+            return bad_request("Token inválido. Deve ser zero ou positivo.")
+        
+        alteracoes = await aguardar(request, run_in_threadpool(getAlteracoesContatos, id_usuario_logado, since))
+        if alteracoes is None:
+            return server_error("Erro interno ao buscar alterações.")
+        
+        return ok("Alterações listadas com sucesso.", alteracoes)
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
+    except Exception as e:
+        return server_error(f"Erro ao listar alterações: {str(e)}")
+
+@router.get("/eventos")
+async def eventos_contatos(id_usuario_logado: int = Depends(decodificar_token)):
+    """
+    Abre um stream Server-Sent Events com as alterações dos contatos.
+    
+    Args:
+        id_usuario_logado (int): ID do usuário autenticado
+    
+    Returns:
+        StreamingResponse: Eventos 'contato' com {tipo, id, versao}; o id
+                           do evento SSE é a versão (token de /changes)
+    
+    Notes:
+        - Um evento 'resync' indica que o cliente ficou para trás e deve
+          sincronizar via /contatos/changes antes de reconectar
+    """
+    assinatura = hub_contatos.assinar(id_usuario_logado)
+    if assinatura is None:
+        return bad_request("Limite de conexões de eventos atingido.")
+    
+    async def gerar():
+        try:
+            while True:
+                try:
+                    evento = await asyncio.wait_for(assinatura.fila.get(), INTERVALO_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                if evento["tipo"] == "resync":
+                    yield "event: resync\ndata: {}\n\n"
+                    return
+                yield f"id: {evento['versao']}\nevent: contato\ndata: {json.dumps(evento)}\n\n"
+        finally:
+            hub_contatos.cancelar(assinatura)
+    
+    return StreamingResponse(
+        gerar(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/list/{contato_id}")
-async def obter_contato_ID(contato_id: int, id_usuario_logado: int = Depends(decodificar_token)):
+async def obter_contato_ID(request: Request, contato_id: int, fields: Optional[str] = None, id_usuario_logado: int = Depends(decodificar_token)):
     """
     Obtém um contato específico pelo ID.
     
     Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
         contato_id (int): ID do contato a ser recuperado
+        fields (str, optional): Colunas a retornar, separadas por vírgula
         id_usuario_logado (int): ID do usuário autenticado
     
     Returns:
@@ -73,7 +322,11 @@ async def obter_contato_ID(contato_id: int, id_usuario_logado: int = Depends(dec
         if contato_id <= 0:
             return bad_request("ID inválido. Deve ser positivo.")
         
-        contato = getContatoById(contato_id, id_usuario_logado)
+        erro, campos = validar_campos(fields)
+        if erro:
+            return bad_request(erro)
+        
+        contato = await aguardar(request, run_in_threadpool(getContatoById, contato_id, id_usuario_logado, campos))
         if contato is None:
             return server_error("Erro interno ao buscar contato.")
         
@@ -81,15 +334,64 @@ async def obter_contato_ID(contato_id: int, id_usuario_logado: int = Depends(dec
             return bad_request("Contato não encontrado ou acesso não autorizado.")
         
         return ok("Contato obtido com sucesso.", contato)
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
     except Exception as e:
         return server_error(f"Erro ao obter contato: {str(e)}")
 
+@router.post("/get")
+async def obter_contatos_IDs(request: Request, consulta: IdsContatos, fields: Optional[str] = None, id_usuario_logado: int = Depends(decodificar_token)):
+    """
+    Obtém vários contatos pelo ID em uma única requisição.
+    
+    Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
+        consulta (IdsContatos): IDs dos contatos
+        fields (str, optional): Colunas a retornar, separadas por vírgula
+                                ('id' é sempre incluído)
+        id_usuario_logado (int): ID do usuário autenticado
+    
+    Returns:
+        JSONResponse: 'contatos' (id -> dados do contato, ou null se não
+                      encontrado) e 'nao_encontrados' (IDs)
+    
+    Validations:
+        - Até MAX_IDS_CONSULTA IDs por requisição
+        - Contatos de outros usuários são tratados como não encontrados
+    """
+    try:
+        if not consulta.ids:
+            return bad_request("Informe ao menos um ID.")
+        if len(consulta.ids) > MAX_IDS_CONSULTA:
+            return bad_request(f"Muitos IDs. Máximo de {MAX_IDS_CONSULTA} por consulta.")
+        
+        erro, campos = validar_campos(fields)
+        if erro:
+            return bad_request(erro)
+        if campos and "id" not in campos:
+            campos = ("id",) + campos
+        
+        ids = list(dict.fromkeys(consulta.ids))
+        encontrados = await aguardar(request, run_in_threadpool(getContatosPorIds, id_usuario_logado, ids, campos))
+        if encontrados is None:
+            return server_error("Erro interno ao buscar contatos.")
+        
+        return ok("Contatos obtidos com sucesso.", {
+            "contatos": {contato_id: encontrados.get(contato_id) for contato_id in ids},
+            "nao_encontrados": [contato_id for contato_id in ids if contato_id not in encontrados]
+        })
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
+    except Exception as e:
+        return server_error(f"Erro ao obter contatos: {str(e)}")
+
 @router.post("/create")
-async def criar_contato(contato: Contato, id_usuario_logado: int = Depends(decodificar_token)):
+async def criar_contato(request: Request, contato: Contato, id_usuario_logado: int = Depends(decodificar_token)):
     """
     Cria um novo contato para o usuário autenticado.
     
     Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
         contato (Contato): Dados do novo contato
         id_usuario_logado (int): ID do usuário autenticado
     
@@ -103,44 +405,40 @@ async def criar_contato(contato: Contato, id_usuario_logado: int = Depends(decod
         - Verificação de duplicatas
     """
     try:
-        # Validação de nome
-        if not contato.nome or len(contato.nome) < 4:
-            return bad_request("Nome inválido. Deve ter pelo menos 4 caracteres.")
-        
-        # Validação de telefone
-        if not contato.telefone:
-            return bad_request("Telefone obrigatório.")
-        
-        telefone_limpo = re.sub(r"\D", "", contato.telefone)
-        if len(telefone_limpo) != 11:
-            return bad_request("Telefone inválido. Deve ter 11 números.")
-        
-        # Validação de email
-        if not contato.email or "@" not in contato.email:
-            return bad_request("Email inválido. Insira um email válido.")
+        erro, telefone_limpo = validar_criacao(contato)
+        if erro:
+            return bad_request(erro)
 
-        # Criação do contato no banco
-        novo_contato = postContato(
+        # Criação do contato no banco (fora do event loop, para que
+        # criações concorrentes possam ser agrupadas)
+        novo_contato = await aguardar(request, run_in_threadpool(
+            postContato,
             contato.nome,
             contato.email,
             telefone_limpo,
             id_usuario_logado
-        )
+        ))
         
         if novo_contato is None:
+            return server_error("Erro interno ao criar contato.")
+        
+        if not novo_contato:
             return bad_request("Telefone ou email já cadastrado.")
 
         return ok("Contato criado com sucesso.", novo_contato)
 
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
     except Exception as e:
         return server_error(f"Erro ao criar contato: {str(e)}")
 
 @router.put("/update/{contato_id}")
-async def atualizar_contato(contato_id: int, contato: Contato, id_usuario_logado: int = Depends(decodificar_token)):
+async def atualizar_contato(request: Request, contato_id: int, contato: Contato, id_usuario_logado: int = Depends(decodificar_token)):
     """
     Atualiza um contato existente.
     
     Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
         contato_id (int): ID do contato a ser atualizado
         contato (Contato): Dados atualizados do contato
         id_usuario_logado (int): ID do usuário autenticado
@@ -154,41 +452,32 @@ async def atualizar_contato(contato_id: int, contato: Contato, id_usuario_logado
         - Contato deve pertencer ao usuário
     """
     try:
-        if contato_id <= 0:
-            return bad_request("ID inválido. Deve ser positivo.")
-        
-        # Validação condicional do nome
-        if contato.nome and len(contato.nome) < 4:
-            return bad_request("Nome inválido. Deve ter pelo menos 4 caracteres.")
-        
-        # Validação condicional do telefone
-        telefone_limpo = None
-        if contato.telefone:
-            telefone_limpo = re.sub(r"\D", "", contato.telefone)
-            if len(telefone_limpo) != 11:
-                return bad_request("Telefone inválido. Deve ter 11 números.")
-        
-        # Validação condicional do email
-        if contato.email and '@' not in contato.email:
-            return bad_request("Email inválido. Deve conter '@'.")
+        erro, telefone_limpo = validar_atualizacao(contato_id, contato)
+        if erro:
+            return bad_request(erro)
 
         # Atualização do contato
-        sucesso = updateContato(contato_id, id_usuario_logado, contato.nome, contato.email, telefone_limpo)
+        sucesso = await aguardar(request, run_in_threadpool(
+            updateContato, contato_id, id_usuario_logado, contato.nome, contato.email, telefone_limpo
+        ))
         
         if not sucesso:
             return bad_request("Contato não encontrado ou acesso não autorizado.")
         
         return ok("Contato atualizado com sucesso.")
     
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
     except Exception as e:
         return server_error(f"Erro ao atualizar contato: {str(e)}")
 
 @router.delete("/delete/{contato_id}")
-async def excluir_contato(contato_id: int, id_usuario_logado: int = Depends(decodificar_token)):
+async def excluir_contato(request: Request, contato_id: int, id_usuario_logado: int = Depends(decodificar_token)):
     """
     Exclui um contato existente.
     
     Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
         contato_id (int): ID do contato a ser excluído
         id_usuario_logado (int): ID do usuário autenticado
     
@@ -204,11 +493,368 @@ async def excluir_contato(contato_id: int, id_usuario_logado: int = Depends(deco
             return bad_request("ID inválido. Deve ser positivo.")
         
         # Exclusão do contato
-        sucesso = deleteContato(contato_id, id_usuario_logado)
+        sucesso = await aguardar(request, run_in_threadpool(deleteContato, contato_id, id_usuario_logado))
         
         if not sucesso:
             return bad_request("Contato não encontrado ou acesso não autorizado.")
         
         return ok("Contato deletado com sucesso.")
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
+    except Exception as e:
+        return server_error(f"Erro ao excluir contato: {str(e)}")
+
+@router.post("/batch")
+async def executar_lote(request: Request, lote: LoteContatos, id_usuario_logado: int = Depends(decodificar_token)):
+    """
+    Executa várias operações de contato em uma única requisição.
+    
+    Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
+        lote (LoteContatos): Operações ordenadas e modo de execução
+        id_usuario_logado (int): ID do usuário autenticado
+    
+    Returns:
+        JSONResponse: Um resultado por operação, na ordem recebida
+    
+    Validations:
+        - Mesmas regras das rotas create/update/delete
+        - No modo transacional, qualquer operação inválida rejeita o lote
+        - No modo não transacional, operações inválidas são reportadas e
+          as demais executadas normalmente
+    """
+    try:
+        if not lote.operacoes:
+            return bad_request("Lote vazio. Informe ao menos uma operação.")
+        if len(lote.operacoes) > MAX_OPERACOES_LOTE:
+            return bad_request(f"Lote muito grande. Máximo de {MAX_OPERACOES_LOTE} operações.")
+        
+        # Valida todas as operações antes de acessar o banco
+        validas = []
+        resultados = [None] * len(lote.operacoes)
+        for indice, op in enumerate(lote.operacoes):
+            contato = op.contato or Contato()
+            telefone_limpo = None
+            if op.operacao == "create":
+                erro, telefone_limpo = validar_criacao(contato)
+            elif op.operacao == "update":
+                erro, telefone_limpo = validar_atualizacao(op.id, contato)
+            else:
+                erro = "ID inválido. Deve ser positivo." if op.id is None or op.id <= 0 else None
+            
+            if erro:
+                if lote.transacional:
+                    return bad_request(f"Operação {indice}: {erro}")
+                resultados[indice] = {"indice": indice, "operacao": op.operacao, "sucesso": False,
+                                      "mensagem": erro, "data": None}
+                continue
+            
+            validas.append((indice, {
+                "operacao": op.operacao,
+                "id": op.id,
+                "nome": contato.nome,
+                "email": contato.email,
+                "telefone": telefone_limpo
+            }))
+        
+        if validas:
+            executadas = await aguardar(request, run_in_threadpool(
+                executarLoteContatos, id_usuario_logado, [op for _, op in validas], lote.transacional
+            ))
+            if executadas is None:
+                return server_error("Erro interno ao executar lote.")
+            for (indice, _), resultado in zip(validas, executadas):
+                resultado["indice"] = indice
+                resultados[indice] = resultado
+        
+        return ok("Lote executado.", resultados)
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
+    except Exception as e:
+        return server_error(f"Erro ao executar lote: {str(e)}")
+
+@router.get("/duplicates")
+async def listar_duplicados(request: Request, limiar: float = LIMIAR_PADRAO, id_usuario_logado: int = Depends(decodificar_token)):
+    """
+    Lista contatos provavelmente duplicados do usuário autenticado.
+    
+    Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
+        limiar (float): Nota mínima (0 a 1) para considerar um par duplicado
+        id_usuario_logado (int): ID do usuário autenticado
+    
+    Returns:
+        JSONResponse: 'pares' (a, b, nota, motivos) e 'grupos' de IDs
+    
+    Notes:
+        - A comparação usa blocos (telefone, email, fonética do nome) e
+          roda fora do event loop (ver duplicados.py)
+    """
+    try:
+        if not 0 < limiar <= 1:
+            return bad_request("Limiar inválido. Deve estar entre 0 e 1.")
+        
+        contatos = await aguardar(request, run_in_threadpool(getContatos, id_usuario_logado, ("id", "nome", "email", "telefone"), True))
+        if contatos is None:
+            return server_error("Erro interno ao buscar contatos.")
+        
+        duplicados = await aguardar(request, run_in_threadpool(encontrar_duplicados, contatos, limiar))
+        return ok("Duplicados listados com sucesso.", duplicados)
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
+    except Exception as e:
+        return server_error(f"Erro ao listar duplicados: {str(e)}")
+
+@router.post("/duplicates/merge")
+async def mesclar_duplicados(request: Request, mescla: MesclaContatos, id_usuario_logado: int = Depends(decodificar_token)):
+    """
+    Mescla contatos duplicados: mantém um e exclui os demais.
+    
+    Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
+        mescla (MesclaContatos): Contato mantido, duplicados e campos finais
+        id_usuario_logado (int): ID do usuário autenticado
+    
+    Returns:
+        JSONResponse: ID mantido e IDs removidos, ou mensagem de erro
+    
+    Validations:
+        - IDs positivos, sem repetição e sem o contato mantido em 'remover'
+        - Campos finais seguem as regras de atualização
+        - Todos os contatos devem pertencer ao usuário (senão nada muda)
+    """
+    try:
+        remover = list(dict.fromkeys(mescla.remover))
+        if not remover:
+            return bad_request("Informe ao menos um contato para remover.")
+        if len(remover) > MAX_MESCLAGEM:
+            return bad_request(f"Muitos contatos. Máximo de {MAX_MESCLAGEM} por mesclagem.")
+        if mescla.manter in remover or any(contato_id <= 0 for contato_id in remover):
+            return bad_request("IDs inválidos para mesclagem.")
+        
+        contato = mescla.contato or Contato()
+        erro, telefone_limpo = validar_atualizacao(mescla.manter, contato)
+        if erro:
+            return bad_request(erro)
+        
+        resultado = await aguardar(request, run_in_threadpool(
+            mesclarContatos, id_usuario_logado, mescla.manter, remover,
+            contato.nome, contato.email, telefone_limpo
+        ))
+        if resultado is None:
+            return server_error("Erro interno ao mesclar contatos.")
+        if not resultado:
+            return bad_request("Contato não encontrado ou acesso não autorizado.")
+        
+        return ok("Contatos mesclados com sucesso.", resultado)
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
+    except Exception as e:
+        return server_error(f"Erro ao mesclar contatos: {str(e)}")
+
+@router.post("/lookup")
+async def identificar_telefones(request: Request, consulta: ConsultaTelefones, id_usuario_logado: int = Depends(decodificar_token)):
+    """
+    Identifica vários telefones de uma vez (identificação de chamadas).
+    
+    Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
+        consulta (ConsultaTelefones): Telefones brutos, em qualquer formato
+        id_usuario_logado (int): ID do usuário autenticado
+    
+    Returns:
+        JSONResponse: 'encontrados' (telefone enviado -> {id, nome,
+                      telefone}), 'nao_encontrados' e 'invalidos'
+    
+    Validations:
+        - Até MAX_TELEFONES_CONSULTA telefones por requisição
+        - Telefones que não normalizam para 11 dígitos vão para 'invalidos'
+    """
+    try:
+        if not consulta.telefones:
+            return bad_request("Informe ao menos um telefone.")
+        if len(consulta.telefones) > MAX_TELEFONES_CONSULTA:
+            return bad_request(f"Muitos telefones. Máximo de {MAX_TELEFONES_CONSULTA} por consulta.")
+        
+        normalizados = {}
+        invalidos = []
+        for telefone in consulta.telefones:
+            limpo = normalizar_telefone(telefone)
+            if limpo is None:
+                invalidos.append(telefone)
+            else:
+                normalizados[telefone] = limpo
+        
+        encontrados = {}
+        if normalizados:
+            unicos = list(dict.fromkeys(normalizados.values()))
+            encontrados = await aguardar(request, run_in_threadpool(getContatosPorTelefones, id_usuario_logado, unicos))
+            if encontrados is None:
+                return server_error("Erro interno ao identificar telefones.")
+        
+        return ok("Telefones identificados com sucesso.", {
+            "encontrados": {bruto: encontrados[limpo] for bruto, limpo in normalizados.items() if limpo in encontrados},
+            "nao_encontrados": [bruto for bruto, limpo in normalizados.items() if limpo not in encontrados],
+            "invalidos": invalidos
+        })
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
+    except Exception as e:
+        return server_error(f"Erro ao identificar telefones: {str(e)}")
+
+# =============================================================================
+#                           ETIQUETAS
+# =============================================================================
+
+@router.get("/tags")
+async def listar_etiquetas(request: Request, id_usuario_logado: int = Depends(decodificar_token)):
+    """
+    Lista as etiquetas do usuário com a quantidade de contatos de cada uma.
+    
+    Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
+        id_usuario_logado (int): ID do usuário autenticado
+    
+    Returns:
+        JSONResponse: Lista de {id, nome, contatos} em ordem de nome
+    """
+    try:
+        etiquetas = await aguardar(request, run_in_threadpool(getEtiquetas, id_usuario_logado))
+        if etiquetas is None:
+            return server_error("Erro interno ao listar etiquetas.")
+        
+        return ok("Etiquetas listadas com sucesso.", etiquetas)
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
+    except Exception as e:
+        return server_error(f"Erro ao listar etiquetas: {str(e)}")
+
+@router.post("/tags/create")
+async def criar_etiqueta(request: Request, etiqueta: Etiqueta, id_usuario_logado: int = Depends(decodificar_token)):
+    """
+    Cria uma etiqueta para o usuário autenticado.
+    
+    Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
+        etiqueta (Etiqueta): Nome da etiqueta
+        id_usuario_logado (int): ID do usuário autenticado
+    
+    Returns:
+        JSONResponse: {id, nome} da etiqueta criada ou mensagem de erro
+    
+    Validations:
+        - Nome com até 40 letras, números, '_' ou '-' (salvo em minúsculas)
+        - Nome único por usuário
+    """
+    try:
+        nome = normalizar_nome(etiqueta.nome)
+        if nome is None:
+            return bad_request("Nome inválido. Use até 40 letras, números, '_' ou '-' (e não AND, OR ou NOT).")
+        
+        criada = await aguardar(request, run_in_threadpool(postEtiqueta, id_usuario_logado, nome))
+        if criada is None:
+            return server_error("Erro interno ao criar etiqueta.")
+        
+        if not criada:
+            return bad_request("Já existe uma etiqueta com esse nome.")
+        
+        return ok("Etiqueta criada com sucesso.", criada)
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
+    except Exception as e:
+        return server_error(f"Erro ao criar etiqueta: {str(e)}")
+
+@router.delete("/tags/delete/{etiqueta_id}")
+async def excluir_etiqueta(request: Request, etiqueta_id: int, id_usuario_logado: int = Depends(decodificar_token)):
+    """
+    Exclui uma etiqueta e a retira de todos os contatos.
+    
+    Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
+        etiqueta_id (int): ID da etiqueta
+        id_usuario_logado (int): ID do usuário autenticado
+    
+    Returns:
+        JSONResponse: Confirmação ou mensagem de erro
+    """
+    try:
+        if etiqueta_id <= 0:
+            return bad_request("ID inválido. Deve ser positivo.")
+        
+        excluida = await aguardar(request, run_in_threadpool(deleteEtiqueta, id_usuario_logado, etiqueta_id))
+        if excluida is None:
+            return server_error("Erro interno ao excluir etiqueta.")
+        
+        if not excluida:
+            return bad_request("Etiqueta não encontrada ou acesso não autorizado.")
+        
+        return ok("Etiqueta excluída com sucesso.", {"id": etiqueta_id})
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
+    except Exception as e:
+        return server_error(f"Erro ao excluir etiqueta: {str(e)}")
+
+async def _alterar_etiqueta(request: Request, etiqueta_id: int, contatos: IdsContatos, id_usuario_logado: int, remover: bool):
+    """Associa ou retira a etiqueta dos contatos informados."""
+    if etiqueta_id <= 0:
+        return bad_request("ID inválido. Deve ser positivo.")
+    if not contatos.ids:
+        return bad_request("Informe ao menos um contato.")
+    if len(contatos.ids) > MAX_CONTATOS_ETIQUETA:
+        return bad_request(f"Muitos contatos. Máximo de {MAX_CONTATOS_ETIQUETA} por requisição.")
+    
+    ids = list(dict.fromkeys(contatos.ids))
+    resultado = await aguardar(request, run_in_threadpool(etiquetarContatos, id_usuario_logado, etiqueta_id, ids, remover))
+    if resultado is None:
+        return server_error("Erro interno ao alterar etiqueta.")
+    
+    if not resultado:
+        return bad_request("Etiqueta não encontrada ou acesso não autorizado.")
+    
+    return ok("Etiqueta retirada com sucesso." if remover else "Etiqueta associada com sucesso.", resultado)
+
+@router.post("/tags/{etiqueta_id}/add")
+async def associar_etiqueta(request: Request, etiqueta_id: int, contatos: IdsContatos, id_usuario_logado: int = Depends(decodificar_token)):
+    """
+    Associa uma etiqueta a vários contatos.
+    
+    Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
+        etiqueta_id (int): ID da etiqueta
+        contatos (IdsContatos): IDs dos contatos
+        id_usuario_logado (int): ID do usuário autenticado
+    
+    Returns:
+        JSONResponse: 'alterados' e 'nao_encontrados' (IDs)
+    
+    Validations:
+        - Até MAX_CONTATOS_ETIQUETA contatos por requisição
+        - Contatos de outros usuários são tratados como não encontrados
+    """
+    try:
+        return await _alterar_etiqueta(request, etiqueta_id, contatos, id_usuario_logado, remover=False)
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
+    except Exception as e:
+        return server_error(f"Erro ao associar etiqueta: {str(e)}")
+
+@router.post("/tags/{etiqueta_id}/remove")
+async def retirar_etiqueta(request: Request, etiqueta_id: int, contatos: IdsContatos, id_usuario_logado: int = Depends(decodificar_token)):
+    """
+    Retira uma etiqueta de vários contatos.
+    
+    Args:
+        request (Request): Requisição (para detectar desconexão do cliente)
+        etiqueta_id (int): ID da etiqueta
+        contatos (IdsContatos): IDs dos contatos
+        id_usuario_logado (int): ID do usuário autenticado
+    
+    Returns:
+        JSONResponse: 'alterados' e 'nao_encontrados' (IDs)
+    """
+    try:
+        return await _alterar_etiqueta(request, etiqueta_id, contatos, id_usuario_logado, remover=True)
+    except PrazoExpirado:
+        return prazo_esgotado("Tempo limite da requisição esgotado.")
     except Exception as e:
-        return server_error(f"Erro ao excluir contato: {str(e)}")
\ No newline at end of file
+        return server_error(f"Erro ao retirar etiqueta: {str(e)}")
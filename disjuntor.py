@@ -0,0 +1,125 @@
+"""
+Módulo Disjuntor (Circuit Breaker) - Proteção contra Quedas do Banco
+
+Interrompe o acesso ao banco de dados quando falhas consecutivas
+indicam indisponibilidade, rejeitando requisições imediatamente em vez
+de esperar o timeout de conexão em cada uma.
+
+Autor: Henrique Teixeira
+Versão: 1.0.0
+Data: 2024-01-15
+
+Estados:
+    - fechado: chamadas passam normalmente; falhas são contadas
+    - aberto: chamadas são rejeitadas sem tocar no banco
+    - semi_aberto: após o intervalo de sonda, uma única chamada de teste
+      é liberada; sucesso fecha o disjuntor, falha o reabre
+"""
+
+from dotenv import load_dotenv
+import threading
+import time
+import os
+
+# =============================================================================
+#                           CONFIGURAÇÃO
+# =============================================================================
+
+load_dotenv()
+
+# Falhas consecutivas até abrir e segundos até liberar uma sonda
+DB_BREAKER_THRESHOLD = int(os.getenv("DB_BREAKER_THRESHOLD", 5))
+DB_BREAKER_PROBE_INTERVAL = float(os.getenv("DB_BREAKER_PROBE_INTERVAL", 10))
+
+FECHADO = "fechado"
+ABERTO = "aberto"
+SEMI_ABERTO = "semi_aberto"
+
+# =============================================================================
+#                           DISJUNTOR
+# =============================================================================
+
+class DisjuntorAberto(Exception):
+    """Levantada quando o disjuntor rejeita uma chamada."""
+
+class Disjuntor:
+    """
+    Disjuntor thread-safe com estados fechado, aberto e semi-aberto.
+
+    Attributes:
+        limite_falhas (int): Falhas consecutivas que abrem o disjuntor
+        intervalo_sonda (float): Segundos em aberto antes de uma sonda
+    """
+
+    def __init__(self, limite_falhas: int, intervalo_sonda: float):
+        self.limite_falhas = limite_falhas
+        self.intervalo_sonda = intervalo_sonda
+        self._lock = threading.Lock()
+        self._estado = FECHADO
+        self._falhas = 0
+        self._aberto_em = 0.0
+        self._sonda_em_andamento = False
+        self._rejeitadas = 0
+        self._aberturas = 0
+
+    def permitir(self):
+        """
+        Verifica se uma chamada pode prosseguir.
+
+        Raises:
+            DisjuntorAberto: Se o disjuntor estiver aberto ou se já houver
+                             uma sonda em andamento no estado semi-aberto
+        """
+        with self._lock:
+            if self._estado == FECHADO:
+                return
+            if self._estado == ABERTO and time.monotonic() - self._aberto_em >= self.intervalo_sonda:
+                self._estado = SEMI_ABERTO
+            if self._estado == SEMI_ABERTO and not self._sonda_em_andamento:
+                self._sonda_em_andamento = True
+                return
+            self._rejeitadas += 1
+            raise DisjuntorAberto("Banco de dados indisponível.")
+
+    def registrar_sucesso(self):
+        """Zera as falhas e fecha o disjuntor."""
+        with self._lock:
+            self._falhas = 0
+            self._estado = FECHADO
+            self._sonda_em_andamento = False
+
+    def registrar_falha(self):
+        """Conta uma falha e abre o disjuntor ao atingir o limite."""
+        with self._lock:
+            self._falhas += 1
+            if self._estado == SEMI_ABERTO or self._falhas >= self.limite_falhas:
+                if self._estado != ABERTO:
+                    self._aberturas += 1
+                self._estado = ABERTO
+                self._aberto_em = time.monotonic()
+                self._sonda_em_andamento = False
+
+    def liberar_sonda(self):
+        """Libera a sonda sem veredito (ex.: erro não relacionado ao banco)."""
+        with self._lock:
+            self._sonda_em_andamento = False
+
+    def estado(self):
+        """
+        Retorna um retrato do disjuntor para monitoramento.
+
+        Returns:
+            dict: estado, falhas consecutivas, rejeições e aberturas
+        """
+        with self._lock:
+            return {
+                "estado": self._estado,
+                "falhas_consecutivas": self._falhas,
+                "limite_falhas": self.limite_falhas,
+                "intervalo_sonda": self.intervalo_sonda,
+                "rejeitadas": self._rejeitadas,
+                "aberturas": self._aberturas,
+            }
+
+# Disjuntor compartilhado do banco de dados
+disjuntor_banco = Disjuntor(DB_BREAKER_THRESHOLD, DB_BREAKER_PROBE_INTERVAL)
@@ -0,0 +1,278 @@
+"""
+Módulo de Detecção de Contatos Quase Duplicados
+
+Encontra pares de contatos que provavelmente representam a mesma pessoa
+(diferenças de formatação, variações de nome, mesma pessoa com dois
+emails) sem comparar todos os pares da agenda.
+
+Autor: Henrique Teixeira
+Versão: 1.0.0
+Data: 2024-01-15
+
+Funcionamento (blocking):
+    - Cada contato gera chaves de bloco: sufixo do telefone normalizado,
+      parte local do email normalizada e chave fonética do nome
+    - Só contatos que compartilham um bloco são comparados
+    - Blocos maiores que MAX_BLOCO (nomes muito comuns) usam vizinhança
+      ordenada: cada contato só é comparado com os JANELA seguintes
+    - Cada par candidato recebe uma nota entre 0 e 1; pares acima do
+      limiar são agrupados (união-busca) em grupos de duplicados
+"""
+
+from functools import lru_cache
+import unicodedata
+import re
+
+# =============================================================================
+#                           CONFIGURAÇÃO
+# =============================================================================
+
+# Dígitos finais do telefone usados como chave (ignora DDD/código do país)
+DIGITOS_SUFIXO = 8
+MAX_BLOCO = 50
+JANELA = 5
+LIMIAR_PADRAO = 0.85
+
+# =============================================================================
+#                           NORMALIZAÇÃO
+# =============================================================================
+
+def sem_acentos(texto: str):
+    """Remove acentos e converte para minúsculas."""
+    decomposto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+def normalizar_nome(nome: str):
+    """Nome sem acentos, pontuação e espaços repetidos."""
+    return " ".join(re.sub(r"[^a-z ]", " ", sem_acentos(nome)).split())
+
+def sufixo_telefone(telefone: str):
+    """Últimos DIGITOS_SUFIXO dígitos do telefone (ou None se curto)."""
+    digitos = re.sub(r"\D", "", telefone or "")
+    return digitos[-DIGITOS_SUFIXO:] if len(digitos) >= DIGITOS_SUFIXO else None
+
+def local_email(email: str):
+    """
+    Parte local do email normalizada: minúsculas, sem '+etiqueta' e sem
+    pontos (joao.silva+trabalho@x.com -> joaosilva).
+    """
+    if not email or "@" not in email:
+        return None
+    local = email.lower().split("@", 1)[0].split("+", 1)[0].replace(".", "")
+    return local or None
+
+_REGRAS_FONETICAS = [(re.compile(padrao), troca) for padrao, troca in [
+    (r"ph", "f"), (r"ch", "x"), (r"sh", "x"), (r"lh", "l"), (r"nh", "n"),
+    (r"qu", "c"), (r"gu(?=[ei])", "g"), (r"h", ""), (r"[kq]", "c"), (r"c(?=[ei])", "s"),
+    (r"z", "s"), (r"y", "i"), (r"w", "v"), (r"x", "s"), (r"ss", "s"),
+]]
+
+# Nomes se repetem muito entre contatos: a chave de cada palavra é calculada uma vez
+@lru_cache(maxsize=65536)
+def fonetica(palavra: str):
+    """
+    Chave fonética simplificada para nomes em português: aplica regras de
+    equivalência sonora, mantém a primeira letra e remove as vogais e
+    letras repetidas seguintes (Luiz/Luis, Thiago/Tiago, Raphael/Rafael).
+    """
+    palavra = sem_acentos(palavra)
+    for padrao, troca in _REGRAS_FONETICAS:
+        palavra = padrao.sub(troca, palavra)
+    if not palavra:
+        return ""
+    chave = palavra[0]
+    for letra in palavra[1:]:
+        if letra in "aeiou" or letra == chave[-1]:
+            continue
+        chave += letra
+    return chave
+
+def chave_fonetica_nome(nome_normalizado: str):
+    """Chave fonética do primeiro e do último nome."""
+    partes = nome_normalizado.split()
+    if not partes:
+        return None
+    return fonetica(partes[0]) + "|" + fonetica(partes[-1])
+
+# =============================================================================
+#                           SIMILARIDADE
+# =============================================================================
+
+def jaro_winkler(a: str, b: str):
+    """Similaridade Jaro-Winkler entre duas strings (0 a 1)."""
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    alcance = max(len(a), len(b)) // 2 - 1
+    usados_b = [False] * len(b)
+    casados_a = []
+    for i, letra in enumerate(a):
+        inicio, fim = max(0, i - alcance), min(i + alcance + 1, len(b))
+        for j in range(inicio, fim):
+            if not usados_b[j] and b[j] == letra:
+                usados_b[j] = True
+                casados_a.append(letra)
+                break
+    m = len(casados_a)
+    if m == 0:
+        return 0.0
+    casados_b = [b[j] for j in range(len(b)) if usados_b[j]]
+    transposicoes = sum(x != y for x, y in zip(casados_a, casados_b)) / 2
+    jaro = (m / len(a) + m / len(b) + (m - transposicoes) / m) / 3
+    prefixo = 0
+    for x, y in zip(a[:4], b[:4]):
+        if x != y:
+            break
+        prefixo += 1
+    return jaro + prefixo * 0.1 * (1 - jaro)
+
+# Emails diferentes só contam como evidência se quase idênticos (erros de
+# digitação: joaosilva x joaosilav), com peso menor que um email igual.
+# Números diferentes (ana.silva.12 x ana.silva.13) indicam pessoas distintas
+SIMILARIDADE_MIN_EMAIL = 0.95
+PESO_EMAIL_SEMELHANTE = 0.8
+
+def pontuar(a: dict, b: dict, limiar: float = 0.0):
+    """
+    Nota de duplicidade de um par de contatos preparados.
+
+    A nota combina o nome (metade) com a melhor evidência de contato
+    (metade): telefone igual, email igual ou email quase idêntico. Só o
+    nome parecido nunca passa de 0.5.
+
+    Args:
+        a, b (dict): Contatos preparados
+        limiar (float): Permite abandonar cedo pares que não o atingem
+
+    Returns:
+        tuple: (nota entre 0 e 1, lista de motivos) ou (0.0, None) se
+               descartado antes do cálculo completo
+    """
+    telefone = 1.0 if a["telefone"] and a["telefone"] == b["telefone"] else 0.0
+    email = 1.0 if a["email"] and a["email"] == b["email"] else 0.0
+    contato = max(telefone, email)
+    # Filtro barato antes do Jaro-Winkler: só emails de tamanho próximo e
+    # com os mesmos dígitos podem ser "quase idênticos"
+    candidato_email = (contato < PESO_EMAIL_SEMELHANTE and a["email"] and b["email"]
+                       and abs(len(a["email"]) - len(b["email"])) <= 1
+                       and a["digitos_email"] == b["digitos_email"])
+    teto = max(contato, PESO_EMAIL_SEMELHANTE if candidato_email else 0.0)
+    if 0.5 + 0.5 * teto < limiar:
+        return 0.0, None
+
+    nome = jaro_winkler(a["nome"], b["nome"])
+    if 0.5 * nome + 0.5 * teto < limiar:
+        return 0.0, None
+
+    email_semelhante = False
+    if candidato_email and jaro_winkler(a["email"], b["email"]) >= SIMILARIDADE_MIN_EMAIL:
+        contato = PESO_EMAIL_SEMELHANTE
+        email_semelhante = True
+
+    motivos = []
+    if telefone:
+        motivos.append("telefone")
+    if email:
+        motivos.append("email")
+    if email_semelhante:
+        motivos.append("email_semelhante")
+    if nome >= 0.9:
+        motivos.append("nome")
+    nota = 0.5 * nome + 0.5 * contato + 0.1 * min(telefone, email)
+    return min(1.0, nota), motivos
+
+# =============================================================================
+#                           DETECÇÃO
+# =============================================================================
+
+def _preparar(contato_id, nome, email, telefone):
+    nome_normalizado = normalizar_nome(nome)
+    local = local_email(email)
+    return {
+        "id": contato_id,
+        "nome": nome_normalizado,
+        "email": local,
+        "digitos_email": re.sub(r"\D", "", local or ""),
+        "telefone": sufixo_telefone(telefone),
+        "fonetica": chave_fonetica_nome(nome_normalizado),
+    }
+
+def _pares_candidatos(blocos: dict):
+    """Gera pares (i, j) únicos dentro dos blocos."""
+    vistos = set()
+    for membros in blocos.values():
+        if len(membros) < 2:
+            continue
+        if len(membros) <= MAX_BLOCO:
+            for x in range(len(membros)):
+                for y in range(x + 1, len(membros)):
+                    par = (min(membros[x], membros[y]), max(membros[x], membros[y]))
+                    if par not in vistos:
+                        vistos.add(par)
+                        yield par
+        else:
+            # Vizinhança ordenada: membros já estão ordenados pela chave
+            for x in range(len(membros)):
+                for y in range(x + 1, min(x + 1 + JANELA, len(membros))):
+                    par = (min(membros[x], membros[y]), max(membros[x], membros[y]))
+                    if par not in vistos:
+                        vistos.add(par)
+                        yield par
+
+def encontrar_duplicados(registros, limiar: float = LIMIAR_PADRAO):
+    """
+    Encontra contatos quase duplicados de uma agenda.
+
+    Args:
+        registros (Registros): Contatos do usuário (precisa das colunas
+                               id, nome, email e telefone)
+        limiar (float): Nota mínima para considerar um par duplicado
+
+    Returns:
+        dict: 'pares' (a, b, nota, motivos; maior nota primeiro) e
+              'grupos' (listas de IDs possivelmente da mesma pessoa)
+    """
+    indice = {coluna: i for i, coluna in enumerate(registros.colunas)}
+    i_id, i_nome, i_email, i_tel = indice["id"], indice["nome"], indice["email"], indice["telefone"]
+    contatos = [_preparar(l[i_id], l[i_nome], l[i_email], l[i_tel]) for l in registros.linhas]
+
+    # Ordena para que a vizinhança dos blocos grandes seja significativa
+    ordem = sorted(range(len(contatos)), key=lambda i: (contatos[i]["nome"], contatos[i]["telefone"] or ""))
+    blocos = {}
+    for i in ordem:
+        contato = contatos[i]
+        if contato["telefone"]:
+            blocos.setdefault(("t", contato["telefone"]), []).append(i)
+        if contato["email"]:
+            blocos.setdefault(("e", contato["email"]), []).append(i)
+        if contato["fonetica"]:
+            blocos.setdefault(("n", contato["fonetica"]), []).append(i)
+
+    pares = []
+    pai = {}
+
+    def raiz(x):
+        pai.setdefault(x, x)
+        while pai[x] != x:
+            pai[x] = pai[pai[x]]
+            x = pai[x]
+        return x
+
+    for i, j in _pares_candidatos(blocos):
+        nota, motivos = pontuar(contatos[i], contatos[j], limiar)
+        if motivos is None or nota < limiar:
+            continue
+        a, b = contatos[i]["id"], contatos[j]["id"]
+        pares.append({"a": min(a, b), "b": max(a, b), "nota": round(nota, 4), "motivos": motivos})
+        pai[raiz(a)] = raiz(b)
+
+    grupos = {}
+    for contato_id in list(pai):
+        grupos.setdefault(raiz(contato_id), set()).add(contato_id)
+
+    pares.sort(key=lambda par: -par["nota"])
+    return {
+        "pares": pares,
+        "grupos": sorted(sorted(grupo) for grupo in grupos.values() if len(grupo) > 1),
+    }
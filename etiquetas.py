@@ -0,0 +1,290 @@
+"""
+Módulo de Etiquetas - Índice Invertido e Expressões de Filtro
+
+Mantém, por usuário, as listas de contatos de cada etiqueta em memória
+para que /contatos/list?tags=... resolva o filtro sem varrer a agenda:
+o custo é proporcional às etiquetas envolvidas e ao resultado, e só os
+contatos resultantes são lidos do banco.
+
+Autor: Henrique Teixeira
+Versão: 1.0.0
+Data: 2024-01-15
+
+Funcionamento:
+    - Cada agenda (usuário) em memória guarda os IDs de todos os
+      contatos e um conjunto de IDs por etiqueta, junto com a versão
+      dos contatos (usuarios.versao_contatos) em que foi carregada
+    - Toda escrita de contatos ou etiquetas incrementa a versão; as
+      escritas deste processo são aplicadas na agenda após o commit
+      quando a versão é a seguinte à da agenda; fora de ordem (ou
+      escritas de outro processo), a agenda é descartada e recarregada
+      na próxima consulta, que sempre compara a versão do banco
+    - AND começa pelo menor conjunto e subtrai os NOT; OR une os
+      conjuntos; só NOT isolado custa o tamanho da agenda
+
+Expressões (parâmetro tags):
+    familia
+    familia AND NOT trabalho
+    (amigos OR trabalho) AND vip
+    - Operadores AND, OR e NOT (maiúsculas ou minúsculas), parênteses
+    - Etiqueta inexistente equivale a um conjunto vazio
+"""
+
+from collections import OrderedDict
+from dotenv import load_dotenv
+import threading
+import re
+import os
+
+# =============================================================================
+#                           CONFIGURAÇÃO
+# =============================================================================
+
+load_dotenv()
+
+# Agendas mantidas em memória (as menos usadas são descartadas)
+ETIQUETAS_CACHE_USUARIOS = int(os.getenv("ETIQUETAS_CACHE_USUARIOS", 1000))
+
+# Termos (etiquetas e operadores) aceitos em uma expressão
+MAX_TERMOS_EXPRESSAO = 50
+
+PADRAO_NOME = re.compile(r"^[\w-]{1,40}$")
+OPERADORES = {"and", "or", "not"}
+_TOKENS = re.compile(r"\(|\)|[^\s()]+")
+
+def normalizar_nome(nome: str):
+    """Nome de etiqueta normalizado (minúsculas) ou None se inválido."""
+    nome = (nome or "").strip().lower()
+    if not PADRAO_NOME.match(nome) or nome in OPERADORES:
+        return None
+    return nome
+
+# =============================================================================
+#                           EXPRESSÕES
+# =============================================================================
+
+def analisar_expressao(texto: str):
+    """
+    Converte a expressão de filtro em árvore.
+
+    Args:
+        texto (str): Expressão (ex.: 'familia AND NOT trabalho')
+
+    Returns:
+        tuple: (erro, arvore) - erro é None se válida; a árvore usa nós
+               ('nome', etiqueta), ('not', no), ('and', [nos]), ('or', [nos])
+    """
+    tokens = _TOKENS.findall(texto or "")
+    if not tokens:
+        return "Expressão de etiquetas vazia.", None
+    if len(tokens) > MAX_TERMOS_EXPRESSAO:
+        return f"Expressão muito longa. Máximo de {MAX_TERMOS_EXPRESSAO} termos.", None
+
+    posicao = 0
+
+    def atual():
+        return tokens[posicao].lower() if posicao < len(tokens) else None
+
+    def expressao():
+        nonlocal posicao
+        filhos = [termo()]
+        while atual() == "or":
+            posicao += 1
+            filhos.append(termo())
+        return filhos[0] if len(filhos) == 1 else ("or", filhos)
+
+    def termo():
+        nonlocal posicao
+        filhos = [fator()]
+        while atual() == "and":
+            posicao += 1
+            filhos.append(fator())
+        return filhos[0] if len(filhos) == 1 else ("and", filhos)
+
+    def fator():
+        nonlocal posicao
+        token = atual()
+        if token is None:
+            raise ValueError("Expressão incompleta.")
+        posicao += 1
+        if token == "not":
+            return ("not", fator())
+        if token == "(":
+            no = expressao()
+            if atual() != ")":
+                raise ValueError("Parêntese não fechado.")
+            posicao += 1
+            return no
+        nome = normalizar_nome(token)
+        if nome is None:
+            raise ValueError(f"Termo inválido: '{tokens[posicao - 1]}'.")
+        return ("nome", nome)
+
+    try:
+        arvore = expressao()
+        if posicao != len(tokens):
+            raise ValueError(f"Termo inesperado: '{tokens[posicao]}'.")
+    except ValueError as erro:
+        return str(erro), None
+    return None, arvore
+
+def _avaliar(no, agenda):
+    """Conjunto de IDs de contatos que satisfazem o nó."""
+    tipo = no[0]
+    if tipo == "nome":
+        return agenda.etiquetas.get(agenda.nomes.get(no[1]), frozenset())
+    if tipo == "not":
+        return agenda.contatos - _avaliar(no[1], agenda)
+    if tipo == "or":
+        return set().union(*(_avaliar(filho, agenda) for filho in no[1]))
+
+    # AND: interseção a partir do menor conjunto, depois subtrai os NOT
+    # (diferença de um conjunto por vez: custa o menor dos dois lados)
+    positivos = [_avaliar(filho, agenda) for filho in no[1] if filho[0] != "not"]
+    negativos = [_avaliar(filho[1], agenda) for filho in no[1] if filho[0] == "not"]
+    if positivos:
+        positivos.sort(key=len)
+        resultado = positivos[0].intersection(*positivos[1:])
+    else:
+        resultado = agenda.contatos
+    for negativo in negativos:
+        resultado = resultado - negativo
+    return resultado
+
+# =============================================================================
+#                           ÍNDICE POR USUÁRIO
+# =============================================================================
+
+class Agenda:
+    """
+    Contatos e etiquetas de um usuário, na versão em que foram lidos.
+
+    Attributes:
+        versao (int): usuarios.versao_contatos correspondente
+        contatos (set): IDs de todos os contatos
+        etiquetas (dict): etiqueta_id -> set de IDs de contatos
+        nomes (dict): nome -> etiqueta_id
+    """
+    __slots__ = ("versao", "contatos", "etiquetas", "nomes")
+
+    def __init__(self, versao: int, contatos: set, etiquetas: dict, nomes: dict):
+        self.versao = versao
+        self.contatos = contatos
+        self.etiquetas = etiquetas
+        self.nomes = nomes
+
+    def remover_contato(self, contato_id: int):
+        self.contatos.discard(contato_id)
+        for membros in self.etiquetas.values():
+            membros.discard(contato_id)
+
+    def remover_etiqueta(self, etiqueta_id: int):
+        self.etiquetas.pop(etiqueta_id, None)
+        for nome, identificador in list(self.nomes.items()):
+            if identificador == etiqueta_id:
+                del self.nomes[nome]
+
+class IndiceEtiquetas:
+    """
+    Agendas em memória (LRU) mantidas atualizadas pelas escritas.
+
+    Notes:
+        - Consultas e alterações rodam sob o mesmo lock; as operações de
+          conjunto são rápidas e a carga do banco acontece fora dele
+    """
+
+    def __init__(self, max_usuarios: int):
+        self.max_usuarios = max_usuarios
+        self._agendas = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.cargas = 0
+        self.descartes = 0
+
+    def consultar(self, usuario_id: int, versao: int, carregar, consulta):
+        """
+        Executa consulta(agenda) sobre a agenda da versão informada.
+
+        Args:
+            usuario_id (int): ID do usuário
+            versao (int): Versão atual dos contatos no banco
+            carregar (callable): Lê (contatos, etiquetas, nomes) do banco
+                                 na mesma versão
+            consulta (callable): Recebe a Agenda; o retorno não deve
+                                 expor os conjuntos internos
+
+        Returns:
+            Resultado de consulta(agenda)
+        """
+        with self._lock:
+            agenda = self._agendas.get(usuario_id)
+            if agenda is not None and agenda.versao == versao:
+                self._agendas.move_to_end(usuario_id)
+                self.acertos += 1
+                return consulta(agenda)
+
+        agenda = Agenda(versao, *carregar())
+        with self._lock:
+            self.cargas += 1
+            atual = self._agendas.get(usuario_id)
+            if atual is None or atual.versao < versao:
+                self._agendas[usuario_id] = agenda
+                self._agendas.move_to_end(usuario_id)
+                while len(self._agendas) > self.max_usuarios:
+                    self._agendas.popitem(last=False)
+            return consulta(agenda)
+
+    def aplicar(self, usuario_id: int, versao: int, alteracao=None):
+        """
+        Aplica uma escrita confirmada na agenda em memória.
+
+        Args:
+            usuario_id (int): ID do usuário
+            versao (int): Versão gravada pela escrita
+            alteracao (callable, optional): Recebe a Agenda e a altera
+
+        Notes:
+            - Se a agenda não está na versão anterior (outra escrita ainda
+              não aplicada), ela é descartada em vez de ficar incoerente
+        """
+        with self._lock:
+            agenda = self._agendas.get(usuario_id)
+            if agenda is None or agenda.versao >= versao:
+                return
+            if agenda.versao != versao - 1:
+                del self._agendas[usuario_id]
+                self.descartes += 1
+                return
+            if alteracao is not None:
+                alteracao(agenda)
+            agenda.versao = versao
+
+    def descartar(self, usuario_id: int):
+        """Descarta a agenda (recarregada na próxima consulta)."""
+        with self._lock:
+            if self._agendas.pop(usuario_id, None) is not None:
+                self.descartes += 1
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "agendas": len(self._agendas),
+                "acertos": self.acertos,
+                "cargas": self.cargas,
+                "descartes": self.descartes,
+            }
+
+def filtrar(agenda: Agenda, arvore):
+    """IDs (ordenados) dos contatos que satisfazem a expressão."""
+    return sorted(_avaliar(arvore, agenda))
+
+def resumo(agenda: Agenda):
+    """Etiquetas do usuário com a quantidade de contatos de cada uma."""
+    return sorted(
+        ({"id": etiqueta_id, "nome": nome, "contatos": len(agenda.etiquetas.get(etiqueta_id, ()))}
+         for nome, etiqueta_id in agenda.nomes.items()),
+        key=lambda etiqueta: etiqueta["nome"]
+    )
+
+# Índice compartilhado do processo
+indice_etiquetas = IndiceEtiquetas(ETIQUETAS_CACHE_USUARIOS)
@@ -0,0 +1,147 @@
+"""
+Módulo de Eventos em Tempo Real - Hub de Distribuição (Fan-out)
+
+Distribui eventos compactos de alteração de contatos para as conexões
+abertas pelo próprio usuário (Server-Sent Events em /contatos/eventos).
+
+Autor: Henrique Teixeira
+Versão: 1.0.0
+Data: 2024-01-15
+
+Funcionamento:
+    - Cada conexão tem um buffer limitado (EVENTOS_BUFFER)
+    - publicar() é thread-safe: pode ser chamado pelas funções de
+      model.py rodando no threadpool ou no event loop
+    - Um consumidor lento cujo buffer enche é desconectado com o evento
+      'resync', e deve voltar a sincronizar via /contatos/changes
+"""
+
+from dotenv import load_dotenv
+import threading
+import asyncio
+import os
+
+# =============================================================================
+#                           CONFIGURAÇÃO
+# =============================================================================
+
+load_dotenv()
+
+# Eventos pendentes por conexão e conexões simultâneas por usuário
+EVENTOS_BUFFER = int(os.getenv("EVENTOS_BUFFER", 64))
+EVENTOS_MAX_CONEXOES_USUARIO = int(os.getenv("EVENTOS_MAX_CONEXOES_USUARIO", 10))
+
+# Evento enviado ao consumidor removido por lentidão
+EVENTO_RESYNC = {"tipo": "resync"}
+
+# =============================================================================
+#                           HUB DE EVENTOS
+# =============================================================================
+
+class Assinatura:
+    """
+    Conexão inscrita nos eventos de um usuário.
+
+    Attributes:
+        usuario_id (int): Dono dos contatos observados
+        fila (asyncio.Queue): Buffer limitado de eventos pendentes
+        encerrada (bool): True após remoção por consumidor lento
+    """
+    __slots__ = ("usuario_id", "fila", "loop", "encerrada")
+
+    def __init__(self, usuario_id: int, loop, limite: int):
+        self.usuario_id = usuario_id
+        self.fila = asyncio.Queue(maxsize=limite)
+        self.loop = loop
+        self.encerrada = False
+
+class HubEventos:
+    """
+    Mantém as assinaturas por usuário e entrega os eventos publicados.
+    """
+
+    def __init__(self, limite_buffer: int, max_conexoes_usuario: int):
+        self.limite_buffer = limite_buffer
+        self.max_conexoes_usuario = max_conexoes_usuario
+        self._lock = threading.Lock()
+        self._assinaturas = {}
+        self.publicados = 0
+        self.removidas_por_lentidao = 0
+
+    def assinar(self, usuario_id: int):
+        """
+        Inscreve uma nova conexão do usuário (chamar dentro do event loop).
+
+        Returns:
+            Assinatura: Assinatura criada, ou None se o usuário já atingiu
+                        o limite de conexões simultâneas
+        """
+        assinatura = Assinatura(usuario_id, asyncio.get_running_loop(), self.limite_buffer)
+        with self._lock:
+            assinaturas = self._assinaturas.setdefault(usuario_id, set())
+            if len(assinaturas) >= self.max_conexoes_usuario:
+                return None
+            assinaturas.add(assinatura)
+        return assinatura
+
+    def cancelar(self, assinatura: Assinatura):
+        """Remove a assinatura (desconexão do cliente)."""
+        with self._lock:
+            assinaturas = self._assinaturas.get(assinatura.usuario_id)
+            if assinaturas is not None:
+                assinaturas.discard(assinatura)
+                if not assinaturas:
+                    del self._assinaturas[assinatura.usuario_id]
+
+    def publicar(self, usuario_id: int, evento: dict):
+        """
+        Envia um evento a todas as conexões do usuário.
+
+        Args:
+            usuario_id (int): Dono do contato alterado
+            evento (dict): Evento compacto (tipo, id, versao)
+        """
+        with self._lock:
+            assinaturas = list(self._assinaturas.get(usuario_id, ()))
+            self.publicados += 1
+        for assinatura in assinaturas:
+            try:
+                assinatura.loop.call_soon_threadsafe(self._entregar, assinatura, evento)
+            except RuntimeError:
+                # Event loop já encerrado
+                self.cancelar(assinatura)
+
+    def _entregar(self, assinatura: Assinatura, evento: dict):
+        """Enfileira o evento; remove o consumidor se o buffer estiver cheio."""
+        if assinatura.encerrada:
+            return
+        try:
+            assinatura.fila.put_nowait(evento)
+        except asyncio.QueueFull:
+            # Consumidor lento: descarta o buffer e sinaliza ressincronização
+            assinatura.encerrada = True
+            while not assinatura.fila.empty():
+                assinatura.fila.get_nowait()
+            assinatura.fila.put_nowait(EVENTO_RESYNC)
+            self.cancelar(assinatura)
+            with self._lock:
+                self.removidas_por_lentidao += 1
+
+    def estatisticas(self):
+        """
+        Retorna os contadores do hub para monitoramento.
+
+        Returns:
+            dict: usuários e conexões ativas, eventos publicados e
+                  conexões removidas por lentidão
+        """
+        with self._lock:
+            return {
+                "usuarios": len(self._assinaturas),
+                "conexoes": sum(len(a) for a in self._assinaturas.values()),
+                "publicados": self.publicados,
+                "removidas_por_lentidao": self.removidas_por_lentidao,
+            }
+
+# Hub compartilhado das alterações de contatos
+hub_contatos = HubEventos(EVENTOS_BUFFER, EVENTOS_MAX_CONEXOES_USUARIO)
@@ -0,0 +1,205 @@
+"""
+Gerador de Dados Sintéticos - Carga em Massa para Testes de Escala
+
+Cria usuários e contatos realistas com distribuição assimétrica
+(lei de potência: poucas contas "baleia" com agendas enormes e muitas
+contas pequenas) e os carrega em massa no banco ou em um arquivo SQL.
+
+Autor: Henrique Teixeira
+Data: 2024-01-15
+
+Uso:
+    python gerar_dados.py --usuarios 1000 --semente 42
+    python gerar_dados.py --usuarios 50 --max-contatos 200000 --alfa 0.8
+    python gerar_dados.py --usuarios 1000 --saida seed.sql
+
+Notas:
+    - Mesma semente, mesmos dados (determinístico)
+    - Telefones válidos (11 dígitos: DDD + 9 + 8 dígitos) e emails únicos
+      em toda a tabela, como exigido por postContato
+    - Todos os usuários têm a senha SENHA_PADRAO
+    - Os IDs dos usuários começam após o maior ID existente, e a
+      numeração de telefones/emails após o maior ID de 'info', para que
+      cargas sucessivas não colidam
+"""
+
+import argparse
+import random
+import time
+import sys
+import mysql.connector
+from passlib.context import CryptContext
+from banco import DB_CONFIG
+
+# =============================================================================
+#                           CONFIGURAÇÃO
+# =============================================================================
+
+SENHA_PADRAO = "Senha123"
+
+NOMES = [
+    "Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique",
+    "Isabela", "João", "Karina", "Lucas", "Mariana", "Nicolas", "Olivia", "Pedro",
+    "Rafaela", "Samuel", "Tatiana", "Vinicius", "Yasmin", "Arthur", "Beatriz", "Caio",
+    "Helena", "Miguel", "Laura", "Davi", "Alice", "Gustavo", "Sofia", "Matheus",
+]
+SOBRENOMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira",
+    "Lima", "Gomes", "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes",
+    "Soares", "Fernandes", "Vieira", "Barbosa", "Rocha", "Dias", "Nascimento", "Andrade",
+]
+DOMINIOS = ["gmail.com", "hotmail.com", "outlook.com", "yahoo.com.br", "uol.com.br", "empresa.com.br"]
+
+# Multiplicador coprimo com 10^8: i -> (i * MULT) % 10^8 é uma bijeção,
+# então telefones distintos sem precisar de um conjunto em memória
+_MULT_TELEFONE = 48271
+
+# =============================================================================
+#                           GERAÇÃO
+# =============================================================================
+
+def quantidade_contatos(rng, minimo: int, maximo: int, alfa: float):
+    """
+    Sorteia o tamanho de uma agenda com distribuição de Pareto.
+
+    Args:
+        rng (random.Random): Gerador com semente
+        minimo (int): Menor agenda
+        maximo (int): Maior agenda (limita a cauda)
+        alfa (float): Expoente; menor = cauda mais pesada (mais baleias)
+    """
+    return min(maximo, int(minimo * rng.paretovariate(alfa)))
+
+def telefone(sequencial: int):
+    """Telefone único e válido (11 dígitos) para o sequencial informado."""
+    ddd = 11 + sequencial % 89
+    return f"{ddd:02d}9{(sequencial * _MULT_TELEFONE) % 10 ** 8:08d}"
+
+def nome_aleatorio(rng):
+    return f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)}"
+
+def email(nome: str, sequencial: int, rng):
+    """Email único: o sequencial garante a unicidade."""
+    local = nome.lower().replace(" ", ".").replace("ã", "a").replace("é", "e")
+    return f"{local}.{sequencial}@{rng.choice(DOMINIOS)}"
+
+def gerar(args, primeiro_usuario: int, deslocamento: int):
+    """
+    Gera os dados em lotes.
+    
+    Args:
+        args: Argumentos da linha de comando
+        primeiro_usuario (int): ID do primeiro usuário gerado
+        deslocamento (int): Início da numeração de telefones e emails
+
+    Yields:
+        tuple: ('usuarios' | 'info', lista de linhas)
+    """
+    rng = random.Random(args.semente)
+    senha_hash = CryptContext(schemes=["bcrypt"], deprecated="auto").hash(SENHA_PADRAO)
+    sequencial = deslocamento
+
+    usuarios = []
+    contatos = []
+    for n in range(args.usuarios):
+        usuario_id = primeiro_usuario + n
+        quantidade = quantidade_contatos(rng, args.min_contatos, args.max_contatos, args.alfa)
+        nome = nome_aleatorio(rng)
+        usuarios.append((usuario_id, nome, f"usuario{usuario_id}@seed.local", senha_hash, quantidade))
+        if len(usuarios) >= args.lote:
+            yield "usuarios", usuarios
+            usuarios = []
+
+        for versao in range(1, quantidade + 1):
+            sequencial += 1
+            nome_contato = nome_aleatorio(rng)
+            contatos.append((nome_contato, email(nome_contato, sequencial, rng), telefone(sequencial),
+                             usuario_id, versao, versao))
+            if len(contatos) >= args.lote:
+                if usuarios:
+                    yield "usuarios", usuarios
+                    usuarios = []
+                yield "info", contatos
+                contatos = []
+
+    if usuarios:
+        yield "usuarios", usuarios
+    if contatos:
+        yield "info", contatos
+
+# =============================================================================
+#                           CARGA
+# =============================================================================
+
+SQL_USUARIOS = "INSERT INTO usuarios (id, nome, email, senha_hash, versao_contatos) VALUES (%s, %s, %s, %s, %s)"
+SQL_INFO = "INSERT INTO info (nome, email, telefone, usuario_id, versao, versao_criacao) VALUES (%s, %s, %s, %s, %s, %s)"
+
+def _literal(valor):
+    if isinstance(valor, int):
+        return str(valor)
+    return "'" + str(valor).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+def carregar_arquivo(args):
+    """Escreve INSERTs multi-linha em um arquivo (carregar com 'mysql < arquivo')."""
+    total = 0
+    with open(args.saida, "w", encoding="utf-8") as saida:
+        saida.write("SET unique_checks = 0;\nSET foreign_key_checks = 0;\n")
+        for tabela, linhas in gerar(args, args.primeiro_usuario, args.deslocamento):
+            sql = SQL_USUARIOS if tabela == "usuarios" else SQL_INFO
+            valores = ",\n".join("(" + ", ".join(_literal(v) for v in linha) + ")" for linha in linhas)
+            saida.write(sql.split(" VALUES ")[0] + " VALUES\n" + valores + ";\n")
+            total += len(linhas) if tabela == "info" else 0
+        saida.write("SET unique_checks = 1;\nSET foreign_key_checks = 1;\n")
+    return total
+
+def carregar_banco(args):
+    """Carrega direto no banco em lotes (executemany vira INSERT multi-linha)."""
+    conexao = mysql.connector.connect(**DB_CONFIG)
+    cursor = conexao.cursor()
+    try:
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM usuarios")
+        primeiro_usuario = cursor.fetchone()[0] + 1
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM info")
+        deslocamento = cursor.fetchone()[0]
+        cursor.execute("SET unique_checks = 0")
+        cursor.execute("SET foreign_key_checks = 0")
+
+        total = 0
+        for tabela, linhas in gerar(args, primeiro_usuario, deslocamento):
+            cursor.executemany(SQL_USUARIOS if tabela == "usuarios" else SQL_INFO, linhas)
+            conexao.commit()
+            if tabela == "info":
+                total += len(linhas)
+                print(f"\r{total} contatos", end="", file=sys.stderr)
+        print(file=sys.stderr)
+        return total
+    finally:
+        cursor.execute("SET unique_checks = 1")
+        cursor.execute("SET foreign_key_checks = 1")
+        cursor.close()
+        conexao.close()
+
+# =============================================================================
+#                           EXECUÇÃO
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera e carrega dados sintéticos de usuários e contatos.")
+    parser.add_argument("--usuarios", type=int, default=1000, help="Número de usuários")
+    parser.add_argument("--min-contatos", type=int, default=5, help="Menor agenda")
+    parser.add_argument("--max-contatos", type=int, default=100000, help="Maior agenda (contas baleia)")
+    parser.add_argument("--alfa", type=float, default=1.2, help="Expoente de Pareto (menor = mais baleias)")
+    parser.add_argument("--semente", type=int, default=42, help="Semente do gerador")
+    parser.add_argument("--lote", type=int, default=5000, help="Linhas por INSERT/commit")
+    parser.add_argument("--saida", help="Gera um arquivo SQL em vez de carregar no banco")
+    parser.add_argument("--primeiro-usuario", type=int, default=1, help="Primeiro ID de usuário (apenas com --saida)")
+    parser.add_argument("--deslocamento", type=int, default=0, help="Início da numeração de telefones/emails (apenas com --saida)")
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    total = carregar_arquivo(args) if args.saida else carregar_banco(args)
+    duracao = time.perf_counter() - inicio
+    print(f"{args.usuarios} usuários, {total} contatos em {duracao:.1f}s ({total / max(duracao, 1e-9):.0f} contatos/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Gerador do Documento OpenAPI - Etapa de Build
+
+Gera o esquema OpenAPI da aplicação uma única vez (no build/deploy) e
+o grava em arquivo; na partida, main.py o carrega pronto em vez de
+montá-lo no primeiro acesso a /docs.
+
+Autor: Henrique Teixeira
+Data: 2024-01-15
+
+Uso:
+    python gerar_openapi.py                 # grava OPENAPI_ARQUIVO
+    python gerar_openapi.py --saida api.json
+
+Notas:
+    - O arquivo guarda uma impressão digital de todos os módulos .py da
+      aplicação (valores de outros módulos, como limites e padrões,
+      também entram no esquema); se algum mudar depois do build, o
+      arquivo é ignorado e o FastAPI gera o esquema normalmente
+"""
+
+from dotenv import load_dotenv
+import argparse
+import hashlib
+import glob
+import json
+import os
+
+# =============================================================================
+#                           CONFIGURAÇÃO
+# =============================================================================
+
+load_dotenv()
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+OPENAPI_ARQUIVO = os.getenv("OPENAPI_ARQUIVO", os.path.join(DIRETORIO, "openapi.json"))
+
+# =============================================================================
+#                           IMPRESSÃO DIGITAL
+# =============================================================================
+
+def impressao():
+    """Hash dos módulos da aplicação e da versão do FastAPI."""
+    import fastapi
+    digest = hashlib.sha1(fastapi.__version__.encode())
+    for caminho in sorted(glob.glob(os.path.join(DIRETORIO, "*.py"))):
+        digest.update(os.path.basename(caminho).encode())
+        with open(caminho, "rb") as arquivo:
+            digest.update(arquivo.read())
+    return digest.hexdigest()
+
+def carregar(app, arquivo: str = OPENAPI_ARQUIVO):
+    """
+    Instala o documento pré-gerado na aplicação, se válido.
+
+    Args:
+        app (FastAPI): Aplicação
+        arquivo (str): Documento gerado por este script
+
+    Returns:
+        bool: True se o documento foi instalado
+    """
+    try:
+        with open(arquivo, encoding="utf-8") as entrada:
+            documento = json.load(entrada)
+    except (OSError, ValueError):
+        return False
+    if documento.pop("x-impressao", None) != impressao():
+        return False
+    # app.openapi() devolve openapi_schema sem montar o esquema de novo
+    app.openapi_schema = documento
+    return True
+
+# =============================================================================
+#                           EXECUÇÃO
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o documento OpenAPI da aplicação.")
+    parser.add_argument("--saida", default=OPENAPI_ARQUIVO, help="Arquivo de saída")
+    args = parser.parse_args()
+
+    from main import app
+    app.openapi_schema = None
+    documento = dict(app.openapi())
+    documento["x-impressao"] = impressao()
+    with open(args.saida, "w", encoding="utf-8") as saida:
+        json.dump(documento, saida, ensure_ascii=False, separators=(",", ":"))
+    print(f"{len(documento['paths'])} rotas gravadas em {args.saida}")
+
+if __name__ == "__main__":
+    main()
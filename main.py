@@ -13,10 +13,14 @@ Funcionalidades:
     - Inicialização do FastAPI com metadados
     - Configuração de autenticação OAuth2
     - Registro de rotas da aplicação
+    - Rastreamento de requisições (traceparent) e log de acesso
+    - Prazo (deadline) por rota propagado até o banco
+    - Vigia opcional de bloqueios do event loop (LOOP_WATCHDOG=1)
+    - Partida rápida: dependências pesadas carregadas sob demanda e
+      documento OpenAPI pré-gerado (gerar_openapi.py)
 """
 
-from fastapi import FastAPI
-from passlib.context import CryptContext
+from fastapi import FastAPI, Request
 from dotenv import load_dotenv
 from fastapi.security import OAuth2PasswordBearer
 import os
@@ -46,12 +50,51 @@ app = FastAPI(
     redoc_url="/redoc"  # Documentação alternativa ReDoc
 )
 
-# Configura contexto de criptografia para senhas
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Contexto de criptografia para senhas (o mesmo de model.py; passlib e o
+# backend bcrypt só são carregados no primeiro hash/verificação)
+from model import bcrypt_context
 
 # Configura esquema OAuth2 para autenticação
 oauth2_schema = OAuth2PasswordBearer(tokenUrl="autenticacao/login-form")
 
+# =============================================================================
+#                       RASTREAMENTO E REGISTRO DE ACESSO
+# =============================================================================
+
+from rastreamento import iniciar_trace
+from prazos import iniciar_prazo, prazo_da_rota
+from registro import iniciar_requisicao, registrar_acesso, registrar_erro
+import time
+
+@app.middleware("http")
+async def observar_requisicao(request: Request, call_next):
+    """
+    Abre o span raiz e o prazo da requisição e registra a linha de acesso.
+    
+    Notes:
+        - Um único middleware para as duas tarefas (cada middleware
+          HTTP adiciona uma tarefa por requisição)
+        - A resposta devolve o traceparent da trace para correlação
+    """
+    rota = f"{request.method} {request.url.path}"
+    contexto = iniciar_requisicao(rota)
+    inicio = time.perf_counter()
+    status_code = 500
+    with iniciar_trace(request.headers.get("traceparent"), rota) as raiz, \
+            iniciar_prazo(prazo_da_rota(request.method, request.url.path)):
+        try:
+            resposta = await call_next(request)
+            status_code = resposta.status_code
+        except Exception as erro:
+            registrar_erro(rota, erro)
+            raise
+        finally:
+            registrar_acesso(contexto, status_code, time.perf_counter() - inicio)
+        raiz.atributos["status"] = status_code
+        if raiz.amostrado:
+            resposta.headers["traceparent"] = raiz.traceparent()
+        return resposta
+
 # =============================================================================
 #                           REGISTRO DE ROTAS
 # =============================================================================
@@ -59,6 +102,7 @@ oauth2_schema = OAuth2PasswordBearer(tokenUrl="autenticacao/login-form")
 # Importa e registra roteadores (import circular evitado)
 from contatos import router
 from autenticacao import router as auth_router
+from monitoramento import router as monitoramento_router
 
 # Registra roteador de contatos
 app.include_router(router)
@@ -66,3 +110,35 @@ app.include_router(router)
 # Registra roteador de autenticação
 app.include_router(auth_router)
 
+# Registra roteador de monitoramento
+app.include_router(monitoramento_router)
+
+# =============================================================================
+#                           VIGIA DO EVENT LOOP
+# =============================================================================
+
+from vigia_loop import vigia_loop, LOOP_WATCHDOG
+
+@app.on_event("startup")
+async def iniciar_vigia_loop():
+    """Inicia o vigia de bloqueios do event loop, se ativado."""
+    if LOOP_WATCHDOG:
+        vigia_loop.iniciar(app)
+
+
+# =============================================================================
+#                           PARTIDA RÁPIDA
+# =============================================================================
+
+from gerar_openapi import carregar as carregar_openapi
+from preguicoso import aquecer
+from autenticacao import jwt
+from banco import conector
+
+# Documento gerado no build (python gerar_openapi.py), se atualizado
+carregar_openapi(app)
+
+@app.on_event("startup")
+async def aquecer_dependencias():
+    """Carrega em segundo plano as dependências adiadas (jose, passlib, MySQL)."""
+    aquecer(jwt, bcrypt_context, conector)
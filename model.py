@@ -15,12 +15,22 @@ Versão: 1.0.0
 Data: 2024-01-15
 
 Estrutura do Banco:
-    - usuarios: id, nome, email, senha_hash
-    - info: id, nome, email, telefone, usuario_id (FK)
+    - usuarios: id, nome, email, senha_hash, versao_contatos
+    - info: id, nome, email, telefone, usuario_id (FK), versao, versao_criacao
+    - info_excluidos: contato_id, usuario_id, versao (tombstones)
+    - etiquetas: id, usuario_id, nome
+    - info_etiquetas: etiqueta_id, contato_id
 """
 
-import mysql.connector
-from passlib.context import CryptContext
+from banco import obter_conexao, devolver_conexao, executar, confirmar, buscar_um, buscar_todos, buscar_registros, lotes_in, marcadores
+from rastreamento import span, rastreado
+from registro import registrar_erro
+from eventos import hub_contatos
+from etiquetas import indice_etiquetas, filtrar, resumo
+from agrupamento import Agrupador, GROUP_COMMIT, GROUP_COMMIT_JANELA_MS, GROUP_COMMIT_MAX_LOTE
+from collections import Counter
+from contextlib import closing
+from preguicoso import objeto
 from dotenv import load_dotenv
 import os
 
@@ -32,8 +42,72 @@ import os
 load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 
-# Configura contexto de criptografia para senhas
-bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def _contexto_senhas():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Configura contexto de criptografia para senhas (passlib carregado no primeiro uso)
+bcrypt_context = objeto(_contexto_senhas)
+
+# =============================================================================
+#                           STATEMENTS FIXOS
+# =============================================================================
+
+# Texto fixo de cada statement quente: é a chave do cache de statements
+# preparados de cada conexão (ver banco.py)
+# Colunas públicas do contato (versao/versao_criacao são internas: só /changes)
+SQL_CONTATOS_POR_USUARIO = "SELECT id, nome, email, telefone, usuario_id FROM info WHERE usuario_id = %s"
+SQL_CONTATO_POR_ID = "SELECT id, nome, email, telefone, usuario_id FROM info WHERE id = %s AND usuario_id = %s"
+SQL_CONTATO_EXISTE = "SELECT id FROM info WHERE id = %s AND usuario_id = %s"
+SQL_CONTATO_POR_TELEFONE = "SELECT id FROM info WHERE telefone = %s LIMIT 1"
+SQL_CONTATO_POR_EMAIL = "SELECT id FROM info WHERE email = %s LIMIT 1"
+SQL_INSERIR_CONTATO = "INSERT INTO info (nome, email, telefone, usuario_id, versao, versao_criacao) VALUES (%s, %s, %s, %s, %s, %s)"
+SQL_EXCLUIR_CONTATO = "DELETE FROM info WHERE id = %s AND usuario_id = %s"
+SQL_PROXIMA_VERSAO = "UPDATE usuarios SET versao_contatos = LAST_INSERT_ID(versao_contatos + 1) WHERE id = %s"
+SQL_RESERVAR_VERSOES = "UPDATE usuarios SET versao_contatos = LAST_INSERT_ID(versao_contatos + %s) WHERE id = %s"
+SQL_VERSAO_ATUAL = "SELECT versao_contatos FROM usuarios WHERE id = %s"
+SQL_INSERIR_EXCLUIDO = "INSERT INTO info_excluidos (contato_id, usuario_id, versao) VALUES (%s, %s, %s)"
+SQL_CONTATOS_ALTERADOS = "SELECT * FROM info WHERE usuario_id = %s AND versao > %s ORDER BY versao"
+SQL_CONTATOS_EXCLUIDOS = "SELECT contato_id, versao FROM info_excluidos WHERE usuario_id = %s AND versao > %s ORDER BY versao"
+# Lista IN preenchida com banco.marcadores() em um dos tamanhos de banco.TAMANHOS_IN
+SQL_CONTATOS_POR_TELEFONES = "SELECT id, nome, telefone FROM info WHERE usuario_id = %s AND telefone IN ({})"
+SQL_CONTATOS_POR_IDS = "SELECT {} FROM info WHERE usuario_id = %s AND id IN ({}) ORDER BY id"
+SQL_IDS_CONTATOS = "SELECT id FROM info WHERE usuario_id = %s"
+SQL_IDS_CONTATOS_EM = "SELECT id FROM info WHERE usuario_id = %s AND id IN ({})"
+SQL_ETIQUETAS_USUARIO = "SELECT id, nome FROM etiquetas WHERE usuario_id = %s"
+SQL_ETIQUETAS_CONTATOS = "SELECT ie.etiqueta_id, ie.contato_id FROM info_etiquetas ie JOIN etiquetas e ON e.id = ie.etiqueta_id WHERE e.usuario_id = %s"
+SQL_ETIQUETA_EXISTE = "SELECT id FROM etiquetas WHERE id = %s AND usuario_id = %s"
+SQL_ETIQUETA_POR_NOME = "SELECT id FROM etiquetas WHERE usuario_id = %s AND nome = %s"
+SQL_INSERIR_ETIQUETA = "INSERT INTO etiquetas (usuario_id, nome) VALUES (%s, %s)"
+SQL_EXCLUIR_ETIQUETA = "DELETE FROM etiquetas WHERE id = %s AND usuario_id = %s"
+SQL_ETIQUETAR_CONTATOS = "INSERT IGNORE INTO info_etiquetas (etiqueta_id, contato_id) SELECT %s, id FROM info WHERE usuario_id = %s AND id IN ({})"
+SQL_DESETIQUETAR_CONTATOS = "DELETE FROM info_etiquetas WHERE etiqueta_id = %s AND contato_id IN ({})"
+SQL_HERDAR_ETIQUETAS = "INSERT IGNORE INTO info_etiquetas (etiqueta_id, contato_id) SELECT etiqueta_id, %s FROM info_etiquetas WHERE contato_id = %s"
+SQL_USUARIO_POR_EMAIL = "SELECT * FROM usuarios WHERE email = %s"
+SQL_USUARIO_POR_ID = "SELECT * FROM usuarios WHERE id = %s"
+SQL_INSERIR_USUARIO = "INSERT INTO usuarios (nome, email, senha_hash) VALUES (%s, %s, %s)"
+
+# Colunas de 'info' que podem ser projetadas (na ordem canônica do SELECT)
+CAMPOS_CONTATO = ("id", "nome", "email", "telefone", "usuario_id")
+
+def colunasContato(campos=None):
+    """
+    Monta a lista de colunas do SELECT de contatos.
+    
+    Args:
+        campos (iterable, optional): Subconjunto de CAMPOS_CONTATO
+    
+    Returns:
+        str: Colunas separadas por vírgula (todas as de CAMPOS_CONTATO se
+             campos não informados; nunca as colunas internas de versão)
+    
+    Notes:
+        - A ordem é sempre a de CAMPOS_CONTATO, para que o mesmo conjunto
+          de campos gere o mesmo texto SQL (e reaproveite o statement)
+    """
+    if not campos:
+        campos = CAMPOS_CONTATO
+    return ", ".join(campo for campo in CAMPOS_CONTATO if campo in campos)
 
 # =============================================================================
 #                       GERENCIAMENTO DE CONEXÕES
@@ -41,53 +115,185 @@ bcrypt_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def entrarBanco():
     """
-    Estabelece conexão com o banco de dados MySQL.
+    Obtém uma conexão do pool de conexões MySQL.
     
     Returns:
-        tuple: (conexao, cursor) se bem-sucedido, (None, None) em caso de erro
+        PooledMySQLConnection: Conexão se bem-sucedido, None em caso de erro
     
     Raises:
         Exception: Erros de conexão com o banco são silenciados para evitar
                    exposição de detalhes internos
     """
     try:
-        conexao = mysql.connector.connect(
-            host='localhost',
-            user='root',
-            password='Henry45*1',  # Considerar usar variável de ambiente
-            database='contacts',
-            auth_plugin='mysql_native_password'
-        )
-
-        if conexao.is_connected():
-            cursor = conexao.cursor(dictionary=True)  # Retorna resultados como dicionários
-            return conexao, cursor
-        return None, None
-
+        with span("banco.conectar"):
+            return obter_conexao()
     except Exception as error:
-        # Em produção, registrar o erro em logs
-        return None, None
+        registrar_erro("model.entrarBanco", error)
+        return None
 
-def fecharConexao(conexao, cursor):
+def fecharConexao(conexao):
     """
-    Fecha conexão e cursor do banco de dados de forma segura.
+    Devolve a conexão ao pool de forma segura.
     
     Args:
-        conexao: Objeto de conexão MySQL
-        cursor: Objeto cursor MySQL
+        conexao: Conexão obtida por entrarBanco()
     
     Notes:
-        - Verifica se a conexão existe e está ativa antes de fechar
+        - Transações pendentes são desfeitas antes da devolução
         - Operação silenciosa (não levanta exceções)
     """
-    if conexao and conexao.is_connected():
-        cursor.close()
-        conexao.close()
+    if conexao:
+        try:
+            devolver_conexao(conexao)
+        except Exception:
+            pass
+
+def desfazerTransacao(conexao):
+    """
+    Desfaz a transação em andamento sem levantar exceções.
+    
+    Notes:
+        - Se a conexão foi perdida, o servidor já desfez a transação
+    """
+    try:
+        conexao.rollback()
+    except Exception:
+        pass
+
+# =============================================================================
+#                           CONTROLE DE ALTERAÇÕES
+# =============================================================================
+
+def _proximaVersao(conexao, usuario_id: int):
+    """
+    Incrementa e retorna a sequência de alterações dos contatos do usuário.
+    
+    Args:
+        conexao: Conexão com transação em andamento
+        usuario_id (int): ID do usuário proprietário
+    
+    Returns:
+        int: Nova versão a gravar na linha alterada/tombstone
+    
+    Notes:
+        - O UPDATE bloqueia a linha do usuário até o commit, então as
+          versões de um mesmo usuário são confirmadas em ordem crescente
+          e um cliente nunca pula uma alteração ao sincronizar
+    """
+    return executar(conexao, SQL_PROXIMA_VERSAO, (usuario_id,)).lastrowid
 
 # =============================================================================
 #                           OPERAÇÕES DE CONTATOS
 # =============================================================================
 
+def _inserirContato(conexao, nome: str, email: str, telefone: str, usuario_id: int):
+    """
+    Insere um contato na conexão informada, sem confirmar a transação.
+    
+    Returns:
+        dict: Dados do contato criado ou None se telefone/email duplicado
+    """
+    # Verifica duplicatas de telefone
+    if buscar_um(conexao, SQL_CONTATO_POR_TELEFONE, (telefone,)):
+        return None  # Telefone já existe
+    
+    # Verifica duplicatas de email
+    if buscar_um(conexao, SQL_CONTATO_POR_EMAIL, (email,)):
+        return None  # Email já existe
+    
+    # Insere novo contato
+    versao = _proximaVersao(conexao, usuario_id)
+    cursor = executar(
+        conexao,
+        SQL_INSERIR_CONTATO,
+        (nome, email, telefone, usuario_id, versao, versao)
+    )
+    
+    return {
+        "id": cursor.lastrowid,
+        "nome": nome,
+        "email": email,
+        "telefone": telefone,
+        "usuario_id": usuario_id,
+        "versao": versao
+    }
+
+def _atualizarContato(conexao, contato_id: int, usuario_id: int, nome: str = None, email: str = None, telefone: str = None):
+    """
+    Atualiza um contato na conexão informada, sem confirmar a transação.
+    
+    Returns:
+        int: Nova versão do contato, ou False se inexistente ou sem campos
+    """
+    # Verifica existência e propriedade do contato
+    if not buscar_um(conexao, SQL_CONTATO_EXISTE, (contato_id, usuario_id)):
+        return False
+    
+    # Constrói query dinamicamente com campos fornecidos
+    updates = []
+    params = []
+    if nome:
+        updates.append("nome = %s")
+        params.append(nome)
+    if email:
+        updates.append("email = %s")
+        params.append(email)
+    if telefone:
+        updates.append("telefone = %s")
+        params.append(telefone)
+    
+    # Se nenhum campo para atualizar
+    if not updates:
+        return False
+    
+    # Registra a alteração para a sincronização incremental
+    versao = _proximaVersao(conexao, usuario_id)
+    updates.append("versao = %s")
+    params.append(versao)
+    
+    # Adiciona condições WHERE
+    params.extend([contato_id, usuario_id])
+    query = f"UPDATE info SET {', '.join(updates)} WHERE id = %s AND usuario_id = %s"
+    
+    executar(conexao, query, tuple(params))
+    return versao
+
+def _excluirContato(conexao, contato_id: int, usuario_id: int):
+    """
+    Exclui um contato na conexão informada, sem confirmar a transação.
+    
+    Returns:
+        int: Versão do tombstone, ou False se inexistente
+    """
+    # Verifica existência e propriedade antes de excluir
+    if not buscar_um(conexao, SQL_CONTATO_EXISTE, (contato_id, usuario_id)):
+        return False
+    
+    # Tombstone para que clientes sincronizados saibam da exclusão
+    versao = _proximaVersao(conexao, usuario_id)
+    executar(conexao, SQL_INSERIR_EXCLUIDO, (contato_id, usuario_id, versao))
+    executar(conexao, SQL_EXCLUIR_CONTATO, (contato_id, usuario_id))
+    return versao
+
+def _notificarAlteracao(usuario_id: int, tipo: str, contato_id: int, versao: int):
+    """
+    Publica o evento de alteração para as conexões em tempo real do usuário.
+    
+    Notes:
+        - Chamar somente após o commit, para não anunciar alterações
+          que ainda podem ser desfeitas
+    """
+    hub_contatos.publicar(usuario_id, {"tipo": tipo, "id": contato_id, "versao": versao})
+    
+    # Mantém o índice de etiquetas em memória na mesma versão do banco
+    if tipo == "create":
+        indice_etiquetas.aplicar(usuario_id, versao, lambda agenda: agenda.contatos.add(contato_id))
+    elif tipo == "delete":
+        indice_etiquetas.aplicar(usuario_id, versao, lambda agenda: agenda.remover_contato(contato_id))
+    else:
+        indice_etiquetas.aplicar(usuario_id, versao)
+
+@rastreado("model.postContato")
 def postContato(nome: str, email: str, telefone: str, usuario_id: int):
     """
     Cria um novo contato associado a um usuário.
@@ -99,99 +305,310 @@ def postContato(nome: str, email: str, telefone: str, usuario_id: int):
         usuario_id (int): ID do usuário proprietário
     
     Returns:
-        dict: Dados do contato criado ou None em caso de erro/duplicata
+        dict: Dados do contato criado, False se o telefone ou email já
+              está cadastrado, None em caso de erro
     
     Validations:
         - Verifica duplicatas de telefone
         - Verifica duplicatas de email
+    
+    Notes:
+        - Com GROUP_COMMIT=1, a inserção é agrupada com outras concorrentes
+          em um único INSERT/commit (ver agrupamento.py)
     """
+    if GROUP_COMMIT:
+        return agrupador_contatos.enviar((nome, email, telefone, usuario_id))
+    
     try:
-        conexao, cursor = entrarBanco()
+        conexao = entrarBanco()
         if not conexao:
             return None
         
-        # Verifica duplicatas de telefone
-        cursor.execute("SELECT * FROM info WHERE telefone = %s", (telefone,))
-        if cursor.fetchone():
-            return None  # Telefone já existe
-        
-        # Verifica duplicatas de email
-        cursor.execute("SELECT * FROM info WHERE email = %s", (email,))
-        if cursor.fetchone():
-            return None  # Email já existe
-        
-        # Insere novo contato
-        cursor.execute(
-            "INSERT INTO info (nome, email, telefone, usuario_id) VALUES (%s, %s, %s, %s)",
-            (nome, email, telefone, usuario_id)
-        )
-        conexao.commit()
+        novo_contato = _inserirContato(conexao, nome, email, telefone, usuario_id)
+        if novo_contato is None:
+            return False
+        confirmar(conexao)
+        _notificarAlteracao(usuario_id, "create", novo_contato["id"], novo_contato["versao"])
         
         # Retorna dados do contato criado
-        return {
-            "id": cursor.lastrowid,
-            "nome": nome,
-            "email": email,
-            "telefone": telefone,
-            "usuario_id": usuario_id
-        }
+        return novo_contato
     
     except Exception as error:
-        # Rollback implícito pela desconexão
+        # Rollback feito na devolução da conexão ao pool
+        registrar_erro("model.postContato", error)
         return None
     
     finally:
-        # Garante fechamento da conexão
+        # Garante devolução da conexão
+        if 'conexao' in locals():
+            fecharConexao(conexao)
+
+@rastreado("model._gravarLoteContatos")
+def _gravarLoteContatos(pedidos: list):
+    """
+    Grava um lote de contatos com um único INSERT multi-linha e um commit.
+    
+    Args:
+        pedidos (list): Tuplas (nome, email, telefone, usuario_id)
+    
+    Returns:
+        list: Para cada pedido, os dados do contato criado, False em caso
+              de duplicata (no banco ou em um pedido anterior do lote) ou
+              None se o lote não pôde ser gravado
+    
+    Notes:
+        - Roda sob o prazo próprio do lote (agrupamento.py), nunca sob o
+          de uma das requisições agrupadas
+        - As versões de cada usuário são reservadas em um único UPDATE,
+          em ordem de usuario_id para evitar deadlocks entre lotes
+        - Os IDs são lidos de volta por (usuario_id, versao), sem depender
+          de auto-incrementos consecutivos
+    """
+    resultados = [None] * len(pedidos)
+    try:
+        conexao = entrarBanco()
+        if not conexao:
+            return resultados
+        
+        # Statements de aridade variável: protocolo texto, em cursores
+        # próprios (fora do cache), fechados logo após o uso
+        telefones = [pedido[2] for pedido in pedidos]
+        emails = [pedido[1] for pedido in pedidos]
+        lista = marcadores(len(pedidos))
+        with closing(executar(
+            conexao,
+            f"SELECT telefone, email FROM info WHERE telefone IN ({lista}) OR email IN ({lista})",
+            tuple(telefones + emails), preparado=False
+        )) as cursor:
+            existentes = cursor.fetchall()
+        telefones_usados = {linha["telefone"] for linha in existentes}
+        emails_usados = {linha["email"] for linha in existentes}
+        
+        # Verifica duplicatas no banco e dentro do próprio lote
+        aceitos = []
+        for indice, (nome, email, telefone, usuario_id) in enumerate(pedidos):
+            if telefone in telefones_usados or email in emails_usados:
+                resultados[indice] = False
+                continue
+            telefones_usados.add(telefone)
+            emails_usados.add(email)
+            aceitos.append(indice)
+        
+        if not aceitos:
+            return resultados
+        
+        # Reserva as versões de cada usuário
+        proxima_versao = {}
+        for usuario_id, quantidade in sorted(Counter(pedidos[i][3] for i in aceitos).items()):
+            reservada = executar(conexao, SQL_RESERVAR_VERSOES, (quantidade, usuario_id)).lastrowid
+            proxima_versao[usuario_id] = reservada - quantidade + 1
+        
+        linhas = []
+        versoes = {}
+        for indice in aceitos:
+            nome, email, telefone, usuario_id = pedidos[indice]
+            versao = proxima_versao[usuario_id]
+            proxima_versao[usuario_id] += 1
+            versoes[indice] = versao
+            linhas.extend((nome, email, telefone, usuario_id, versao, versao))
+        
+        executar(
+            conexao,
+            "INSERT INTO info (nome, email, telefone, usuario_id, versao, versao_criacao) VALUES "
+            + ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(aceitos)),
+            tuple(linhas), preparado=False
+        ).close()
+        
+        chaves = []
+        for indice in aceitos:
+            chaves.extend((pedidos[indice][3], versoes[indice]))
+        with closing(executar(
+            conexao,
+            "SELECT id, usuario_id, versao FROM info WHERE (usuario_id, versao) IN ("
+            + ", ".join(["(%s, %s)"] * len(aceitos)) + ")",
+            tuple(chaves), preparado=False
+        )) as cursor:
+            linhas_ids = cursor.fetchall()
+        ids = {(linha["usuario_id"], linha["versao"]): linha["id"] for linha in linhas_ids}
+        
+        confirmar(conexao)
+        
+        for indice in aceitos:
+            nome, email, telefone, usuario_id = pedidos[indice]
+            versao = versoes[indice]
+            resultados[indice] = {
+                "id": ids[(usuario_id, versao)],
+                "nome": nome,
+                "email": email,
+                "telefone": telefone,
+                "usuario_id": usuario_id,
+                "versao": versao
+            }
+            _notificarAlteracao(usuario_id, "create", resultados[indice]["id"], versao)
+        
+        return resultados
+    
+    except Exception as error:
+        registrar_erro("model._gravarLoteContatos", error)
+        return [None] * len(pedidos)
+    
+    finally:
         if 'conexao' in locals():
-            fecharConexao(conexao, cursor)
+            fecharConexao(conexao)
 
-def getContatos(usuario_id: int):
+# Agrupador das inserções concorrentes (usado quando GROUP_COMMIT=1)
+agrupador_contatos = Agrupador(_gravarLoteContatos, GROUP_COMMIT_JANELA_MS, GROUP_COMMIT_MAX_LOTE)
+
+@rastreado("model.getContatos")
+def getContatos(usuario_id: int, campos: tuple = None, compacto: bool = False):
     """
     Recupera todos os contatos de um usuário.
     
     Args:
         usuario_id (int): ID do usuário proprietário
+        campos (tuple, optional): Colunas a retornar (padrão: todas)
+        compacto (bool): Registros (tuplas + nomes das colunas) em vez
+                         da lista de dicionários
     
     Returns:
-        list: Lista de contatos ou None em caso de erro
+        list | Registros: Contatos ou None em caso de erro
+    
+    Notes:
+        - A lista de dicionários vem direto do cursor de dicionários;
+          o formato compacto serve a quem não precisa de um dicionário
+          por linha (.colunar(), duplicados)
     """
     try:
-        conexao, cursor = entrarBanco()
+        conexao = entrarBanco()
         if not conexao:
             return None
             
-        cursor.execute("SELECT * FROM info WHERE usuario_id = %s", (usuario_id,))
-        return cursor.fetchall()
+        sql = SQL_CONTATOS_POR_USUARIO
+        if campos:
+            sql = f"SELECT {colunasContato(campos)} FROM info WHERE usuario_id = %s"
+        if compacto:
+            return buscar_registros(conexao, sql, (usuario_id,))
+        return buscar_todos(conexao, sql, (usuario_id,))
     except Exception as error:
+        registrar_erro("model.getContatos", error)
         return None
     finally:
         if 'conexao' in locals():
-            fecharConexao(conexao, cursor)
+            fecharConexao(conexao)
 
-def getContatoById(contato_id: int, usuario_id: int):
+@rastreado("model.getContatoById")
+def getContatoById(contato_id: int, usuario_id: int, campos: tuple = None):
     """
     Recupera um contato específico pelo ID com verificação de propriedade.
     
     Args:
         contato_id (int): ID do contato
         usuario_id (int): ID do usuário proprietário
+        campos (tuple, optional): Colunas a retornar (padrão: todas)
     
     Returns:
         dict: Dados do contato ou None se não encontrado/erro
     """
     try:
-        conexao, cursor = entrarBanco()
+        conexao = entrarBanco()
         if not conexao:
             return None
             
-        cursor.execute("SELECT * FROM info WHERE id = %s AND usuario_id = %s", (contato_id, usuario_id))
-        return cursor.fetchone()
+        sql = SQL_CONTATO_POR_ID
+        if campos:
+            sql = f"SELECT {colunasContato(campos)} FROM info WHERE id = %s AND usuario_id = %s"
+        return buscar_um(conexao, sql, (contato_id, usuario_id))
+    except Exception as error:
+        registrar_erro("model.getContatoById", error)
+        return None
+    finally:
+        if 'conexao' in locals():
+            fecharConexao(conexao)
+
+@rastreado("model.getContatosPorTelefones")
+def getContatosPorTelefones(usuario_id: int, telefones: list):
+    """
+    Resolve vários telefones de uma vez (identificação de chamadas).
+    
+    Args:
+        usuario_id (int): ID do usuário proprietário
+        telefones (list): Telefones normalizados (11 dígitos, sem repetição)
+    
+    Returns:
+        dict: telefone -> {id, nome, telefone} dos encontrados, ou None
+              em caso de erro
+    
+    Notes:
+        - Uma consulta IN por lote de até 1024 telefones, resolvida pelo
+          índice idx_info_usuario_telefone_nome (sem acessar as linhas)
+        - Com mais de um contato no mesmo telefone, vence o de menor ID
+    """
+    try:
+        conexao = entrarBanco()
+        if not conexao:
+            return None
+        
+        encontrados = {}
+        for lote in lotes_in(telefones):
+            sql = SQL_CONTATOS_POR_TELEFONES.format(marcadores(len(lote)))
+            for contato in buscar_todos(conexao, sql, (usuario_id, *lote)):
+                atual = encontrados.get(contato["telefone"])
+                if atual is None or contato["id"] < atual["id"]:
+                    encontrados[contato["telefone"]] = contato
+        return encontrados
     except Exception as error:
+        registrar_erro("model.getContatosPorTelefones", error)
         return None
     finally:
         if 'conexao' in locals():
-            fecharConexao(conexao, cursor)
+            fecharConexao(conexao)
 
+@rastreado("model.getAlteracoesContatos")
+def getAlteracoesContatos(usuario_id: int, desde: int):
+    """
+    Recupera as alterações nos contatos de um usuário após uma versão.
+    
+    Args:
+        usuario_id (int): ID do usuário proprietário
+        desde (int): Última versão conhecida pelo cliente (0 = tudo)
+    
+    Returns:
+        dict: 'criados', 'atualizados', 'excluidos' (IDs) e 'versao'
+              (próximo token de sincronização), ou None em caso de erro
+    
+    Notes:
+        - As três consultas usam o mesmo snapshot da transação, então o
+          token retornado cobre exatamente as alterações retornadas
+        - Custo proporcional ao número de alterações (índices em
+          (usuario_id, versao))
+    """
+    try:
+        conexao = entrarBanco()
+        if not conexao:
+            return None
+        
+        conexao.start_transaction(readonly=True)
+        versao = buscar_um(conexao, SQL_VERSAO_ATUAL, (usuario_id,))
+        if versao is None:
+            return None
+        
+        alterados = buscar_todos(conexao, SQL_CONTATOS_ALTERADOS, (usuario_id, desde))
+        excluidos = buscar_todos(conexao, SQL_CONTATOS_EXCLUIDOS, (usuario_id, desde))
+        
+        return {
+            "criados": [contato for contato in alterados if contato["versao_criacao"] > desde],
+            "atualizados": [contato for contato in alterados if contato["versao_criacao"] <= desde],
+            "excluidos": [excluido["contato_id"] for excluido in excluidos],
+            "versao": versao["versao_contatos"]
+        }
+    except Exception as error:
+        registrar_erro("model.getAlteracoesContatos", error)
+        return None
+    finally:
+        if 'conexao' in locals():
+            fecharConexao(conexao)
+
+@rastreado("model.updateContato")
 def updateContato(contato_id: int, usuario_id: int, nome: str = None, email: str = None, telefone: str = None):
     """
     Atualiza um contato existente com campos opcionais.
@@ -207,48 +624,27 @@ def updateContato(contato_id: int, usuario_id: int, nome: str = None, email: str
         bool: True se atualizado com sucesso, False caso contrário
     """
     try:
-        conexao, cursor = entrarBanco()
+        conexao = entrarBanco()
         if not conexao:
             return False
         
-        # Verifica existência e propriedade do contato
-        cursor.execute("SELECT * FROM info WHERE id = %s AND usuario_id = %s", (contato_id, usuario_id))
-        if not cursor.fetchone():
-            return False
-        
-        # Constrói query dinamicamente com campos fornecidos
-        updates = []
-        params = []
-        if nome:
-            updates.append("nome = %s")
-            params.append(nome)
-        if email:
-            updates.append("email = %s")
-            params.append(email)
-        if telefone:
-            updates.append("telefone = %s")
-            params.append(telefone)
-        
-        # Se nenhum campo para atualizar
-        if not updates:
+        versao = _atualizarContato(conexao, contato_id, usuario_id, nome, email, telefone)
+        if not versao:
             return False
-        
-        # Adiciona condições WHERE
-        params.extend([contato_id, usuario_id])
-        query = f"UPDATE info SET {', '.join(updates)} WHERE id = %s AND usuario_id = %s"
-        
-        cursor.execute(query, tuple(params))
-        conexao.commit()
+        confirmar(conexao)
+        _notificarAlteracao(usuario_id, "update", contato_id, versao)
         
         return True
     
     except Exception as error:
+        registrar_erro("model.updateContato", error)
         return False
     
     finally:
         if 'conexao' in locals():
-            fecharConexao(conexao, cursor)
+            fecharConexao(conexao)
 
+@rastreado("model.deleteContato")
 def deleteContato(contato_id: int, usuario_id: int):
     """
     Exclui um contato com verificação de propriedade.
@@ -261,32 +657,490 @@ def deleteContato(contato_id: int, usuario_id: int):
         bool: True se excluído com sucesso, False caso contrário
     """
     try:
-        conexao, cursor = entrarBanco()
+        conexao = entrarBanco()
         if not conexao:
             return False
         
-        # Verifica existência e propriedade antes de excluir
-        cursor.execute("SELECT * FROM info WHERE id = %s AND usuario_id = %s", (contato_id, usuario_id))
-        if not cursor.fetchone():
+        versao = _excluirContato(conexao, contato_id, usuario_id)
+        if not versao:
             return False
-        
-        # Executa exclusão
-        cursor.execute("DELETE FROM info WHERE id = %s AND usuario_id = %s", (contato_id, usuario_id))
-        conexao.commit()
+        confirmar(conexao)
+        _notificarAlteracao(usuario_id, "delete", contato_id, versao)
         
         return True
     
     except Exception as error:
+        registrar_erro("model.deleteContato", error)
         return False
     
     finally:
         if 'conexao' in locals():
-            fecharConexao(conexao, cursor)
+            fecharConexao(conexao)
+
+@rastreado("model.executarLoteContatos")
+def executarLoteContatos(usuario_id: int, operacoes: list, transacional: bool = True):
+    """
+    Executa várias operações de contato em uma única conexão.
+    
+    Args:
+        usuario_id (int): ID do usuário proprietário
+        operacoes (list): Dicionários já validados com as chaves
+                          'operacao' (create/update/delete), 'id',
+                          'nome', 'email' e 'telefone'
+        transacional (bool): True para tudo-ou-nada em uma transação;
+                             False para isolar cada operação em um
+                             SAVEPOINT e confirmar as bem-sucedidas
+    
+    Returns:
+        list: Um resultado por operação, na ordem recebida, ou None se
+              não foi possível acessar o banco
+    
+    Notes:
+        - No modo transacional, a primeira falha desfaz o lote inteiro e
+          as operações seguintes não são executadas
+        - No modo não transacional, se o próprio SAVEPOINT falhar (conexão
+          perdida, KILL) ou o commit falhar, o lote inteiro é desfeito e
+          todos os resultados indicam que nada foi aplicado
+    """
+    try:
+        conexao = entrarBanco()
+        if not conexao:
+            return None
+        
+        cursor_texto = conexao.cursor()
+        resultados = []
+        alteracoes = []
+        falhou = False
+        
+        for indice, op in enumerate(operacoes):
+            if falhou:
+                resultados.append({"indice": indice, "operacao": op["operacao"], "sucesso": False,
+                                   "mensagem": "Não executada: lote desfeito.", "data": None})
+                continue
+            
+            if not transacional:
+                try:
+                    cursor_texto.execute("SAVEPOINT operacao_lote")
+                except Exception as error:
+                    registrar_erro("model.executarLoteContatos", error)
+                    desfazerTransacao(conexao)
+                    falhou = True
+                    resultados.append({"indice": indice, "operacao": op["operacao"], "sucesso": False,
+                                       "mensagem": "Não executada: lote desfeito.", "data": None})
+                    continue
+            
+            try:
+                if op["operacao"] == "create":
+                    data = _inserirContato(conexao, op["nome"], op["email"], op["telefone"], usuario_id)
+                    sucesso = data is not None
+                    mensagem = "Contato criado com sucesso." if sucesso else "Telefone ou email já cadastrado."
+                    versao = data["versao"] if sucesso else None
+                    contato_id = data["id"] if sucesso else None
+                elif op["operacao"] == "update":
+                    data = None
+                    versao = _atualizarContato(conexao, op["id"], usuario_id, op["nome"], op["email"], op["telefone"])
+                    sucesso = bool(versao)
+                    mensagem = "Contato atualizado com sucesso." if sucesso else "Contato não encontrado ou acesso não autorizado."
+                    contato_id = op["id"]
+                else:
+                    data = None
+                    versao = _excluirContato(conexao, op["id"], usuario_id)
+                    sucesso = bool(versao)
+                    mensagem = "Contato deletado com sucesso." if sucesso else "Contato não encontrado ou acesso não autorizado."
+                    contato_id = op["id"]
+            except Exception as error:
+                registrar_erro("model.executarLoteContatos", error)
+                data, sucesso, mensagem = None, False, "Erro ao executar operação."
+            
+            if sucesso:
+                alteracoes.append((op["operacao"], contato_id, versao))
+            
+            if not sucesso:
+                if transacional:
+                    desfazerTransacao(conexao)
+                    falhou = True
+                else:
+                    try:
+                        cursor_texto.execute("ROLLBACK TO SAVEPOINT operacao_lote")
+                    except Exception as error:
+                        # Sem o savepoint não se sabe o que ficou aplicado: desfaz tudo
+                        registrar_erro("model.executarLoteContatos", error)
+                        desfazerTransacao(conexao)
+                        falhou = True
+            
+            resultados.append({"indice": indice, "operacao": op["operacao"], "sucesso": sucesso,
+                               "mensagem": mensagem, "data": data})
+        
+        if not falhou:
+            try:
+                confirmar(conexao)
+            except Exception as error:
+                registrar_erro("model.executarLoteContatos", error)
+                desfazerTransacao(conexao)
+                falhou = True
+        
+        if falhou:
+            # Operações anteriores à falha também foram desfeitas
+            for resultado in resultados:
+                if resultado["sucesso"]:
+                    resultado["sucesso"] = False
+                    resultado["mensagem"] = "Desfeita: lote desfeito."
+                    resultado["data"] = None
+        else:
+            for tipo, contato_id, versao in alteracoes:
+                _notificarAlteracao(usuario_id, tipo, contato_id, versao)
+        
+        cursor_texto.close()
+        return resultados
+    
+    except Exception as error:
+        registrar_erro("model.executarLoteContatos", error)
+        return None
+    
+    finally:
+        if 'conexao' in locals():
+            fecharConexao(conexao)
+
+@rastreado("model.mesclarContatos")
+def mesclarContatos(usuario_id: int, manter_id: int, remover_ids: list, nome: str = None, email: str = None, telefone: str = None):
+    """
+    Mescla contatos duplicados em um único contato, em uma transação.
+    
+    Args:
+        usuario_id (int): ID do usuário proprietário
+        manter_id (int): Contato que permanece
+        remover_ids (list): Contatos excluídos (duplicados de manter_id)
+        nome, email, telefone (str, optional): Valores finais do contato
+                                               mantido (ex.: escolhidos
+                                               entre os duplicados)
+    
+    Returns:
+        dict: {'id', 'removidos'} se mesclado, False se algum contato não
+              existe ou não pertence ao usuário, None em caso de erro
+    
+    Notes:
+        - Os duplicados são excluídos antes da atualização, para que o
+          contato mantido possa herdar o telefone ou email de um deles
+    """
+    try:
+        conexao = entrarBanco()
+        if not conexao:
+            return None
+        
+        if not buscar_um(conexao, SQL_CONTATO_EXISTE, (manter_id, usuario_id)):
+            return False
+        
+        alteracoes = []
+        for contato_id in remover_ids:
+            # O contato mantido herda as etiquetas do duplicado
+            executar(conexao, SQL_HERDAR_ETIQUETAS, (manter_id, contato_id))
+            versao = _excluirContato(conexao, contato_id, usuario_id)
+            if not versao:
+                conexao.rollback()
+                return False
+            alteracoes.append(("delete", contato_id, versao))
+        
+        if nome or email or telefone:
+            versao = _atualizarContato(conexao, manter_id, usuario_id, nome, email, telefone)
+            alteracoes.append(("update", manter_id, versao))
+        
+        confirmar(conexao)
+        for tipo, contato_id, versao in alteracoes:
+            _notificarAlteracao(usuario_id, tipo, contato_id, versao)
+        # Etiquetas herdadas não passam pelos eventos: recarrega o índice
+        indice_etiquetas.descartar(usuario_id)
+        
+        return {"id": manter_id, "removidos": list(remover_ids)}
+    
+    except Exception as error:
+        registrar_erro("model.mesclarContatos", error)
+        return None
+    
+    finally:
+        if 'conexao' in locals():
+            fecharConexao(conexao)
+
+# =============================================================================
+#                           ETIQUETAS
+# =============================================================================
+
+def _buscarContatosPorIds(conexao, usuario_id: int, ids: list, campos: tuple = None, compacto: bool = False):
+    """
+    Lê os contatos de uma lista de IDs, com verificação de propriedade.
+    
+    Args:
+        conexao: Conexão obtida por entrarBanco()
+        usuario_id (int): ID do usuário proprietário
+        ids (list): IDs em ordem crescente, sem repetição
+        campos (tuple, optional): Colunas a retornar (padrão: todas)
+        compacto (bool): Registros em vez da lista de dicionários
+    
+    Returns:
+        list | Registros: Contatos encontrados, em ordem de ID
+    """
+    colunas = colunasContato(campos)
+    if not compacto:
+        contatos = []
+        for lote in lotes_in(ids):
+            sql = SQL_CONTATOS_POR_IDS.format(colunas, marcadores(len(lote)))
+            contatos.extend(buscar_todos(conexao, sql, (usuario_id, *lote)))
+        return contatos
+    
+    linhas = []
+    registros = None
+    # O ID 0 nunca existe: a lista vazia ainda informa as colunas
+    for lote in lotes_in(ids or [0]):
+        sql = SQL_CONTATOS_POR_IDS.format(colunas, marcadores(len(lote)))
+        registros = buscar_registros(conexao, sql, (usuario_id, *lote))
+        linhas.extend(registros.linhas)
+    registros.linhas = linhas
+    return registros
+
+@rastreado("model.getContatosPorIds")
+def getContatosPorIds(usuario_id: int, ids: list, campos: tuple = None):
+    """
+    Recupera vários contatos pelo ID, com verificação de propriedade.
+    
+    Args:
+        usuario_id (int): ID do usuário proprietário
+        ids (list): IDs dos contatos (sem repetição)
+        campos (tuple, optional): Colunas a retornar (devem incluir 'id')
+    
+    Returns:
+        dict: id -> dados dos contatos encontrados, ou None em caso de erro
+    
+    Notes:
+        - Uma consulta IN por lote de até 1024 IDs, na mesma conexão;
+          IDs de outros usuários não são encontrados
+    """
+    try:
+        conexao = entrarBanco()
+        if not conexao:
+            return None
+        
+        contatos = _buscarContatosPorIds(conexao, usuario_id, sorted(ids), campos)
+        return {contato["id"]: contato for contato in contatos}
+    except Exception as error:
+        registrar_erro("model.getContatosPorIds", error)
+        return None
+    finally:
+        if 'conexao' in locals():
+            fecharConexao(conexao)
+
+def _carregarAgenda(conexao, usuario_id: int):
+    """
+    Lê os contatos e etiquetas do usuário para o índice em memória.
+    
+    Returns:
+        tuple: (IDs dos contatos, etiqueta_id -> IDs, nome -> etiqueta_id)
+    """
+    contatos = {linha[0] for linha in buscar_registros(conexao, SQL_IDS_CONTATOS, (usuario_id,)).linhas}
+    nomes = {nome: etiqueta_id for etiqueta_id, nome in buscar_registros(conexao, SQL_ETIQUETAS_USUARIO, (usuario_id,)).linhas}
+    etiquetas = {etiqueta_id: set() for etiqueta_id in nomes.values()}
+    for etiqueta_id, contato_id in buscar_registros(conexao, SQL_ETIQUETAS_CONTATOS, (usuario_id,)).linhas:
+        etiquetas[etiqueta_id].add(contato_id)
+    return contatos, etiquetas, nomes
+
+def _consultarAgenda(conexao, usuario_id: int, consulta):
+    """
+    Executa consulta(agenda) no índice, na versão atual do banco.
+    
+    Notes:
+        - Abre uma transação somente leitura: a versão, a carga do índice
+          (se necessária) e as leituras seguintes usam o mesmo snapshot
+    """
+    conexao.start_transaction(readonly=True)
+    versao = buscar_um(conexao, SQL_VERSAO_ATUAL, (usuario_id,))["versao_contatos"]
+    return indice_etiquetas.consultar(usuario_id, versao, lambda: _carregarAgenda(conexao, usuario_id), consulta)
+
+@rastreado("model.getEtiquetas")
+def getEtiquetas(usuario_id: int):
+    """
+    Lista as etiquetas do usuário com a quantidade de contatos de cada uma.
+    
+    Returns:
+        list: {id, nome, contatos} em ordem de nome, ou None em caso de erro
+    """
+    try:
+        conexao = entrarBanco()
+        if not conexao:
+            return None
+        
+        return _consultarAgenda(conexao, usuario_id, resumo)
+    except Exception as error:
+        registrar_erro("model.getEtiquetas", error)
+        return None
+    finally:
+        if 'conexao' in locals():
+            fecharConexao(conexao)
+
+@rastreado("model.getContatosPorEtiquetas")
+def getContatosPorEtiquetas(usuario_id: int, arvore, campos: tuple = None, compacto: bool = False):
+    """
+    Recupera os contatos que satisfazem uma expressão de etiquetas.
+    
+    Args:
+        usuario_id (int): ID do usuário proprietário
+        arvore: Expressão já analisada (etiquetas.analisar_expressao)
+        campos (tuple, optional): Colunas a retornar (padrão: todas)
+        compacto (bool): Registros em vez da lista de dicionários
+    
+    Returns:
+        list | Registros: Contatos filtrados, em ordem de ID, ou None em
+                          caso de erro
+    
+    Notes:
+        - O filtro é resolvido no índice em memória; o banco só lê as
+          linhas do resultado (consultas IN pela chave primária)
+    """
+    try:
+        conexao = entrarBanco()
+        if not conexao:
+            return None
+        
+        ids = _consultarAgenda(conexao, usuario_id, lambda agenda: filtrar(agenda, arvore))
+        return _buscarContatosPorIds(conexao, usuario_id, ids, campos, compacto)
+    except Exception as error:
+        registrar_erro("model.getContatosPorEtiquetas", error)
+        return None
+    finally:
+        if 'conexao' in locals():
+            fecharConexao(conexao)
+
+@rastreado("model.postEtiqueta")
+def postEtiqueta(usuario_id: int, nome: str):
+    """
+    Cria uma etiqueta para o usuário.
+    
+    Args:
+        usuario_id (int): ID do usuário proprietário
+        nome (str): Nome normalizado (etiquetas.normalizar_nome)
+    
+    Returns:
+        dict: {id, nome} se criada, False se o nome já existe, None em
+              caso de erro
+    """
+    try:
+        conexao = entrarBanco()
+        if not conexao:
+            return None
+        
+        if buscar_um(conexao, SQL_ETIQUETA_POR_NOME, (usuario_id, nome)):
+            return False
+        
+        versao = _proximaVersao(conexao, usuario_id)
+        etiqueta_id = executar(conexao, SQL_INSERIR_ETIQUETA, (usuario_id, nome)).lastrowid
+        confirmar(conexao)
+        
+        def alteracao(agenda):
+            agenda.nomes[nome] = etiqueta_id
+            agenda.etiquetas[etiqueta_id] = set()
+        indice_etiquetas.aplicar(usuario_id, versao, alteracao)
+        
+        return {"id": etiqueta_id, "nome": nome}
+    except Exception as error:
+        registrar_erro("model.postEtiqueta", error)
+        return None
+    finally:
+        if 'conexao' in locals():
+            fecharConexao(conexao)
+
+@rastreado("model.deleteEtiqueta")
+def deleteEtiqueta(usuario_id: int, etiqueta_id: int):
+    """
+    Exclui uma etiqueta (e suas associações com contatos).
+    
+    Returns:
+        bool: True se excluída, False se inexistente ou de outro usuário,
+              None em caso de erro
+    """
+    try:
+        conexao = entrarBanco()
+        if not conexao:
+            return None
+        
+        if not buscar_um(conexao, SQL_ETIQUETA_EXISTE, (etiqueta_id, usuario_id)):
+            return False
+        
+        versao = _proximaVersao(conexao, usuario_id)
+        executar(conexao, SQL_EXCLUIR_ETIQUETA, (etiqueta_id, usuario_id))
+        confirmar(conexao)
+        
+        indice_etiquetas.aplicar(usuario_id, versao, lambda agenda: agenda.remover_etiqueta(etiqueta_id))
+        return True
+    except Exception as error:
+        registrar_erro("model.deleteEtiqueta", error)
+        return None
+    finally:
+        if 'conexao' in locals():
+            fecharConexao(conexao)
+
+@rastreado("model.etiquetarContatos")
+def etiquetarContatos(usuario_id: int, etiqueta_id: int, contato_ids: list, remover: bool = False):
+    """
+    Associa (ou desassocia) uma etiqueta a vários contatos.
+    
+    Args:
+        usuario_id (int): ID do usuário proprietário
+        etiqueta_id (int): Etiqueta do usuário
+        contato_ids (list): IDs dos contatos, sem repetição
+        remover (bool): True para retirar a etiqueta dos contatos
+    
+    Returns:
+        dict: 'alterados' e 'nao_encontrados' (IDs), False se a etiqueta
+              não existe ou é de outro usuário, None em caso de erro
+    
+    Notes:
+        - Uma consulta IN por lote de IDs; IDs de outros usuários são
+          tratados como não encontrados
+    """
+    try:
+        conexao = entrarBanco()
+        if not conexao:
+            return None
+        
+        if not buscar_um(conexao, SQL_ETIQUETA_EXISTE, (etiqueta_id, usuario_id)):
+            return False
+        
+        existentes = set()
+        for lote in lotes_in(contato_ids):
+            sql = SQL_IDS_CONTATOS_EM.format(marcadores(len(lote)))
+            existentes.update(linha["id"] for linha in buscar_todos(conexao, sql, (usuario_id, *lote)))
+        alterados = [contato_id for contato_id in contato_ids if contato_id in existentes]
+        
+        if alterados:
+            versao = _proximaVersao(conexao, usuario_id)
+            for lote in lotes_in(alterados):
+                if remover:
+                    executar(conexao, SQL_DESETIQUETAR_CONTATOS.format(marcadores(len(lote))), (etiqueta_id, *lote))
+                else:
+                    executar(conexao, SQL_ETIQUETAR_CONTATOS.format(marcadores(len(lote))), (etiqueta_id, usuario_id, *lote))
+            confirmar(conexao)
+            
+            def alteracao(agenda):
+                membros = agenda.etiquetas.setdefault(etiqueta_id, set())
+                if remover:
+                    membros.difference_update(alterados)
+                else:
+                    membros.update(alterados)
+            indice_etiquetas.aplicar(usuario_id, versao, alteracao)
+        
+        return {
+            "alterados": alterados,
+            "nao_encontrados": [contato_id for contato_id in contato_ids if contato_id not in existentes]
+        }
+    except Exception as error:
+        registrar_erro("model.etiquetarContatos", error)
+        return None
+    finally:
+        if 'conexao' in locals():
+            fecharConexao(conexao)
 
 # =============================================================================
 #                           OPERAÇÕES DE USUÁRIOS
 # =============================================================================
 
+@rastreado("model.postUsuario")
 def postUsuario(nome: str, email: str, senha_hash: str):
     """
     Cria um novo usuário no sistema.
@@ -300,21 +1154,21 @@ def postUsuario(nome: str, email: str, senha_hash: str):
         dict: Dados do usuário criado ou None em caso de erro/duplicata
     """
     try:
-        conexao, cursor = entrarBanco()
+        conexao = entrarBanco()
         if not conexao:
             return None
         
         # Verifica duplicata de email
-        cursor.execute("SELECT * FROM usuarios WHERE email = %s", (email,))
-        if cursor.fetchone():
+        if buscar_um(conexao, SQL_USUARIO_POR_EMAIL, (email,)):
             return None
         
         # Insere novo usuário
-        cursor.execute(
-            "INSERT INTO usuarios (nome, email, senha_hash) VALUES (%s, %s, %s)",
+        cursor = executar(
+            conexao,
+            SQL_INSERIR_USUARIO,
             (nome, email, senha_hash)
         )
-        conexao.commit()
+        confirmar(conexao)
         
         # Retorna dados do usuário criado (sem senha)
         return {
@@ -324,12 +1178,14 @@ def postUsuario(nome: str, email: str, senha_hash: str):
         }
     
     except Exception as error:
+        registrar_erro("model.postUsuario", error)
         return None
     
     finally:
         if 'conexao' in locals():
-            fecharConexao(conexao, cursor)
+            fecharConexao(conexao)
 
+@rastreado("model.loginUsuario")
 def loginUsuario(email: str):
     """
     Busca um usuário pelo email para operações de login.
@@ -341,20 +1197,21 @@ def loginUsuario(email: str):
         dict: Dados completos do usuário (incluindo senha_hash) ou None
     """
     try:
-        conexao, cursor = entrarBanco()
+        conexao = entrarBanco()
         if not conexao:
             return None
             
-        cursor.execute("SELECT * FROM usuarios WHERE email = %s", (email,))
-        return cursor.fetchone()
+        return buscar_um(conexao, SQL_USUARIO_POR_EMAIL, (email,))
     
     except Exception as error:
+        registrar_erro("model.loginUsuario", error)
         return None
     
     finally:
         if 'conexao' in locals():
-            fecharConexao(conexao, cursor)
+            fecharConexao(conexao)
 
+@rastreado("model.getUsuarioById")
 def getUsuarioById(usuario_id: int):
     """
     Busca um usuário pelo ID para verificação de token.
@@ -366,14 +1223,14 @@ def getUsuarioById(usuario_id: int):
         dict: Dados do usuário ou None se não encontrado
     """
     try:
-        conexao, cursor = entrarBanco()
+        conexao = entrarBanco()
         if not conexao:
             return None
             
-        cursor.execute("SELECT * FROM usuarios WHERE id = %s", (usuario_id,))
-        return cursor.fetchone()
+        return buscar_um(conexao, SQL_USUARIO_POR_ID, (usuario_id,))
     except Exception as error:
+        registrar_erro("model.getUsuarioById", error)
         return None
     finally:
         if 'conexao' in locals():
-            fecharConexao(conexao, cursor)
\ No newline at end of file
+            fecharConexao(conexao)
\ No newline at end of file
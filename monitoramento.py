@@ -0,0 +1,229 @@
+"""
+Módulo de Monitoramento - API RESTful
+
+Fornece endpoints de leitura do estado interno da aplicação para
+painéis de monitoramento e verificações de saúde.
+
+Autor: Henrique Teixeira
+Versão: 1.0.0
+Data: 2024-01-15
+
+Endpoints (todos exigem o cabeçalho X-Admin-Token):
+    - /monitoramento/banco: estado do disjuntor do banco de dados
+    - /monitoramento/coalescencia: leituras economizadas pelo single-flight
+    - /monitoramento/eventos: conexões do hub de eventos em tempo real
+    - /monitoramento/traces: spans coletados e resumo de latência por fase
+    - /monitoramento/logs: fila do escritor de logs (pendentes/descartes)
+    - /monitoramento/perfil: perfil de CPU por amostragem
+    - /monitoramento/loop: histograma de atraso e bloqueios do event loop
+    - /monitoramento/etiquetas: agendas do índice de etiquetas em memória
+"""
+
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Optional
+from response import ok, bad_request, acesso_negado
+from disjuntor import disjuntor_banco
+from coalescencia import coalescedor_leituras
+from eventos import hub_contatos
+from etiquetas import indice_etiquetas
+from rastreamento import coletor
+from registro import escritor
+from vigia_loop import vigia_loop
+from perfilador import perfilador, colapsadas_texto, ADMIN_TOKEN, PERFIL_MAX_SEGUNDOS, PERFIL_INTERVALO_MS
+import hmac
+
+# =============================================================================
+#                           CONFIGURAÇÃO DO ROTEADOR
+# =============================================================================
+router = APIRouter(prefix="/monitoramento", tags=["monitoramento"])
+
+def admin_autorizado(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Dependência: confere o cabeçalho X-Admin-Token das rotas de monitoramento.
+    
+    Args:
+        x_admin_token (str): Valor recebido no cabeçalho
+    
+    Returns:
+        bool: True se ADMIN_TOKEN está configurado e o valor confere
+              (comparação em tempo constante)
+    """
+    return bool(ADMIN_TOKEN and x_admin_token and hmac.compare_digest(x_admin_token, ADMIN_TOKEN))
+
+# =============================================================================
+#                           ENDPOINTS DE MONITORAMENTO
+# =============================================================================
+
+@router.get("/banco")
+async def estado_banco(autorizado: bool = Depends(admin_autorizado)):
+    """
+    Retorna o estado do disjuntor do banco de dados.
+    
+    Args:
+        autorizado (bool): X-Admin-Token confere com ADMIN_TOKEN
+    
+    Returns:
+        JSONResponse: estado (fechado/aberto/semi_aberto), falhas
+                      consecutivas, rejeições e número de aberturas
+    """
+    if not autorizado:
+        return acesso_negado("Acesso restrito à administração.")
+    return ok("Estado do banco obtido com sucesso.", disjuntor_banco.estado())
+
+@router.get("/coalescencia")
+async def estado_coalescencia(autorizado: bool = Depends(admin_autorizado)):
+    """
+    Retorna os contadores do coalescedor de leituras.
+    
+    Args:
+        autorizado (bool): X-Admin-Token confere com ADMIN_TOKEN
+    
+    Returns:
+        JSONResponse: chamadas recebidas, chamadas economizadas e
+                      execuções em andamento
+    """
+    if not autorizado:
+        return acesso_negado("Acesso restrito à administração.")
+    return ok("Estatísticas de coalescência obtidas com sucesso.", coalescedor_leituras.estatisticas())
+
+@router.get("/etiquetas")
+async def estado_etiquetas(autorizado: bool = Depends(admin_autorizado)):
+    """
+    Retorna os contadores do índice de etiquetas em memória.
+    
+    Args:
+        autorizado (bool): X-Admin-Token confere com ADMIN_TOKEN
+    
+    Returns:
+        JSONResponse: agendas em memória, consultas atendidas pelo índice,
+                      cargas do banco e agendas descartadas
+    """
+    if not autorizado:
+        return acesso_negado("Acesso restrito à administração.")
+    return ok("Estatísticas de etiquetas obtidas com sucesso.", indice_etiquetas.estatisticas())
+
+@router.get("/eventos")
+async def estado_eventos(autorizado: bool = Depends(admin_autorizado)):
+    """
+    Retorna os contadores do hub de eventos em tempo real.
+    
+    Args:
+        autorizado (bool): X-Admin-Token confere com ADMIN_TOKEN
+    
+    Returns:
+        JSONResponse: usuários e conexões ativas, eventos publicados e
+                      conexões removidas por lentidão
+    """
+    if not autorizado:
+        return acesso_negado("Acesso restrito à administração.")
+    return ok("Estatísticas de eventos obtidas com sucesso.", hub_contatos.estatisticas())
+
+@router.get("/traces")
+async def listar_traces(trace_id: Optional[str] = None, autorizado: bool = Depends(admin_autorizado)):
+    """
+    Retorna os spans coletados em memória.
+    
+    Args:
+        trace_id (str, optional): Filtra uma trace específica
+        autorizado (bool): X-Admin-Token confere com ADMIN_TOKEN
+    
+    Returns:
+        JSONResponse: Lista de spans (nome, pai, duração e atributos)
+    
+    Notes:
+        - Restrito à administração: os atributos trazem SQL e IDs de usuários
+    """
+    if not autorizado:
+        return acesso_negado("Acesso restrito à administração.")
+    return ok("Spans obtidos com sucesso.", coletor.spans(trace_id))
+
+@router.get("/traces/resumo")
+async def resumo_traces(autorizado: bool = Depends(admin_autorizado)):
+    """
+    Retorna a latência agregada por fase (autenticação, banco, resposta...).
+    
+    Args:
+        autorizado (bool): X-Admin-Token confere com ADMIN_TOKEN
+    
+    Returns:
+        JSONResponse: quantidade, total, média e máximo (ms) por span
+    """
+    if not autorizado:
+        return acesso_negado("Acesso restrito à administração.")
+    return ok("Resumo de latência obtido com sucesso.", coletor.resumo())
+
+@router.get("/logs")
+async def estado_logs(autorizado: bool = Depends(admin_autorizado)):
+    """
+    Retorna o estado da fila do escritor de logs.
+    
+    Args:
+        autorizado (bool): X-Admin-Token confere com ADMIN_TOKEN
+    
+    Returns:
+        JSONResponse: linhas pendentes, descartadas e omitidas por amostragem
+    """
+    if not autorizado:
+        return acesso_negado("Acesso restrito à administração.")
+    return ok("Estado dos logs obtido com sucesso.", escritor.estatisticas())
+
+@router.get("/loop")
+async def estado_loop(autorizado: bool = Depends(admin_autorizado)):
+    """
+    Retorna o atraso do event loop e os últimos bloqueios detectados.
+    
+    Args:
+        autorizado (bool): X-Admin-Token confere com ADMIN_TOKEN
+    
+    Returns:
+        JSONResponse: histograma de atraso (baldes, média, p50, p99,
+                      máximo) e bloqueios com rota e pilha
+    
+    Notes:
+        - Requer LOOP_WATCHDOG=1 (caso contrário 'ativo' é False)
+        - Restrito à administração: expõe pilhas e rotas da aplicação
+    """
+    if not autorizado:
+        return acesso_negado("Acesso restrito à administração.")
+    return ok("Estado do event loop obtido com sucesso.", vigia_loop.estatisticas())
+
+@router.get("/perfil")
+async def perfil_cpu(segundos: float = 10, intervalo_ms: float = PERFIL_INTERVALO_MS, formato: str = "json",
+                     ociosas: bool = False, autorizado: bool = Depends(admin_autorizado)):
+    """
+    Executa o profiler por amostragem no worker atual.
+    
+    Args:
+        segundos (float): Duração da amostragem (até PERFIL_MAX_SEGUNDOS)
+        intervalo_ms (float): Intervalo entre amostras (mínimo 1 ms)
+        formato (str): 'json' (resumo + pilhas) ou 'colapsado' (texto
+                       pronto para flamegraph.pl / speedscope)
+        ociosas (bool): Inclui threads paradas em espera (I/O, locks)
+        autorizado (bool): X-Admin-Token confere com ADMIN_TOKEN
+    
+    Returns:
+        JSONResponse | PlainTextResponse: Funções mais frequentes
+                                          (exclusivo/inclusivo) e pilhas
+    
+    Notes:
+        - A amostragem roda no threadpool; o event loop continua
+          atendendo (e aparece no perfil como MainThread)
+    """
+    if not autorizado:
+        return acesso_negado("Acesso restrito à administração.")
+    if not 0 < segundos <= PERFIL_MAX_SEGUNDOS:
+        return bad_request(f"Duração inválida. Deve estar entre 0 e {PERFIL_MAX_SEGUNDOS:g} segundos.")
+    if intervalo_ms < 1:
+        return bad_request("Intervalo inválido. Mínimo de 1 ms.")
+    if formato not in ("json", "colapsado"):
+        return bad_request("Formato inválido. Use 'json' ou 'colapsado'.")
+    
+    perfil = await run_in_threadpool(perfilador.amostrar, segundos, intervalo_ms, 30, ociosas)
+    if perfil is None:
+        return bad_request("Já existe um perfil em andamento.")
+    
+    if formato == "colapsado":
+        return PlainTextResponse(colapsadas_texto(perfil["colapsadas"]))
+    return ok("Perfil coletado com sucesso.", perfil)
@@ -0,0 +1,113 @@
+-- =============================================================================
+--                     ESQUEMA DO BANCO DE DADOS - contacts
+-- =============================================================================
+-- Estrutura usada por model.py:
+--   usuarios: id, nome, email, senha_hash, versao_contatos
+--   info: id, nome, email, telefone, usuario_id (FK), versao, versao_criacao
+--   info_excluidos: contato_id, usuario_id, versao (tombstones)
+--   etiquetas: id, usuario_id, nome
+--   info_etiquetas: etiqueta_id, contato_id (associações)
+
+CREATE DATABASE IF NOT EXISTS contacts;
+USE contacts;
+
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INT NOT NULL AUTO_INCREMENT,
+    nome VARCHAR(100) NOT NULL,
+    email VARCHAR(150) NOT NULL,
+    senha_hash VARCHAR(255) NOT NULL,
+    versao_contatos BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    PRIMARY KEY (id),
+    UNIQUE KEY email_UNIQUE (email)
+);
+
+CREATE TABLE IF NOT EXISTS info (
+    id INT NOT NULL AUTO_INCREMENT,
+    nome VARCHAR(100) NOT NULL,
+    email VARCHAR(150),
+    telefone VARCHAR(11),
+    usuario_id INT,
+    versao BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    versao_criacao BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    PRIMARY KEY (id),
+    KEY fk_info_usuario (usuario_id),
+    CONSTRAINT fk_info_usuario FOREIGN KEY (usuario_id) REFERENCES usuarios (id)
+);
+
+-- Tombstones dos contatos excluídos (sincronização incremental)
+CREATE TABLE IF NOT EXISTS info_excluidos (
+    contato_id INT NOT NULL,
+    usuario_id INT NOT NULL,
+    versao BIGINT UNSIGNED NOT NULL,
+    excluido_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (usuario_id, versao)
+);
+
+-- Etiquetas dos contatos (/contatos/tags); nomes únicos por usuário
+CREATE TABLE IF NOT EXISTS etiquetas (
+    id INT NOT NULL AUTO_INCREMENT,
+    usuario_id INT NOT NULL,
+    nome VARCHAR(40) NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE KEY uq_etiquetas_usuario_nome (usuario_id, nome),
+    CONSTRAINT fk_etiquetas_usuario FOREIGN KEY (usuario_id) REFERENCES usuarios (id)
+);
+
+-- Associações removidas junto com o contato ou a etiqueta
+CREATE TABLE IF NOT EXISTS info_etiquetas (
+    etiqueta_id INT NOT NULL,
+    contato_id INT NOT NULL,
+    PRIMARY KEY (etiqueta_id, contato_id),
+    KEY fk_info_etiquetas_contato (contato_id),
+    CONSTRAINT fk_info_etiquetas_etiqueta FOREIGN KEY (etiqueta_id) REFERENCES etiquetas (id) ON DELETE CASCADE,
+    CONSTRAINT fk_info_etiquetas_contato FOREIGN KEY (contato_id) REFERENCES info (id) ON DELETE CASCADE
+);
+
+-- =============================================================================
+--                           ÍNDICES
+-- =============================================================================
+
+-- Índice de cobertura para listagens projetadas (fields=nome,telefone):
+-- a consulta é resolvida apenas pelo índice, sem acessar as linhas
+CREATE INDEX idx_info_usuario_nome_telefone ON info (usuario_id, nome, telefone);
+
+-- Identificação de chamadas (/contatos/lookup): IN sobre telefone dentro
+-- do usuário, com o nome no índice (o id vem da chave primária)
+CREATE INDEX idx_info_usuario_telefone_nome ON info (usuario_id, telefone, nome);
+
+-- Sincronização incremental (/contatos/changes): alterações após uma versão
+CREATE INDEX idx_info_usuario_versao ON info (usuario_id, versao);
+
+-- Verificação de duplicatas na criação: buscas por telefone e por email
+-- (no lote, telefone IN (...) OR email IN (...) usa index merge dos dois)
+CREATE INDEX idx_info_telefone ON info (telefone);
+CREATE INDEX idx_info_email ON info (email);
+
+-- =============================================================================
+--                   MIGRAÇÃO DE BANCOS EXISTENTES
+-- =============================================================================
+-- Para bancos criados antes do controle de alterações:
+--
+-- ALTER TABLE usuarios ADD COLUMN versao_contatos BIGINT UNSIGNED NOT NULL DEFAULT 0;
+-- ALTER TABLE info ADD COLUMN versao BIGINT UNSIGNED NOT NULL DEFAULT 0,
+--                  ADD COLUMN versao_criacao BIGINT UNSIGNED NOT NULL DEFAULT 0;
+-- (depois criar info_excluidos e idx_info_usuario_versao como acima)
+--
+-- Backfill obrigatório: sem ele os contatos anteriores ficam com versao 0
+-- e uma sincronização completa (since=0, versao > 0) não os retorna.
+-- Numera os contatos de cada usuário em ordem de id e ajusta o contador:
+--
+-- UPDATE info i
+--   JOIN (SELECT id, ROW_NUMBER() OVER (PARTITION BY usuario_id ORDER BY id) AS n FROM info) v
+--     ON v.id = i.id
+--    SET i.versao = v.n, i.versao_criacao = v.n;
+-- UPDATE usuarios u
+--   JOIN (SELECT usuario_id, MAX(versao) AS maxima FROM info GROUP BY usuario_id) m
+--     ON m.usuario_id = u.id
+--    SET u.versao_contatos = m.maxima;
+--
+-- Para bancos criados antes das etiquetas: criar etiquetas e
+-- info_etiquetas como acima
+--
+-- Para bancos criados antes da gravação em lote: criar idx_info_telefone
+-- e idx_info_email como acima
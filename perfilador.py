@@ -0,0 +1,199 @@
+"""
+Módulo de Perfil de CPU - Profiler Estatístico sob Demanda
+
+Amostra periodicamente as pilhas de todas as threads do worker em
+produção (sys._current_frames) por alguns segundos e agrega o resultado
+em pilhas colapsadas (formato do flamegraph.pl / speedscope) e em um
+resumo das funções mais frequentes.
+
+Autor: Henrique Teixeira
+Versão: 1.0.0
+Data: 2024-01-15
+
+Funcionamento:
+    - Sem sessão ativa não há thread, hook nem contador: custo zero
+    - Uma sessão por vez; a thread de amostragem exclui a si mesma
+    - Cada amostra conta para a pilha completa (inclusivo) e para a
+      função no topo da pilha (exclusivo, onde a CPU de fato estava)
+
+Uso (CLI contra um worker em execução):
+    python perfilador.py --url http://localhost:8000 --segundos 10 --saida perfil.folded
+    flamegraph.pl perfil.folded > perfil.svg
+"""
+
+from collections import Counter
+from dotenv import load_dotenv
+import threading
+import argparse
+import time
+import sys
+import os
+
+# =============================================================================
+#                           CONFIGURAÇÃO
+# =============================================================================
+
+load_dotenv()
+
+# Token exigido no cabeçalho X-Admin-Token (vazio desativa o endpoint)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PERFIL_MAX_SEGUNDOS = float(os.getenv("PERFIL_MAX_SEGUNDOS", 60))
+PERFIL_INTERVALO_MS = float(os.getenv("PERFIL_INTERVALO_MS", 5))
+
+# =============================================================================
+#                           PERFILADOR
+# =============================================================================
+
+# Esperas bloqueantes conhecidas no topo da pilha (módulo, função):
+# threads ociosas, não consumo de CPU. O bloqueio em si acontece em C
+# (lock, epoll, recv), então o topo é a função Python que o chamou
+_ESPERAS_OCIOSAS = frozenset({
+    ("threading", "wait"),                      # Condition.wait / Event.wait
+    ("threading", "acquire"),                   # Semaphore.acquire
+    ("threading", "_wait_for_tstate_lock"),     # Thread.join
+    ("queue", "get"),                           # Queue.get (workers do threadpool)
+    ("concurrent.futures.thread", "_worker"),   # executor aguardando tarefa
+    ("selectors", "select"),                    # event loop aguardando I/O
+    ("socket", "accept"),
+    ("socket", "readinto"),                     # SocketIO.readinto
+    ("ssl", "read"),
+    ("ssl", "recv"),
+    ("ssl", "recv_into"),
+})
+
+def _ocioso(frame):
+    """Se o frame do topo da pilha é uma espera bloqueante conhecida."""
+    return (frame.f_globals.get("__name__"), frame.f_code.co_name) in _ESPERAS_OCIOSAS
+
+def _rotulo(frame):
+    """Nome do frame na pilha: 'funcao (arquivo.py:linha_def)'."""
+    codigo = frame.f_code
+    return f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{codigo.co_firstlineno})"
+
+class Perfilador:
+    """
+    Profiler por amostragem de pilhas, ativado sob demanda.
+
+    Attributes:
+        ativo (bool): Se há uma sessão em andamento
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.ativo = False
+
+    def amostrar(self, segundos: float, intervalo_ms: float = PERFIL_INTERVALO_MS, top: int = 30, ociosas: bool = False):
+        """
+        Amostra as pilhas de todas as threads durante o período informado.
+
+        Args:
+            segundos (float): Duração da sessão
+            intervalo_ms (float): Intervalo entre amostras
+            top (int): Quantidade de funções no resumo
+            ociosas (bool): Inclui threads paradas em esperas conhecidas
+                            (_ESPERAS_OCIOSAS); por padrão só pilhas ativas
+
+        Returns:
+            dict: 'amostras' (rodadas), 'duracao', 'colapsadas' (pilha ->
+                  contagem), 'exclusivo' e 'inclusivo' (top funções com
+                  contagem e %),
+                  ou None se já houver uma sessão em andamento
+        """
+        with self._lock:
+            if self.ativo:
+                return None
+            self.ativo = True
+
+        try:
+            propria = threading.get_ident()
+            nomes = {thread.ident: thread.name for thread in threading.enumerate()}
+            pilhas = Counter()
+            amostras = 0
+            intervalo = intervalo_ms / 1000
+            inicio = time.perf_counter()
+            fim = inicio + segundos
+
+            while time.perf_counter() < fim:
+                for ident, frame in sys._current_frames().items():
+                    if ident == propria:
+                        continue
+                    if not ociosas and _ocioso(frame):
+                        continue
+                    quadros = []
+                    while frame is not None:
+                        quadros.append(_rotulo(frame))
+                        frame = frame.f_back
+                    if ident not in nomes:
+                        nomes = {thread.ident: thread.name for thread in threading.enumerate()}
+                    quadros.append(nomes.get(ident, f"thread-{ident}"))
+                    pilhas[tuple(reversed(quadros))] += 1
+                amostras += 1
+                time.sleep(intervalo)
+
+            return self._resumir(pilhas, amostras, time.perf_counter() - inicio, top)
+        finally:
+            self.ativo = False
+
+    @staticmethod
+    def _resumir(pilhas: Counter, amostras: int, duracao: float, top: int):
+        exclusivo = Counter()
+        inclusivo = Counter()
+        for pilha, contagem in pilhas.items():
+            exclusivo[pilha[-1]] += contagem
+            # Recursão conta uma vez por amostra
+            for funcao in set(pilha[1:]):
+                inclusivo[funcao] += contagem
+
+        total = sum(pilhas.values()) or 1
+        def ranking(contador):
+            return [{"funcao": funcao, "amostras": contagem, "pct": round(100 * contagem / total, 2)}
+                    for funcao, contagem in contador.most_common(top)]
+
+        return {
+            "amostras": amostras,
+            "duracao": round(duracao, 3),
+            "colapsadas": {";".join(pilha): contagem for pilha, contagem in pilhas.most_common()},
+            "exclusivo": ranking(exclusivo),
+            "inclusivo": ranking(inclusivo),
+        }
+
+def colapsadas_texto(colapsadas: dict):
+    """Formato de texto do flamegraph.pl: 'a;b;c contagem' por linha."""
+    return "".join(f"{pilha} {contagem}\n" for pilha, contagem in colapsadas.items())
+
+# Perfilador compartilhado do processo
+perfilador = Perfilador()
+
+# =============================================================================
+#                           EXECUÇÃO (CLI)
+# =============================================================================
+
+def main():
+    import urllib.request
+    import urllib.parse
+
+    parser = argparse.ArgumentParser(description="Coleta um perfil de CPU de um worker em execução.")
+    parser.add_argument("--url", default="http://localhost:8000", help="Endereço do worker")
+    parser.add_argument("--segundos", type=float, default=10, help="Duração da amostragem")
+    parser.add_argument("--intervalo-ms", type=float, default=PERFIL_INTERVALO_MS, help="Intervalo entre amostras")
+    parser.add_argument("--token", default=ADMIN_TOKEN, help="Token de administração (padrão: ADMIN_TOKEN)")
+    parser.add_argument("--saida", help="Arquivo de pilhas colapsadas (padrão: saída padrão)")
+    args = parser.parse_args()
+
+    parametros = urllib.parse.urlencode({"segundos": args.segundos, "intervalo_ms": args.intervalo_ms, "formato": "colapsado"})
+    requisicao = urllib.request.Request(
+        f"{args.url.rstrip('/')}/monitoramento/perfil?{parametros}",
+        headers={"X-Admin-Token": args.token}
+    )
+    with urllib.request.urlopen(requisicao, timeout=args.segundos + 30) as resposta:
+        texto = resposta.read().decode("utf-8")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as saida:
+            saida.write(texto)
+        print(f"{len(texto.splitlines())} pilhas gravadas em {args.saida}", file=sys.stderr)
+    else:
+        sys.stdout.write(texto)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Módulo de Prazos (Deadlines) por Requisição
+
+Dá a cada rota um orçamento de tempo que acompanha a requisição até o
+banco: a espera por conexão, as novas tentativas e o limite de execução
+de cada statement no servidor usam apenas o tempo que ainda resta.
+
+Autor: Henrique Teixeira
+Versão: 1.0.0
+Data: 2024-01-15
+
+Funcionamento:
+    - O middleware abre o prazo da rota (PRAZOS_ROTAS / PRAZO_PADRAO_MS)
+      e o prazo é propagado por contextvars, inclusive para o threadpool
+    - banco.py aplica o restante como espera máxima no pool e como
+      max_execution_time da sessão (SELECTs) e verifica o prazo antes
+      de cada statement
+    - aguardar() executa o trabalho da rota observando o cliente: se ele
+      desconectar, ou se o prazo estourar durante um statement que o
+      servidor não interrompe sozinho, a consulta em andamento é morta
+      (KILL QUERY)
+    - Prazo esgotado gera PrazoExpirado, respondido com 504
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from starlette.concurrency import run_in_threadpool
+from dotenv import load_dotenv
+import threading
+import asyncio
+import time
+import os
+
+# =============================================================================
+#                           CONFIGURAÇÃO
+# =============================================================================
+
+load_dotenv()
+
+# Prazo das rotas sem configuração própria (0 = sem prazo)
+PRAZO_PADRAO_MS = int(os.getenv("PRAZO_PADRAO_MS", 10000))
+
+# Prazo por 'MÉTODO /prefixo' (vence o prefixo mais longo); streams e o
+# profiler não têm prazo. PRAZOS_ROTAS no ambiente sobrescreve, no
+# formato 'GET /contatos/list=3000,POST /contatos/batch=20000'
+PRAZOS_ROTAS = {
+    "GET /contatos/eventos": 0,
+    "GET /monitoramento/perfil": 0,
+    "POST /contatos/batch": 30000,
+    "GET /contatos/duplicates": 30000,
+}
+
+# Intervalo de verificação de desconexão e tolerância antes do KILL
+INTERVALO_VERIFICACAO = 0.1
+MARGEM_CANCELAMENTO = 0.25
+
+_prazo_atual = ContextVar("prazo_atual", default=None)
+
+def _ler_prazos(valor: str):
+    """Interpreta PRAZOS_ROTAS do ambiente."""
+    prazos = {}
+    for item in valor.split(","):
+        if "=" in item:
+            rota, ms = item.rsplit("=", 1)
+            prazos[" ".join(rota.split())] = int(ms)
+    return prazos
+
+PRAZOS_ROTAS.update(_ler_prazos(os.getenv("PRAZOS_ROTAS", "")))
+
+# =============================================================================
+#                           PRAZO
+# =============================================================================
+
+class PrazoExpirado(Exception):
+    """O orçamento de tempo da requisição acabou (ou o cliente desistiu)."""
+
+class Prazo:
+    """
+    Orçamento de tempo de uma requisição.
+
+    Attributes:
+        limite (float): Instante final (time.monotonic) ou None sem prazo
+        motivo (str): Motivo do cancelamento ('prazo' ou 'desconectado')
+        conexao_id (int): Sessão MySQL executando um statement agora
+    """
+    __slots__ = ("limite", "motivo", "conexao_id", "_cancelado", "_lock_statement")
+
+    def __init__(self, segundos: float = None):
+        self.limite = time.monotonic() + segundos if segundos else None
+        self.motivo = None
+        self.conexao_id = None
+        self._cancelado = threading.Event()
+        # Protege conexao_id entre o início/fim do statement e o KILL
+        self._lock_statement = threading.Lock()
+
+    def restante(self):
+        """Segundos restantes (pode ser negativo) ou None sem prazo."""
+        return None if self.limite is None else self.limite - time.monotonic()
+
+    def expirado(self):
+        if self._cancelado.is_set():
+            return True
+        return self.limite is not None and time.monotonic() >= self.limite
+
+    @property
+    def cancelado(self):
+        """Se algum trabalho da requisição foi abandonado por causa do prazo."""
+        return self._cancelado.is_set()
+
+    def verificar(self):
+        """Levanta PrazoExpirado se o prazo acabou ou foi cancelado."""
+        if self.expirado():
+            self.esgotar()
+            raise PrazoExpirado(self.motivo)
+
+    def esgotar(self, motivo: str = "prazo"):
+        """Marca o prazo como esgotado (ex.: o servidor interrompeu o statement)."""
+        if not self._cancelado.is_set():
+            self.motivo = motivo
+            self._cancelado.set()
+
+    def iniciar_statement(self, conexao_id: int):
+        """
+        Registra a sessão que vai executar um statement desta requisição.
+
+        Raises:
+            PrazoExpirado: Cancelado antes do statement começar
+        """
+        with self._lock_statement:
+            self.conexao_id = conexao_id
+        # Verificado depois do registro: um cancelamento anterior não
+        # chegaria a matar este statement
+        self.verificar()
+
+    def encerrar_statement(self):
+        """Statement terminou: a sessão deixa de ser alvo do KILL."""
+        with self._lock_statement:
+            self.conexao_id = None
+
+    def cancelar(self, motivo: str):
+        """
+        Cancela o trabalho da requisição: novos statements falham e o
+        statement em andamento, se houver, é interrompido no servidor.
+
+        Notes:
+            - O KILL é enviado segurando o lock do statement: a requisição
+              não consegue encerrar o statement e devolver a sessão ao pool
+              antes do KILL, então ele nunca atinge outra requisição que
+              reutilize a mesma sessão (um KILL QUERY em sessão ociosa é
+              descartado pelo servidor no próximo comando)
+        """
+        if self._cancelado.is_set():
+            return
+        self.esgotar(motivo)
+        with self._lock_statement:
+            conexao_id = self.conexao_id
+            if conexao_id is not None:
+                # Import tardio: banco.py importa este módulo
+                from banco import interromper_consulta
+                interromper_consulta(conexao_id)
+
+def prazo_da_rota(metodo: str, caminho: str):
+    """
+    Prazo configurado para a rota, em segundos.
+
+    Returns:
+        float: Segundos, ou None se a rota não tem prazo
+    """
+    rota = f"{metodo} {caminho}"
+    melhor, ms = -1, PRAZO_PADRAO_MS
+    for prefixo, valor in PRAZOS_ROTAS.items():
+        if rota.startswith(prefixo) and len(prefixo) > melhor:
+            melhor, ms = len(prefixo), valor
+    return ms / 1000 if ms > 0 else None
+
+@contextmanager
+def iniciar_prazo(segundos: float = None):
+    """
+    Abre o prazo da requisição atual.
+
+    Args:
+        segundos (float): Orçamento (None = sem prazo, mas cancelável)
+
+    Yields:
+        Prazo: Prazo aberto
+    """
+    prazo = Prazo(segundos)
+    token = _prazo_atual.set(prazo)
+    try:
+        yield prazo
+    finally:
+        _prazo_atual.reset(token)
+
+def prazo_atual():
+    """Prazo da requisição em andamento, ou None fora de uma requisição."""
+    return _prazo_atual.get()
+
+# =============================================================================
+#                           EXECUÇÃO OBSERVADA
+# =============================================================================
+
+async def aguardar(request, trabalho, compartilhado: bool = False):
+    """
+    Aguarda o trabalho da rota observando o cliente e o prazo.
+
+    Args:
+        request (Request): Requisição (para detectar desconexão)
+        trabalho: Awaitable do trabalho (ex.: run_in_threadpool(...))
+        compartilhado (bool): Trabalho coalescido com outras requisições;
+                              a desconexão deste cliente não o cancela
+
+    Returns:
+        Resultado do trabalho
+
+    Raises:
+        PrazoExpirado: Prazo esgotado ou cliente desconectado
+    """
+    prazo = prazo_atual()
+    tarefa = asyncio.ensure_future(trabalho)
+    if prazo is None:
+        return await tarefa
+
+    while True:
+        concluidas, _ = await asyncio.wait({tarefa}, timeout=INTERVALO_VERIFICACAO)
+        if concluidas:
+            break
+        motivo = None
+        if await request.is_disconnected():
+            motivo = "desconectado"
+        elif prazo.restante() is not None and prazo.restante() < -MARGEM_CANCELAMENTO:
+            # Statements que o servidor não limita sozinho (escritas, commit)
+            motivo = "prazo"
+        if motivo:
+            if not compartilhado:
+                await run_in_threadpool(prazo.cancelar, motivo)
+            # A thread termina sozinha no próximo statement (ou no KILL)
+            tarefa.add_done_callback(lambda t: t.cancelled() or t.exception())
+            raise PrazoExpirado(motivo)
+
+    resultado = tarefa.result()
+    if prazo.cancelado:
+        # O trabalho terminou por causa do prazo (resultado de erro)
+        raise PrazoExpirado(prazo.motivo)
+    return resultado
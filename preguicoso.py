@@ -0,0 +1,107 @@
+"""
+Módulo de Carregamento Preguiçoso - Partida Rápida
+
+Adia a importação das dependências pesadas (jose/cryptography,
+mysql.connector, passlib) até o primeiro uso, para que o worker aceite
+requisições mais cedo, e as pré-carrega em segundo plano logo após a
+partida.
+
+Autor: Henrique Teixeira
+Versão: 1.0.0
+Data: 2024-01-15
+
+Uso:
+    jwt = modulo("jose.jwt")            # importado no primeiro jwt.encode
+    contexto = objeto(lambda: Classe())  # construído no primeiro acesso
+
+Notas:
+    - AQUECER_IMPORTS=0 desativa o pré-carregamento em segundo plano
+    - python -m benchmarks.importacao mostra o custo de cada import
+"""
+
+from dotenv import load_dotenv
+import importlib
+import threading
+import os
+
+# =============================================================================
+#                           CONFIGURAÇÃO
+# =============================================================================
+
+load_dotenv()
+
+AQUECER_IMPORTS = os.getenv("AQUECER_IMPORTS", "1") == "1"
+
+# =============================================================================
+#                           PROXIES PREGUIÇOSOS
+# =============================================================================
+
+class Preguicoso:
+    """
+    Proxy que cria o objeto real no primeiro acesso a um atributo.
+
+    Attributes:
+        carregado (bool): Se o objeto real já foi criado
+    """
+    __slots__ = ("_fabrica", "_alvo", "_lock")
+
+    def __init__(self, fabrica):
+        object.__setattr__(self, "_fabrica", fabrica)
+        object.__setattr__(self, "_alvo", None)
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    def _carregar(self):
+        alvo = self._alvo
+        if alvo is None:
+            with self._lock:
+                alvo = self._alvo
+                if alvo is None:
+                    alvo = self._fabrica()
+                    object.__setattr__(self, "_alvo", alvo)
+        return alvo
+
+    @property
+    def carregado(self):
+        return self._alvo is not None
+
+    def __getattr__(self, nome):
+        return getattr(self._carregar(), nome)
+
+    def __setattr__(self, nome, valor):
+        setattr(self._carregar(), nome, valor)
+
+def modulo(nome: str):
+    """Módulo importado no primeiro acesso a um atributo."""
+    return Preguicoso(lambda: importlib.import_module(nome))
+
+def objeto(fabrica):
+    """Objeto criado por fabrica() no primeiro acesso a um atributo."""
+    return Preguicoso(fabrica)
+
+# =============================================================================
+#                           PRÉ-CARREGAMENTO
+# =============================================================================
+
+def aquecer(*proxies):
+    """
+    Carrega os proxies em uma thread de fundo, depois da partida.
+
+    Args:
+        *proxies (Preguicoso): Módulos/objetos a carregar
+
+    Notes:
+        - A primeira requisição que precisar de um deles antes do fim
+          do aquecimento apenas espera o mesmo lock de carregamento
+    """
+    if not AQUECER_IMPORTS:
+        return
+
+    def carregar_todos():
+        for proxy in proxies:
+            try:
+                proxy._carregar()
+            except Exception:
+                # O erro reaparece (e é tratado) no primeiro uso real
+                pass
+
+    threading.Thread(target=carregar_todos, name="aquecer-imports", daemon=True).start()
@@ -0,0 +1,239 @@
+"""
+Módulo de Rastreamento de Requisições - Spans de Latência
+
+Registra spans leves que acompanham a requisição desde o roteador até
+o SQL (autenticação, validação, conexão, execução, commit e montagem da
+resposta), para decompor a latência por fase sem ferramentas externas.
+
+Autor: Henrique Teixeira
+Versão: 1.0.0
+Data: 2024-01-15
+
+Funcionamento:
+    - O contexto vem do cabeçalho W3C 'traceparent', quando presente;
+      caso contrário uma nova trace é amostrada com TRACE_SAMPLE_RATE
+    - O span atual é propagado por contextvars (inclusive para o
+      threadpool via run_in_threadpool)
+    - Spans concluídos vão para um coletor em memória (TRACE_BUFFER) e,
+      se TRACE_FILE estiver definido, para um arquivo JSON lines gravado
+      pela fila em segundo plano de registro.py (sem I/O no event loop)
+    - Fora de uma trace amostrada, span() não registra nada
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import deque
+from functools import wraps
+from dotenv import load_dotenv
+from registro import EscritorLog
+import threading
+import random
+import time
+import os
+
+# =============================================================================
+#                           CONFIGURAÇÃO
+# =============================================================================
+
+load_dotenv()
+
+# Fração de requisições sem traceparent que são rastreadas (0 a 1)
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 0))
+# Arquivo JSON lines de saída (opcional) e spans mantidos em memória
+TRACE_FILE = os.getenv("TRACE_FILE")
+TRACE_BUFFER = int(os.getenv("TRACE_BUFFER", 10000))
+
+_span_atual = ContextVar("span_atual", default=None)
+
+# =============================================================================
+#                           SPANS
+# =============================================================================
+
+class Span:
+    """
+    Intervalo de execução de uma fase da requisição.
+
+    Attributes:
+        trace_id (str): ID da trace (32 hex)
+        span_id (str): ID deste span (16 hex)
+        pai_id (str): ID do span pai ou None
+        nome (str): Nome da fase (ex.: 'banco.executar')
+        atributos (dict): Informações adicionais
+        amostrado (bool): Se a trace deve ser registrada
+    """
+    __slots__ = ("trace_id", "span_id", "pai_id", "nome", "inicio", "duracao", "atributos", "amostrado")
+
+    def __init__(self, trace_id: str, pai_id, nome: str, amostrado: bool, atributos: dict = None):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.pai_id = pai_id
+        self.nome = nome
+        self.inicio = time.time()
+        self.duracao = None
+        self.atributos = atributos or {}
+        self.amostrado = amostrado
+
+    def traceparent(self):
+        """Cabeçalho W3C para propagar esta trace."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.amostrado else '00'}"
+
+    def para_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "pai_id": self.pai_id,
+            "nome": self.nome,
+            "inicio": self.inicio,
+            "duracao_ms": self.duracao * 1000 if self.duracao is not None else None,
+            "atributos": self.atributos,
+        }
+
+class Coletor:
+    """
+    Guarda os spans concluídos em memória e, opcionalmente, em arquivo.
+    """
+
+    def __init__(self, limite: int, arquivo: str = None):
+        self._lock = threading.Lock()
+        self._spans = deque(maxlen=limite)
+        self._escritor = EscritorLog(arquivo, limite) if arquivo else None
+
+    def registrar(self, span: Span):
+        registro = span.para_dict()
+        with self._lock:
+            self._spans.append(registro)
+        if self._escritor is not None:
+            # Sem amostragem sob pressão: uma trace parcial não serve;
+            # com a fila cheia os spans são descartados e contados
+            self._escritor.registrar(registro, essencial=True)
+
+    def spans(self, trace_id: str = None):
+        """
+        Retorna os spans em memória.
+
+        Args:
+            trace_id (str, optional): Filtra uma trace específica
+        """
+        with self._lock:
+            return [s for s in self._spans if trace_id is None or s["trace_id"] == trace_id]
+
+    def resumo(self):
+        """
+        Decompõe a latência por fase.
+
+        Returns:
+            dict: nome -> {quantidade, total_ms, media_ms, max_ms}
+        """
+        fases = {}
+        for registro in self.spans():
+            fase = fases.setdefault(registro["nome"], {"quantidade": 0, "total_ms": 0.0, "max_ms": 0.0})
+            fase["quantidade"] += 1
+            fase["total_ms"] += registro["duracao_ms"]
+            fase["max_ms"] = max(fase["max_ms"], registro["duracao_ms"])
+        for fase in fases.values():
+            fase["media_ms"] = fase["total_ms"] / fase["quantidade"]
+        return fases
+
+    def limpar(self):
+        with self._lock:
+            self._spans.clear()
+
+# Coletor compartilhado
+coletor = Coletor(TRACE_BUFFER, TRACE_FILE)
+
+# =============================================================================
+#                           API DE RASTREAMENTO
+# =============================================================================
+
+def _ler_traceparent(valor: str):
+    """
+    Interpreta um cabeçalho traceparent ('00-<trace>-<span>-<flags>').
+
+    Returns:
+        tuple: (trace_id, span_pai, amostrado) ou None se inválido
+    """
+    partes = valor.strip().split("-") if valor else []
+    if len(partes) != 4 or len(partes[1]) != 32 or len(partes[2]) != 16:
+        return None
+    try:
+        flags = int(partes[3], 16)
+        int(partes[1], 16)
+        int(partes[2], 16)
+    except ValueError:
+        return None
+    return partes[1], partes[2], bool(flags & 1)
+
+@contextmanager
+def iniciar_trace(traceparent: str, nome: str):
+    """
+    Abre o span raiz de uma requisição.
+
+    Args:
+        traceparent (str): Cabeçalho recebido (ou None)
+        nome (str): Nome do span raiz (ex.: 'GET /contatos/list')
+
+    Yields:
+        Span: Span raiz (mesmo quando não amostrado, para propagar o contexto)
+    """
+    contexto = _ler_traceparent(traceparent)
+    if contexto:
+        trace_id, pai_id, amostrado = contexto
+    else:
+        trace_id, pai_id = f"{random.getrandbits(128):032x}", None
+        amostrado = random.random() < TRACE_SAMPLE_RATE
+
+    raiz = Span(trace_id, pai_id, nome, amostrado)
+    token = _span_atual.set(raiz)
+    inicio = time.perf_counter()
+    try:
+        yield raiz
+    finally:
+        raiz.duracao = time.perf_counter() - inicio
+        _span_atual.reset(token)
+        if amostrado:
+            coletor.registrar(raiz)
+
+@contextmanager
+def span(nome: str, **atributos):
+    """
+    Registra uma fase como filho do span atual.
+
+    Args:
+        nome (str): Nome da fase
+        **atributos: Informações adicionais do span
+
+    Yields:
+        Span: Span criado, ou None fora de uma trace amostrada
+    """
+    pai = _span_atual.get()
+    if pai is None or not pai.amostrado:
+        yield None
+        return
+
+    atual = Span(pai.trace_id, pai.span_id, nome, True, atributos)
+    token = _span_atual.set(atual)
+    inicio = time.perf_counter()
+    try:
+        yield atual
+    except BaseException as erro:
+        atual.atributos["erro"] = type(erro).__name__
+        raise
+    finally:
+        atual.duracao = time.perf_counter() - inicio
+        _span_atual.reset(token)
+        coletor.registrar(atual)
+
+def rastreado(nome: str):
+    """
+    Decorador que envolve uma função síncrona em um span.
+
+    Args:
+        nome (str): Nome da fase
+    """
+    def decorador(funcao):
+        @wraps(funcao)
+        def envoltorio(*args, **kwargs):
+            with span(nome):
+                return funcao(*args, **kwargs)
+        return envoltorio
+    return decorador
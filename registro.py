@@ -0,0 +1,261 @@
+"""
+Módulo de Registro (Logs) - Acesso e Erros em JSON Lines
+
+Registra uma linha JSON por requisição (rota, usuário, status,
+latência, tempo de banco, erro), os erros das funções de model.py e os
+bloqueios do event loop (vigia_loop.py) sem
+bloquear o event loop: as linhas vão para uma fila em memória que uma
+thread de fundo esvazia em lotes.
+
+Autor: Henrique Teixeira
+Versão: 1.0.0
+Data: 2024-01-15
+
+Funcionamento:
+    - Desativado por padrão: definir LOG_ARQUIVO (ex.: api.log) para registrar
+    - Rotação por tamanho (LOG_MAX_BYTES) ou por tempo (LOG_ROTACAO_SEGUNDOS);
+      só os LOG_RETENCAO arquivos rotacionados mais recentes são mantidos
+    - Sob pressão (fila acima de 80%), linhas de sucesso são amostradas
+      com LOG_AMOSTRAGEM_PRESSAO; com a fila cheia, linhas são descartadas
+      e contadas
+"""
+
+from contextvars import ContextVar
+from dotenv import load_dotenv
+import threading
+import atexit
+import random
+import queue
+import json
+import time
+import glob
+import os
+
+# =============================================================================
+#                           CONFIGURAÇÃO
+# =============================================================================
+
+load_dotenv()
+
+LOG_ARQUIVO = os.getenv("LOG_ARQUIVO", "")
+LOG_BUFFER = int(os.getenv("LOG_BUFFER", 10000))
+LOG_LOTE = int(os.getenv("LOG_LOTE", 500))
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", 50 * 2 ** 20))
+LOG_ROTACAO_SEGUNDOS = int(os.getenv("LOG_ROTACAO_SEGUNDOS", 86400))
+LOG_RETENCAO = int(os.getenv("LOG_RETENCAO", 7))
+LOG_AMOSTRAGEM_PRESSAO = float(os.getenv("LOG_AMOSTRAGEM_PRESSAO", 0.1))
+
+# Dados da requisição em andamento (dicionário mutável compartilhado com
+# as tarefas e threads filhas, que herdam uma cópia do contexto)
+_requisicao_atual = ContextVar("requisicao_atual", default=None)
+
+# =============================================================================
+#                           ESCRITOR EM SEGUNDO PLANO
+# =============================================================================
+
+class EscritorLog:
+    """
+    Fila limitada de linhas JSON drenada por uma thread de fundo.
+
+    Attributes:
+        descartadas (int): Linhas descartadas com a fila cheia
+        amostradas (int): Linhas de sucesso omitidas pela amostragem
+    """
+
+    def __init__(self, arquivo: str, limite: int):
+        self.arquivo = arquivo
+        self._fila = queue.Queue(maxsize=limite)
+        self._limite = limite
+        self._thread = None
+        self._lock = threading.Lock()
+        self._aberto_em = time.time()
+        self.descartadas = 0
+        self.amostradas = 0
+
+    def registrar(self, linha: dict, essencial: bool = False):
+        """
+        Enfileira uma linha sem bloquear.
+
+        Args:
+            linha (dict): Conteúdo da linha
+            essencial (bool): Linhas de erro não são amostradas
+        """
+        if not self.arquivo:
+            return
+        if self._thread is None:
+            self._iniciar()
+
+        if not essencial and self._fila.qsize() > self._limite * 0.8:
+            if random.random() >= LOG_AMOSTRAGEM_PRESSAO:
+                self.amostradas += 1
+                return
+        try:
+            self._fila.put_nowait(linha)
+        except queue.Full:
+            self.descartadas += 1
+
+    def _iniciar(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._drenar, name="escritor-log", daemon=True)
+                self._thread.start()
+                atexit.register(self.esvaziar)
+
+    def _drenar(self):
+        """Laço da thread: agrupa até LOG_LOTE linhas por escrita."""
+        while True:
+            lote = [self._fila.get()]
+            while len(lote) < LOG_LOTE:
+                try:
+                    lote.append(self._fila.get_nowait())
+                except queue.Empty:
+                    break
+            self._escrever(lote)
+
+    def _escrever(self, lote: list):
+        try:
+            self._rotacionar()
+            with open(self.arquivo, "a", encoding="utf-8") as saida:
+                saida.write("".join(json.dumps(linha, default=str, ensure_ascii=False) + "\n" for linha in lote))
+        except OSError:
+            self.descartadas += len(lote)
+
+    def _rotacionar(self):
+        """Renomeia o arquivo atual se excedeu o tamanho ou a idade máxima."""
+        try:
+            tamanho = os.path.getsize(self.arquivo)
+        except OSError:
+            return
+        if tamanho >= LOG_MAX_BYTES or time.time() - self._aberto_em >= LOG_ROTACAO_SEGUNDOS:
+            os.replace(self.arquivo, self._nome_rotacionado())
+            self._aberto_em = time.time()
+            self._remover_antigos()
+
+    def _nome_rotacionado(self):
+        """
+        Nome livre para o arquivo rotacionado: data/hora com microssegundos
+        (ordem alfabética = ordem cronológica) e sufixo se ainda colidir.
+        """
+        agora = time.time()
+        base = f"{self.arquivo}.{time.strftime('%Y%m%d-%H%M%S', time.localtime(agora))}{int(agora % 1 * 1e6):06d}"
+        nome, sequencia = base, 0
+        while os.path.exists(nome):
+            sequencia += 1
+            nome = f"{base}-{sequencia}"
+        return nome
+
+    def _remover_antigos(self):
+        """Mantém só os LOG_RETENCAO arquivos rotacionados mais recentes."""
+        padrao = glob.escape(self.arquivo) + ".[0-9]*-[0-9]*"
+        rotacionados = sorted(glob.glob(padrao))
+        for antigo in rotacionados[:max(0, len(rotacionados) - LOG_RETENCAO)]:
+            try:
+                os.remove(antigo)
+            except OSError:
+                pass
+
+    def esvaziar(self):
+        """Grava o que restou na fila (chamado na saída do processo)."""
+        lote = []
+        while True:
+            try:
+                lote.append(self._fila.get_nowait())
+            except queue.Empty:
+                break
+        if lote:
+            self._escrever(lote)
+
+    def estatisticas(self):
+        return {
+            "pendentes": self._fila.qsize(),
+            "descartadas": self.descartadas,
+            "amostradas": self.amostradas,
+        }
+
+escritor = EscritorLog(LOG_ARQUIVO, LOG_BUFFER)
+
+# =============================================================================
+#                           API DE REGISTRO
+# =============================================================================
+
+def iniciar_requisicao(rota: str):
+    """
+    Abre o contexto de registro de uma requisição.
+
+    Returns:
+        dict: Contexto mutável (usuario_id, db_ms, erro) preenchido
+              durante a requisição
+    """
+    contexto = {"rota": rota, "usuario_id": None, "db_ms": 0.0, "erro": None}
+    _requisicao_atual.set(contexto)
+    return contexto
+
+def definir_usuario(usuario_id: int):
+    """Associa o usuário autenticado à requisição atual."""
+    contexto = _requisicao_atual.get()
+    if contexto is not None:
+        contexto["usuario_id"] = usuario_id
+
+def somar_tempo_banco(segundos: float):
+    """Acumula tempo gasto no banco de dados pela requisição atual."""
+    contexto = _requisicao_atual.get()
+    if contexto is not None:
+        contexto["db_ms"] += segundos * 1000
+
+def registrar_erro(origem: str, erro: Exception):
+    """
+    Registra um erro (ex.: exceção silenciada em model.py).
+
+    Args:
+        origem (str): Função onde o erro ocorreu
+        erro (Exception): Exceção capturada
+    """
+    contexto = _requisicao_atual.get()
+    descricao = f"{type(erro).__name__}: {erro}"
+    if contexto is not None:
+        contexto["erro"] = descricao
+    escritor.registrar({
+        "tipo": "erro",
+        "ts": time.time(),
+        "origem": origem,
+        "rota": contexto["rota"] if contexto else None,
+        "usuario_id": contexto["usuario_id"] if contexto else None,
+        "erro": descricao,
+    }, essencial=True)
+
+def registrar_bloqueio(rota: str, duracao: float, pilha: list):
+    """
+    Registra um bloqueio do event loop detectado pelo vigia_loop.py.
+
+    Args:
+        rota (str): Rota cujo endpoint estava na pilha (ou None)
+        duracao (float): Tempo bloqueado até a captura, em segundos
+        pilha (list): Pilha da thread do loop no momento da captura
+    """
+    escritor.registrar({
+        "tipo": "bloqueio",
+        "ts": time.time(),
+        "rota": rota,
+        "bloqueado_ms": round(duracao * 1000, 3),
+        "pilha": pilha,
+    }, essencial=True)
+
+def registrar_acesso(contexto: dict, status: int, latencia: float):
+    """
+    Registra a linha de acesso ao final da requisição.
+
+    Args:
+        contexto (dict): Contexto criado por iniciar_requisicao()
+        status (int): Código HTTP da resposta
+        latencia (float): Duração total em segundos
+    """
+    escritor.registrar({
+        "tipo": "acesso",
+        "ts": time.time(),
+        "rota": contexto["rota"],
+        "usuario_id": contexto["usuario_id"],
+        "status": status,
+        "latencia_ms": round(latencia * 1000, 3),
+        "db_ms": round(contexto["db_ms"], 3),
+        "erro": contexto["erro"],
+    }, essencial=status >= 500)
@@ -16,6 +16,7 @@ Padrões de Resposta:
 
 from fastapi import status
 from fastapi.responses import JSONResponse
+from rastreamento import span
 
 # =============================================================================
 #                           RESPOSTAS PADRONIZADAS
@@ -32,16 +33,17 @@ def ok(message: str, data=None):
     Returns:
         JSONResponse: Resposta formatada com status 200
     """
-    return JSONResponse(
-        status_code=status.HTTP_200_OK,
-        content={
-            "message": message,
-            "data": data,
-            "status": "success",
-            "HTTPStatus": "OK",
-            "HTTPStatusCode": status.HTTP_200_OK
-        }
-    )
+    with span("resposta.serializar"):
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                "message": message,
+                "data": data,
+                "status": "success",
+                "HTTPStatus": "OK",
+                "HTTPStatusCode": status.HTTP_200_OK
+            }
+        )
 
 def bad_request(message: str):
     """
@@ -118,4 +120,29 @@ def acesso_negado(message: str):
             "HTTPStatus": "Forbidden",
             "HTTPStatusCode": status.HTTP_403_FORBIDDEN
         }
-    )
\ No newline at end of file
+    )
+
+def prazo_esgotado(message: str):
+    """
+    Resposta de prazo esgotado (504 Gateway Timeout).
+    
+    Args:
+        message (str): Mensagem explicando o esgotamento do prazo
+    
+    Returns:
+        JSONResponse: Resposta formatada com status 504
+    
+    Use Cases:
+        - Orçamento de tempo da rota esgotado (ver prazos.py)
+        - Consulta interrompida pelo limite de execução do banco
+    """
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={
+            "message": message,
+            "data": None,
+            "status": "timeout",
+            "HTTPStatus": "Gateway Timeout",
+            "HTTPStatusCode": status.HTTP_504_GATEWAY_TIMEOUT
+        }
+    )
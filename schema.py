@@ -16,7 +16,7 @@ Benefícios:
 """
 
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from typing import Optional, List, Literal
 
 # =============================================================================
 #                           ESQUEMAS DE DADOS
@@ -95,6 +95,150 @@ class Contato(BaseModel):
             }
         }
 
+class OperacaoContato(BaseModel):
+    """
+    Modelo de uma operação dentro de um lote de contatos.
+    
+    Attributes:
+        operacao (str): Tipo da operação (create, update ou delete)
+        id (Optional[int]): ID do contato (obrigatório em update/delete)
+        contato (Optional[Contato]): Dados do contato (create/update)
+    
+    Notes:
+        - As mesmas validações das rotas individuais são aplicadas
+    """
+    operacao: Literal["create", "update", "delete"] = Field(
+        ...,
+        description="Tipo da operação: create, update ou delete"
+    )
+    id: Optional[int] = Field(
+        default=None,
+        description="ID do contato (obrigatório para update e delete)"
+    )
+    contato: Optional[Contato] = Field(
+        default=None,
+        description="Dados do contato (obrigatório para create e update)"
+    )
+
+class LoteContatos(BaseModel):
+    """
+    Modelo de dados para execução de várias operações em uma requisição.
+    
+    Attributes:
+        operacoes (List[OperacaoContato]): Operações na ordem de execução
+        transacional (bool): Tudo-ou-nada (True) ou isolamento por operação
+    """
+    operacoes: List[OperacaoContato] = Field(
+        ...,
+        description="Operações executadas na ordem recebida"
+    )
+    transacional: bool = Field(
+        default=True,
+        description="True: uma falha desfaz o lote; False: cada operação é independente"
+    )
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "transacional": True,
+                "operacoes": [
+                    {"operacao": "create", "contato": {"nome": "Maria Santos", "email": "maria@email.com", "telefone": "11999998888"}},
+                    {"operacao": "update", "id": 7, "contato": {"nome": "Maria S. Santos"}},
+                    {"operacao": "delete", "id": 3}
+                ]
+            }
+        }
+
+class MesclaContatos(BaseModel):
+    """
+    Modelo de dados para mesclar contatos duplicados.
+    
+    Attributes:
+        manter (int): ID do contato que permanece
+        remover (List[int]): IDs dos duplicados a excluir
+        contato (Optional[Contato]): Valores finais do contato mantido
+    """
+    manter: int = Field(
+        ...,
+        description="ID do contato que permanece"
+    )
+    remover: List[int] = Field(
+        ...,
+        description="IDs dos contatos duplicados que serão excluídos"
+    )
+    contato: Optional[Contato] = Field(
+        default=None,
+        description="Campos finais do contato mantido (opcional)"
+    )
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "manter": 7,
+                "remover": [12, 31],
+                "contato": {"email": "maria.santos@email.com"}
+            }
+        }
+
+class ConsultaTelefones(BaseModel):
+    """
+    Modelo de dados para identificação de vários telefones de uma vez.
+    
+    Attributes:
+        telefones (List[str]): Números brutos (qualquer formatação)
+    """
+    telefones: List[str] = Field(
+        ...,
+        description="Telefones a identificar (ex.: '+55 (11) 99999-8888')"
+    )
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "telefones": ["+55 11 99999-8888", "(21) 98888-7777"]
+            }
+        }
+
+class Etiqueta(BaseModel):
+    """
+    Modelo de dados para criação de uma etiqueta de contatos.
+    
+    Attributes:
+        nome (str): Nome da etiqueta (letras, números, '_' ou '-')
+    """
+    nome: str = Field(
+        ...,
+        description="Nome da etiqueta (até 40 caracteres, sem espaços)",
+        example="familia"
+    )
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "nome": "familia"
+            }
+        }
+
+class IdsContatos(BaseModel):
+    """
+    Modelo de dados com uma lista de IDs de contatos (leitura em lote,
+    associação de etiquetas).
+    
+    Attributes:
+        ids (List[int]): IDs dos contatos
+    """
+    ids: List[int] = Field(
+        ...,
+        description="IDs dos contatos"
+    )
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "ids": [7, 12, 31]
+            }
+        }
+
 class Login(BaseModel):
     """
     Modelo de dados para operações de login.
@@ -0,0 +1,198 @@
+"""
+Módulo Vigia do Event Loop - Detecção de Bloqueios
+
+Mede continuamente o atraso (lag) do event loop e, quando ele fica
+bloqueado além do limite (código síncrono dentro de um handler async:
+mysql.connector, bcrypt, jose...), captura a pilha da thread do loop
+e registra o bloqueio com a rota responsável.
+
+Autor: Henrique Teixeira
+Versão: 1.0.0
+Data: 2024-01-15
+
+Funcionamento (opcional, LOOP_WATCHDOG=1):
+    - Uma corrotina de batimento dorme LOOP_INTERVALO_MS e mede quanto
+      acordou atrasada; os atrasos formam um histograma
+    - Uma thread vigia confere o último batimento; se o loop está parado
+      há mais de LOOP_LIMITE_MS, captura a pilha da thread do loop
+      (sys._current_frames) uma vez por bloqueio
+    - A rota é identificada pelo frame do endpoint na pilha capturada
+    - Bloqueios vão para o log (tipo 'bloqueio') e para
+      /monitoramento/loop, junto com o histograma
+"""
+
+from collections import deque
+from dotenv import load_dotenv
+from registro import registrar_bloqueio
+import threading
+import traceback
+import asyncio
+import time
+import sys
+import os
+
+# =============================================================================
+#                           CONFIGURAÇÃO
+# =============================================================================
+
+load_dotenv()
+
+LOOP_WATCHDOG = os.getenv("LOOP_WATCHDOG", "0") == "1"
+LOOP_LIMITE_MS = float(os.getenv("LOOP_LIMITE_MS", 100))
+LOOP_INTERVALO_MS = float(os.getenv("LOOP_INTERVALO_MS", 20))
+LOOP_BLOQUEIOS_MEMORIA = int(os.getenv("LOOP_BLOQUEIOS_MEMORIA", 50))
+
+# Limites superiores dos baldes do histograma de atraso (ms)
+BALDES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, float("inf"))
+
+# =============================================================================
+#                           HISTOGRAMA
+# =============================================================================
+
+class Histograma:
+    """Contagens de atraso por balde, com total e máximo."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.contagens = [0] * len(BALDES_MS)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.amostras = 0
+
+    def registrar(self, atraso_ms: float):
+        with self._lock:
+            for indice, limite in enumerate(BALDES_MS):
+                if atraso_ms <= limite:
+                    self.contagens[indice] += 1
+                    break
+            self.total_ms += atraso_ms
+            self.max_ms = max(self.max_ms, atraso_ms)
+            self.amostras += 1
+
+    def percentil(self, fracao: float):
+        """Limite superior do balde que contém o percentil (aproximado)."""
+        with self._lock:
+            alvo = fracao * self.amostras
+            acumulado = 0
+            for limite, contagem in zip(BALDES_MS, self.contagens):
+                acumulado += contagem
+                if contagem and acumulado >= alvo:
+                    return limite if limite != float("inf") else self.max_ms
+            return 0.0
+
+    def para_dict(self):
+        with self._lock:
+            baldes = {("+inf" if limite == float("inf") else f"<={limite:g}"): contagem
+                      for limite, contagem in zip(BALDES_MS, self.contagens)}
+            media = self.total_ms / self.amostras if self.amostras else 0.0
+            resumo = {"amostras": self.amostras, "media_ms": round(media, 3),
+                      "max_ms": round(self.max_ms, 3), "baldes_ms": baldes}
+        resumo["p50_ms"] = self.percentil(0.5)
+        resumo["p99_ms"] = self.percentil(0.99)
+        return resumo
+
+# =============================================================================
+#                           VIGIA
+# =============================================================================
+
+class VigiaLoop:
+    """
+    Batimento no event loop + thread vigia que captura os bloqueios.
+
+    Attributes:
+        histograma (Histograma): Atrasos medidos pelo batimento
+        bloqueios (deque): Últimos bloqueios (rota, duração, pilha)
+    """
+
+    def __init__(self, limite_ms: float, intervalo_ms: float):
+        self.limite = limite_ms / 1000
+        self.intervalo = intervalo_ms / 1000
+        self.histograma = Histograma()
+        self.bloqueios = deque(maxlen=LOOP_BLOQUEIOS_MEMORIA)
+        self.total_bloqueios = 0
+        self._endpoints = {}
+        self._thread_loop = None
+        self._batimento = None
+        self._bloqueio_atual = None
+        self._tarefa = None
+
+    def iniciar(self, app):
+        """
+        Inicia o vigia no event loop atual (chamar no startup da aplicação).
+
+        Args:
+            app (FastAPI): Aplicação, para mapear endpoints -> rotas
+        """
+        if self._tarefa is not None:
+            return
+        for rota in app.routes:
+            endpoint = getattr(rota, "endpoint", None)
+            if endpoint is not None and hasattr(endpoint, "__code__"):
+                metodos = ",".join(sorted(getattr(rota, "methods", None) or []))
+                self._endpoints[endpoint.__code__] = f"{metodos} {rota.path}".strip()
+
+        self._thread_loop = threading.get_ident()
+        self._batimento = time.perf_counter()
+        self._tarefa = asyncio.get_running_loop().create_task(self._bater())
+        threading.Thread(target=self._vigiar, name="vigia-loop", daemon=True).start()
+
+    async def _bater(self):
+        """Batimento: mede quanto cada sono acordou atrasado."""
+        while True:
+            antes = time.perf_counter()
+            await asyncio.sleep(self.intervalo)
+            agora = time.perf_counter()
+            atraso = max(0.0, agora - antes - self.intervalo)
+            self.histograma.registrar(atraso * 1000)
+            bloqueio = self._bloqueio_atual
+            if bloqueio is not None:
+                # Duração final do bloqueio já registrado
+                bloqueio["duracao_ms"] = round(atraso * 1000, 3)
+                self._bloqueio_atual = None
+            self._batimento = agora
+
+    def _vigiar(self):
+        """Thread vigia: captura a pilha do loop parado além do limite."""
+        while True:
+            time.sleep(self.limite / 4)
+            batimento = self._batimento
+            parado = time.perf_counter() - batimento - self.intervalo
+            if parado <= self.limite or self._bloqueio_atual is not None:
+                continue
+            frame = sys._current_frames().get(self._thread_loop)
+            if frame is None:
+                continue
+            pilha = traceback.format_stack(frame)
+            bloqueio = {
+                "ts": time.time(),
+                "rota": self._rota(frame),
+                "bloqueado_ms": round(parado * 1000, 3),
+                "duracao_ms": None,
+                "pilha": [linha.strip() for linha in pilha[-30:]],
+            }
+            self._bloqueio_atual = bloqueio
+            self.bloqueios.append(bloqueio)
+            self.total_bloqueios += 1
+            registrar_bloqueio(bloqueio["rota"], parado, bloqueio["pilha"])
+
+    def _rota(self, frame):
+        """Rota do endpoint mais interno presente na pilha, se houver."""
+        while frame is not None:
+            rota = self._endpoints.get(frame.f_code)
+            if rota:
+                return rota
+            frame = frame.f_back
+        return None
+
+    def estatisticas(self):
+        return {
+            "ativo": self._tarefa is not None,
+            "limite_ms": self.limite * 1000,
+            "intervalo_ms": self.intervalo * 1000,
+            "atraso": self.histograma.para_dict(),
+            "bloqueios": self.total_bloqueios,
+            "ultimos_bloqueios": list(self.bloqueios),
+        }
+
+# Vigia compartilhado do processo
+vigia_loop = VigiaLoop(LOOP_LIMITE_MS, LOOP_INTERVALO_MS)